@@ -0,0 +1,70 @@
+"""
+Compare two bench.run results, showing how each benchmark changed.
+
+    python -m bench.compare before.json after.json
+"""
+
+import argparse
+from pathlib import Path
+
+from bench.harness import PBenchResult
+from bench.run import PBenchRun
+
+METRICS = {
+    "p50 ms": lambda result: result.latency.p50_ms,
+    "p99 ms": lambda result: result.latency.p99_ms,
+    "queries": lambda result: result.queries_per_call,
+    "peak KiB": lambda result: result.peak_memory_kib,
+}
+
+
+def _change(before: float, after: float) -> str:
+    if before == after:
+        return ""
+    if before == 0:
+        return "new"
+    return f"{(after - before) / before:+.0%}"
+
+
+def compare(before: PBenchRun, after: PBenchRun) -> str:
+    lines = []
+    if before.meta.scale != after.meta.scale:
+        lines.append(
+            f"Warning: scales differ, {before.meta.scale} and {after.meta.scale}\n"
+        )
+
+    width = max(map(len, before.results | after.results), default=0)
+    header = "".join(f"{metric:>26}" for metric in METRICS)
+    lines.append(f"{'benchmark':<{width}}{header}")
+    for name in before.results | after.results:
+        old: PBenchResult | None = before.results.get(name)
+        new: PBenchResult | None = after.results.get(name)
+        if old is None or new is None:
+            lines.append(
+                f"{name:<{width}}  only in {'after' if old is None else 'before'}"
+            )
+            continue
+        cells = "".join(
+            f"{metric(old):>9.2f} {metric(new):>9.2f} {_change(metric(old), metric(new)):>5}"
+            for metric in METRICS.values()
+        )
+        lines.append(f"{name:<{width}}{cells}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    print(
+        compare(
+            PBenchRun.model_validate_json(args.before.read_text()),
+            PBenchRun.model_validate_json(args.after.read_text()),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
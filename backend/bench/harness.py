@@ -0,0 +1,101 @@
+"""Timing, query counting and memory measurement for benchmarks."""
+
+import statistics
+import time
+import tracemalloc
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from server.shared.pydantic import BaseModel
+
+Operation = Callable[[], Awaitable[object]]
+
+
+class PLatency(BaseModel):
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+
+
+class PBenchResult(BaseModel):
+    iterations: int
+    latency: PLatency
+    # Statements sent to the database per call, on average.
+    queries_per_call: float
+    # The most memory allocated (by Python) during any one call.
+    peak_memory_kib: float
+
+
+class QueryCounter:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args: object) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    index = round(percentile / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+async def measure(
+    engine: AsyncEngine,
+    operation: Operation,
+    iterations: int,
+    warmup: int,
+    memory_iterations: int,
+) -> PBenchResult:
+    """
+    Time operation over iterations calls, after warmup calls that aren't
+    counted. Memory is measured over separate calls, as tracing allocations
+    slows everything down.
+    """
+    for _ in range(warmup):
+        await operation()
+
+    timings = []
+    with QueryCounter(engine) as counter:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await operation()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await operation()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return PBenchResult(
+        iterations=iterations,
+        latency=PLatency(
+            mean_ms=statistics.fmean(timings),
+            p50_ms=_percentile(timings, 50),
+            p90_ms=_percentile(timings, 90),
+            p99_ms=_percentile(timings, 99),
+            min_ms=timings[0],
+            max_ms=timings[-1],
+        ),
+        queries_per_call=counter.count / iterations,
+        peak_memory_kib=peak / 1024,
+    )
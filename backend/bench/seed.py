@@ -0,0 +1,116 @@
+"""
+Seeds the benchmark database with scripts/generate_data.py's advisors,
+clients and notes. The data is derived from a random seed, so the same
+arguments always produce the same database.
+"""
+
+import multiprocessing
+import os
+from datetime import datetime
+from pathlib import Path
+
+import psycopg
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from psycopg import sql
+from sqlalchemy.engine import make_url
+
+from scripts.generate_data import generate
+
+# The newest a seeded row can be, so that the data doesn't depend on the day
+# it was seeded.
+SEED_NOW = datetime(2026, 1, 1)
+
+ADVISOR_PASSWORD = "password"
+
+
+def libpq_url(database_url: str) -> str:
+    return (
+        make_url(database_url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def create_database(database_url: str) -> None:
+    url = make_url(database_url)
+    maintenance_url = libpq_url(url.set(database="postgres").render_as_string(False))
+    with psycopg.connect(maintenance_url, autocommit=True) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM pg_database WHERE datname = %s", [url.database]
+        ).fetchone()
+        if exists is None:
+            conn.execute(
+                sql.SQL("CREATE DATABASE {}").format(sql.Identifier(url.database))
+            )
+
+
+def migrate(database_url: str) -> None:
+    alembic_cfg = AlembicConfig()
+    alembic_cfg.set_main_option(
+        "script_location", str(Path(__file__).parent.parent / "db")
+    )
+    os.environ["DATABASE_URL"] = database_url
+    alembic_cfg.set_main_option("sqlalchemy.url", database_url)
+    command.upgrade(alembic_cfg, "head")
+
+
+def seed(
+    database_url: str,
+    clients: int,
+    notes: int,
+    advisors: int,
+    bcrypt_rounds: int,
+    random_seed: int = 0,
+) -> bool:
+    """
+    Replace the database's data with the given number of rows. Returns False,
+    without changing anything, if it already has exactly that many.
+    """
+    with psycopg.connect(libpq_url(database_url)) as conn:
+        counts = conn.execute(
+            'SELECT (SELECT count(*) FROM "user"), (SELECT count(*) FROM client),'
+            " (SELECT count(*) FROM client_note)"
+        ).fetchone()
+    if counts == (advisors, clients, notes):
+        return False
+
+    generate(
+        database_url,
+        clients=clients,
+        notes=notes,
+        advisors=advisors,
+        seed=random_seed,
+        workers=multiprocessing.cpu_count(),
+        until=SEED_NOW,
+        password=ADVISOR_PASSWORD,
+        bcrypt_rounds=bcrypt_rounds,
+        truncate=True,
+    )
+    return True
+
+
+def remove_benchmark_writes(database_url: str) -> None:
+    """
+    Undo what benchmarks wrote (notes, refresh tokens), leaving the database
+    as seeded. Seeded notes all predate SEED_NOW, so newer ones are the
+    benchmarks'.
+    """
+    with psycopg.connect(libpq_url(database_url)) as conn:
+        client_ids = [
+            row[0]
+            for row in conn.execute(
+                "DELETE FROM client_note WHERE created_at > %s RETURNING client_id",
+                [SEED_NOW],
+            )
+        ]
+        conn.execute(
+            "UPDATE client SET"
+            " note_count = (SELECT count(*) FROM client_note"
+            "  WHERE client_id = client.id),"
+            " last_contacted_at = (SELECT max(created_at) FROM client_note"
+            "  WHERE client_id = client.id)"
+            " WHERE id = ANY(%s)",
+            [list(set(client_ids))],
+        )
+        conn.execute("TRUNCATE refresh_token")
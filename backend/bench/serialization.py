@@ -0,0 +1,98 @@
+"""
+Per-row cost of turning database rows into a JSON response with the stdlib
+JSON encoder and with orjson, and of building models with and without
+validation.
+
+    python -m bench.serialization [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from server.business.client.schema import PClient
+from server.shared.pydantic import PPage
+
+
+def _rows(count: int) -> list[dict[str, Any]]:
+    now = datetime.now()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "email": f"bench-{i}@example.com",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "assigned_user_id": None if i % 2 else str(uuid.uuid4()),
+            "created_at": now,
+            "updated_at": now,
+            "last_contacted_at": None if i % 3 else now,
+            "note_count": i,
+        }
+        for i in range(count)
+    ]
+
+
+def _per_row_us(fn: Callable[[], Any], rows: int, repeat: int) -> float:
+    fn()  # Warm up.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1_000_000
+
+
+def run(rows: int, repeat: int) -> dict[str, float]:
+    data = _rows(rows)
+    # How FastAPI checks and serializes a route's return value.
+    field = create_model_field("response", PPage[PClient], mode="serialization")
+
+    def respond(response_class: type) -> bytes:
+        page = PPage(data=[PClient(**row) for row in data], next_cursor=None)
+        content = asyncio.run(serialize_response(field=field, response_content=page))
+        return response_class(content).body
+
+    clients = [PClient(**row) for row in data]
+
+    def update_key_revalidated() -> None:
+        # update_key as it was, dumping and validating the whole model.
+        for client in clients:
+            client.model_validate({**client.model_dump(), "note_count": 0})
+
+    return {
+        "model_validated": _per_row_us(
+            lambda: [PClient(**row) for row in data], rows, repeat
+        ),
+        "model_construct": _per_row_us(
+            lambda: [PClient.model_construct(**row) for row in data], rows, repeat
+        ),
+        "response_json": _per_row_us(lambda: respond(JSONResponse), rows, repeat),
+        "response_orjson": _per_row_us(lambda: respond(ORJSONResponse), rows, repeat),
+        "update_key_revalidated": _per_row_us(update_key_revalidated, rows, repeat),
+        "update_key": _per_row_us(
+            lambda: [client.update_key("note_count", 0) for client in clients],
+            rows,
+            repeat,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, us in run(args.rows, args.repeat).items():
+        print(f"{name:<24} {us:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""add query indexes
+
+Revision ID: 3f8a2d6c0b71
+Revises: e1a7c3f95d24
+Create Date: 2026-10-17 11:30:12.674019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a2d6c0b71'
+down_revision: Union[str, None] = 'e1a7c3f95d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # client_note.client_id is already the leading column of
+    # ix_client_note_client_id_created_at_id, so it doesn't need its own index.
+    # Build concurrently so that writes aren't blocked meanwhile.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_client_note_creator_user_id'), 'client_note', ['creator_user_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_client_assigned_user_id'), 'client', ['assigned_user_id'], unique=False, postgresql_concurrently=True)
+
+        # list_clients' keyset on last_contacted_at needs a plain row
+        # comparison to seek with, so index the coalesced value instead.
+        op.drop_index('ix_client_last_contacted_at_id', table_name='client', postgresql_concurrently=True)
+        op.create_index('ix_client_last_contacted_at_id', 'client', [sa.text("coalesce(last_contacted_at, '-infinity'::timestamp)"), 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_client_last_contacted_at_id', table_name='client', postgresql_concurrently=True)
+        op.create_index('ix_client_last_contacted_at_id', 'client', [sa.text('last_contacted_at NULLS FIRST'), 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index(op.f('ix_client_assigned_user_id'), table_name='client', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_client_note_creator_user_id'), table_name='client_note', postgresql_concurrently=True)
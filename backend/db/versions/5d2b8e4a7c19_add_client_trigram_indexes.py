@@ -0,0 +1,36 @@
+"""add client trigram indexes
+
+Revision ID: 5d2b8e4a7c19
+Revises: 9a5f0c2e7b13
+Create Date: 2026-10-17 13:52:40.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b8e4a7c19'
+down_revision: Union[str, None] = '9a5f0c2e7b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Build concurrently so that client writes aren't blocked meanwhile.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_client_first_name_trgm', 'client', ['first_name'], unique=False, postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_client_last_name_trgm', 'client', ['last_name'], unique=False, postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_client_email_trgm', 'client', ['email'], unique=False, postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_client_email_trgm', table_name='client', postgresql_using='gin', postgresql_concurrently=True)
+        op.drop_index('ix_client_last_name_trgm', table_name='client', postgresql_using='gin', postgresql_concurrently=True)
+        op.drop_index('ix_client_first_name_trgm', table_name='client', postgresql_using='gin', postgresql_concurrently=True)
+
+    # Left installed: other objects may have come to depend on the extension.
@@ -0,0 +1,43 @@
+"""add last_contacted_at and note_count to client
+
+Revision ID: 7c2e4b9d1a3f
+Revises: 041993142c1c
+Create Date: 2026-10-17 09:12:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2e4b9d1a3f'
+down_revision: Union[str, None] = '041993142c1c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('client', sa.Column('last_contacted_at', sa.DateTime(), nullable=True))
+    op.add_column('client', sa.Column('note_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the notes that already exist.
+    op.execute(
+        """
+        UPDATE client
+        SET last_contacted_at = note_stats.last_contacted_at,
+            note_count = note_stats.note_count
+        FROM (
+            SELECT client_id, max(created_at) AS last_contacted_at, count(*) AS note_count
+            FROM client_note
+            GROUP BY client_id
+        ) AS note_stats
+        WHERE client.id = note_stats.client_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('client', 'note_count')
+    op.drop_column('client', 'last_contacted_at')
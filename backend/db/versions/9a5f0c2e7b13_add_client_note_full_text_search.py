@@ -0,0 +1,34 @@
+"""add client_note full text search
+
+Revision ID: 9a5f0c2e7b13
+Revises: 3f8a2d6c0b71
+Create Date: 2026-10-17 12:41:06.215873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5f0c2e7b13'
+down_revision: Union[str, None] = '3f8a2d6c0b71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('client_note', sa.Column('content_tsv', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', content)", persisted=True), nullable=True))
+
+    # Build concurrently so that note inserts aren't blocked meanwhile.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_client_note_content_tsv', 'client_note', ['content_tsv'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_client_note_content_tsv', table_name='client_note', postgresql_using='gin', postgresql_concurrently=True)
+
+    op.drop_column('client_note', 'content_tsv')
@@ -0,0 +1,34 @@
+"""add client sort indexes
+
+Revision ID: b4d91e6f2c08
+Revises: 7c2e4b9d1a3f
+Create Date: 2026-10-17 10:03:27.540611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d91e6f2c08'
+down_revision: Union[str, None] = '7c2e4b9d1a3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build concurrently so that writes to client aren't blocked meanwhile,
+    # which can't happen inside the migration's transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_client_first_name_last_name_id', 'client', ['first_name', 'last_name', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_client_created_at_id', 'client', ['created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_client_last_contacted_at_id', 'client', [sa.text('last_contacted_at NULLS FIRST'), 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_client_last_contacted_at_id', table_name='client', postgresql_concurrently=True)
+        op.drop_index('ix_client_created_at_id', table_name='client', postgresql_concurrently=True)
+        op.drop_index('ix_client_first_name_last_name_id', table_name='client', postgresql_concurrently=True)
@@ -0,0 +1,179 @@
+"""use native uuid ids
+
+Revision ID: c3d8f1a6e952
+Revises: ab4c51bb4cd4
+Create Date: 2026-10-17 15:02:37.410562
+
+Converting the id columns in place would rewrite every table (and rebuild
+every index) under an exclusive lock, blocking reads and writes for as long as
+that takes. Instead, each column gets a uuid twin that a trigger keeps in step
+with it while the existing rows are copied over in batches, and the twins'
+indexes are built concurrently. Only swapping the columns over needs the
+tables to themselves, and that is a short run of catalog changes: with the
+NOT NULL checks and the indexes already in place, nothing has to be scanned.
+
+The app has to be deployed with the swap, as it reads and writes the new
+types.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8f1a6e952'
+down_revision: Union[str, None] = 'ab4c51bb4cd4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Each table's id columns, primary key first, with whether they are nullable.
+COLUMNS = {
+    'user': [('id', False)],
+    'client': [('id', False), ('assigned_user_id', True)],
+    'client_note': [('id', False), ('client_id', False), ('creator_user_id', False)],
+    'refresh_token': [('id', False), ('user_id', False), ('family_id', False)],
+}
+
+FOREIGN_KEYS = [
+    ('client_assigned_user_id_fkey', 'client', 'assigned_user_id', 'user'),
+    ('client_note_client_id_fkey', 'client_note', 'client_id', 'client'),
+    ('client_note_creator_user_id_fkey', 'client_note', 'creator_user_id', 'user'),
+    ('refresh_token_user_id_fkey', 'refresh_token', 'user_id', 'user'),
+]
+
+# The other indexes on id columns, over the new columns.
+INDEXES = {
+    'ix_client_assigned_user_id': ('client', 'assigned_user_id_uuid'),
+    'ix_client_created_at_id': ('client', 'created_at, id_uuid'),
+    'ix_client_first_name_last_name_id': ('client', 'first_name, last_name, id_uuid'),
+    'ix_client_last_contacted_at_id': ('client', "coalesce(last_contacted_at, '-infinity'::timestamp), id_uuid"),
+    'ix_client_note_client_id_created_at_id': ('client_note', 'client_id_uuid, created_at DESC, id_uuid DESC'),
+    'ix_client_note_creator_user_id': ('client_note', 'creator_user_id_uuid'),
+    'ix_refresh_token_family_id': ('refresh_token', 'family_id_uuid'),
+    'ix_refresh_token_user_id': ('refresh_token', 'user_id_uuid'),
+}
+
+# Rows copied per transaction, so that no one transaction holds many row
+# locks or runs for long.
+BATCH_SIZE = 10_000
+
+# Altering the tables waits this long for their locks before giving up,
+# rather than queueing every other query behind it meanwhile. Every step
+# before the swap can be repeated, so the migration can just be run again.
+LOCK_TIMEOUT = '5s'
+
+
+def _sync_function(table: str) -> str:
+    return f'{table}_sync_uuid_ids'
+
+
+def _backfill(table: str) -> None:
+    # Walks the existing primary key, so each batch is an index range scan.
+    assignments = ', '.join(f'{column}_uuid = {column}::uuid' for column, _ in COLUMNS[table])
+    bind = op.get_bind()
+    after = ''
+    while True:
+        ids = bind.execute(
+            sa.text(
+                f'UPDATE "{table}" SET {assignments} WHERE id IN '
+                f'(SELECT id FROM "{table}" WHERE id > :after ORDER BY id LIMIT :limit) '
+                'RETURNING id'
+            ),
+            {'after': after, 'limit': BATCH_SIZE},
+        ).scalars().all()
+        if not ids:
+            return
+        after = max(ids)
+
+
+def _create_index(name: str, table: str, columns: str, unique: bool = False) -> None:
+    # A failed concurrent build leaves an invalid index behind, so start over.
+    op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY {name} ON "{table}" ({columns})')
+
+
+def _lock_tables() -> None:
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    # All at once, referencing tables first: the order a write takes them in
+    # (a note, then the client it checks the foreign key against), so that
+    # altering them can't deadlock with one.
+    op.execute('LOCK TABLE client_note, refresh_token, client, "user" IN ACCESS EXCLUSIVE MODE')
+
+
+def upgrade() -> None:
+    _lock_tables()
+    for table, columns in COLUMNS.items():
+        for column, _ in columns:
+            op.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS {column}_uuid uuid')
+        # Rows written from here on get their uuids as they are written.
+        assignments = ' '.join(f'NEW.{column}_uuid := NEW.{column}::uuid;' for column, _ in columns)
+        op.execute(
+            f'CREATE OR REPLACE FUNCTION {_sync_function(table)}() RETURNS trigger LANGUAGE plpgsql '
+            f'AS $$ BEGIN {assignments} RETURN NEW; END $$'
+        )
+        op.execute(f'DROP TRIGGER IF EXISTS {_sync_function(table)} ON "{table}"')
+        op.execute(
+            f'CREATE TRIGGER {_sync_function(table)} BEFORE INSERT OR UPDATE ON "{table}" '
+            f'FOR EACH ROW EXECUTE FUNCTION {_sync_function(table)}()'
+        )
+
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS.items():
+            _backfill(table)
+            # Validated without blocking writes, and then SET NOT NULL can
+            # trust the check rather than scanning the table.
+            for column, nullable in columns:
+                if not nullable:
+                    op.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT IF EXISTS {table}_{column}_uuid_not_null')
+                    op.execute(
+                        f'ALTER TABLE "{table}" ADD CONSTRAINT {table}_{column}_uuid_not_null '
+                        f'CHECK ({column}_uuid IS NOT NULL) NOT VALID'
+                    )
+                    op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {table}_{column}_uuid_not_null')
+            _create_index(f'{table}_pkey_uuid', table, 'id_uuid', unique=True)
+        for name, (table, columns) in INDEXES.items():
+            _create_index(f'{name}_uuid', table, columns)
+
+    _lock_tables()
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT {name}')
+    for table, columns in COLUMNS.items():
+        op.execute(f'DROP TRIGGER {_sync_function(table)} ON "{table}"')
+        op.execute(f'DROP FUNCTION {_sync_function(table)}()')
+        for column, nullable in columns:
+            # Takes the old primary key and indexes with it.
+            op.execute(f'ALTER TABLE "{table}" DROP COLUMN {column}')
+            op.execute(f'ALTER TABLE "{table}" RENAME COLUMN {column}_uuid TO {column}')
+            if not nullable:
+                op.execute(f'ALTER TABLE "{table}" ALTER COLUMN {column} SET NOT NULL')
+                op.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT {table}_{column}_uuid_not_null')
+        op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_pkey_uuid')
+    for name in INDEXES:
+        op.execute(f'ALTER INDEX {name}_uuid RENAME TO {name}')
+    # Not checked against the existing rows yet, which would hold the locks
+    # for as long as that takes.
+    for name, table, column, referred_table in FOREIGN_KEYS:
+        op.execute(
+            f'ALTER TABLE "{table}" ADD CONSTRAINT {name} FOREIGN KEY ({column}) '
+            f'REFERENCES "{referred_table}" (id) NOT VALID'
+        )
+
+    # Checked once the swap is committed, without blocking writes.
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in FOREIGN_KEYS:
+            op.execute(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT {name}')
+
+
+def downgrade() -> None:
+    # Rewrites the tables under an exclusive lock: not meant for a live
+    # database.
+    _lock_tables()
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    for table, columns in COLUMNS.items():
+        for column, _ in columns:
+            op.alter_column(table, column, type_=sa.String(), postgresql_using=f'{column}::text')
+    for name, table, column, referred_table in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referred_table, [column], ['id'])
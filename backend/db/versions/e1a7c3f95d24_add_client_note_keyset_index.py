@@ -0,0 +1,29 @@
+"""add client_note keyset index
+
+Revision ID: e1a7c3f95d24
+Revises: b4d91e6f2c08
+Create Date: 2026-10-17 10:48:55.902344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c3f95d24'
+down_revision: Union[str, None] = 'b4d91e6f2c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build concurrently so that note inserts aren't blocked meanwhile.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_client_note_client_id_created_at_id', 'client_note', ['client_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_client_note_client_id_created_at_id', table_name='client_note', postgresql_concurrently=True)
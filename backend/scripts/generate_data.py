@@ -0,0 +1,434 @@
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from server.business.auth.password import hash_password
+from server.business.client_note.schema import NoteCategory
+from server.shared.config import Config
+from server.shared.ids import uuid7
+
+# The newest a generated row can be. Fixed rather than today, so that the same
+# seed always generates the same data.
+DEFAULT_UNTIL = datetime(2026, 1, 1)
+EPOCH = datetime(1970, 1, 1)
+DEFAULT_YEARS = 5
+
+# Clients (and their notes) loaded per transaction by a worker.
+CHUNK_SIZE = 5_000
+
+# Shape of the Lomax distribution of notes per client: most clients have a
+# few notes and a few have thousands, roughly 80/20.
+DEFAULT_SKEW = 1.2
+
+# Share of clients with an assigned advisor, and of a client's notes written
+# by that advisor rather than a colleague.
+ASSIGNED_SHARE = 0.9
+ASSIGNED_AUTHOR_SHARE = 0.8
+
+CATEGORY_WEIGHTS: dict[NoteCategory, int] = {
+    "note": 35,
+    "call": 30,
+    "email": 20,
+    "meeting": 10,
+    "follow_up": 5,
+}
+
+FIRST_NAMES = [
+    "Aaliyah", "Aiden", "Alice", "Amir", "Ana", "Benjamin", "Bob", "Camila",
+    "Carol", "Chen", "Chloe", "Daniel", "David", "Elena", "Emily", "Ethan",
+    "Fatima", "Gabriel", "Grace", "Hana", "Hiroshi", "Isabella", "Jacob",
+    "Jamal", "Julia", "Kai", "Laura", "Liam", "Lucas", "Maria", "Mateo", "Mei",
+    "Mohammed", "Noah", "Olivia", "Omar", "Priya", "Rahul", "Sara", "Sofia",
+    "Thomas", "Wei", "Yuki", "Zoe",
+]  # fmt: skip
+LAST_NAMES = [
+    "Ahmed", "Anderson", "Brown", "Chen", "Clark", "Davis", "Dubois", "Garcia",
+    "Gupta", "Hernandez", "Ivanov", "Johnson", "Kim", "Kowalski", "Lee",
+    "Lopez", "MacDonald", "Martin", "Martinez", "Miller", "Moore", "Nguyen",
+    "Novak", "Okafor", "Patel", "Roy", "Rossi", "Silva", "Singh", "Smith",
+    "Tanaka", "Taylor", "Thompson", "Tremblay", "Wang", "White", "Williams",
+    "Wilson", "Wong", "Yamamoto",
+]  # fmt: skip
+
+NOTE_OPENINGS: dict[NoteCategory, list[str]] = {
+    "note": [
+        "Reminder for next review:",
+        "Background:",
+        "Personal detail to remember:",
+    ],
+    "call": [
+        "Called to discuss",
+        "Quick check-in call about",
+        "Client called with questions about",
+    ],
+    "email": [
+        "Emailed a summary of",
+        "Sent documents covering",
+        "Replied to the client's email about",
+    ],
+    "meeting": [
+        "Annual review meeting covering",
+        "Met in person to go through",
+        "Video meeting about",
+    ],
+    "follow_up": [
+        "Follow up next week on",
+        "Need to send paperwork for",
+        "Chase the client about",
+    ],
+}
+NOTE_TOPICS = [
+    "rebalancing the portfolio towards fixed income",
+    "the upcoming RRSP contribution deadline",
+    "opening a TFSA for their daughter",
+    "insurance coverage and beneficiaries",
+    "tax-loss harvesting before year end",
+    "the updated financial plan",
+    "the mortgage renewal",
+    "retirement income projections",
+    "estate planning and their will",
+    "a large cash inflow from selling the cottage",
+    "their risk tolerance after the market drop",
+    "consolidating old workplace pension plans",
+]
+NOTE_DETAILS = [
+    "They were happy with performance so far.",
+    "Spouse will join the next meeting.",
+    "Prefers email over phone calls.",
+    "Wants to revisit this in the spring.",
+    "Concerned about fees, explained the breakdown.",
+    "Agreed to increase monthly contributions.",
+    "Asked for a comparison with their current provider.",
+    "",
+]
+
+
+def _libpq_url(database_url: str) -> str:
+    return (
+        make_url(database_url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def _uuid(rng: random.Random, at: datetime) -> str:
+    # Time-ordered like the app's own ids, as of when the row was created.
+    return uuid7((at - EPOCH) // timedelta(microseconds=1) * 1000, rng.getrandbits(62))
+
+
+def note_counts(seed: int, clients: int, notes: int, skew: float) -> list[int]:
+    """
+    Notes per client, drawn from a Lomax (shifted Pareto) distribution and
+    scaled to add up to exactly notes.
+    """
+    rng = random.Random(f"{seed}:counts")
+    weights = [rng.paretovariate(skew) - 1 for _ in range(clients)]
+    scale = notes / sum(weights)
+    exact = [weight * scale for weight in weights]
+    counts = [int(value) for value in exact]
+    # Hand what rounding down lost to the largest remainders.
+    by_remainder = sorted(range(clients), key=lambda i: counts[i] - exact[i])
+    for i in by_remainder[: notes - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class _Generator:
+    """
+    Generates clients and their notes. Each client's rows come from their own
+    random stream, so the data doesn't depend on how clients are split between
+    workers.
+    """
+
+    def __init__(
+        self,
+        conninfo: str,
+        seed: int,
+        advisor_ids: list[str],
+        since: datetime,
+        until: datetime,
+    ):
+        self.conninfo = conninfo
+        self.seed = seed
+        self.advisor_ids = advisor_ids
+        self.since = since
+        self.until = until
+        self.categories = list(CATEGORY_WEIGHTS)
+        self.category_weights = list(CATEGORY_WEIGHTS.values())
+
+    def _between(self, rng: random.Random, start: datetime) -> datetime:
+        return start + (self.until - start) * rng.random()
+
+    def _note_content(self, rng: random.Random, category: NoteCategory) -> str:
+        return " ".join(
+            part
+            for part in (
+                rng.choice(NOTE_OPENINGS[category]),
+                rng.choice(NOTE_TOPICS) + ".",
+                rng.choice(NOTE_DETAILS),
+            )
+            if part
+        )
+
+    def client(self, index: int, note_count: int) -> tuple[tuple, list[tuple]]:
+        rng = random.Random(f"{self.seed}:client:{index}")
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        created_at = self._between(rng, self.since)
+        client_id = _uuid(rng, created_at)
+        advisor_id = (
+            rng.choice(self.advisor_ids) if rng.random() < ASSIGNED_SHARE else None
+        )
+
+        # Recent history is busier than old history, so skew towards the end.
+        note_times = sorted(
+            created_at + (self.until - created_at) * rng.random() ** 0.5
+            for _ in range(note_count)
+        )
+        notes = []
+        for note_time, category in zip(
+            note_times,
+            rng.choices(self.categories, self.category_weights, k=note_count),
+        ):
+            author_id = (
+                advisor_id
+                if advisor_id is not None and rng.random() < ASSIGNED_AUTHOR_SHARE
+                else rng.choice(self.advisor_ids)
+            )
+            notes.append(
+                (
+                    _uuid(rng, note_time),
+                    client_id,
+                    author_id,
+                    self._note_content(rng, category),
+                    category,
+                    note_time,
+                )
+            )
+
+        client = (
+            client_id,
+            f"{first_name}.{last_name}.{index}@example.com".lower(),
+            first_name,
+            last_name,
+            advisor_id,
+            created_at,
+            created_at,
+            note_times[-1] if note_times else None,
+            note_count,
+        )
+        return client, notes
+
+    def load(self, chunk: tuple[int, list[int]]) -> tuple[int, int]:
+        """Load a run of clients, starting at the given index, with their notes."""
+        start, counts = chunk
+        clients = []
+        notes = []
+        for index, note_count in enumerate(counts, start):
+            client, client_notes = self.client(index, note_count)
+            clients.append(client)
+            notes.extend(client_notes)
+
+        with psycopg.connect(self.conninfo) as conn:
+            with conn.cursor().copy(
+                "COPY client (id, email, first_name, last_name, assigned_user_id,"
+                " created_at, updated_at, last_contacted_at, note_count) FROM STDIN"
+            ) as copy:
+                for row in clients:
+                    copy.write_row(row)
+            with conn.cursor().copy(
+                "COPY client_note (id, client_id, creator_user_id, content,"
+                " category, created_at) FROM STDIN"
+            ) as copy:
+                for row in notes:
+                    copy.write_row(row)
+        return len(clients), len(notes)
+
+
+_worker_generator: _Generator | None = None
+
+
+def _init_worker(generator: _Generator) -> None:
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _load_in_worker(chunk: tuple[int, list[int]]) -> tuple[int, int]:
+    assert _worker_generator is not None
+    return _worker_generator.load(chunk)
+
+
+def _drop_indexes(conn: psycopg.Connection) -> list[str]:
+    """
+    Drop client's and client_note's secondary indexes, returning the
+    statements that recreate them. Loading then doesn't have to update them
+    row by row (the GIN ones especially), and building them afterwards is
+    much quicker. Unique indexes are kept, as they back constraints.
+    """
+    indexes = conn.execute(
+        "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid)"
+        " FROM pg_index"
+        " WHERE indrelid IN ('client'::regclass, 'client_note'::regclass)"
+        " AND NOT indisunique"
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f"DROP INDEX {name}")
+    return [definition for _, definition in indexes]
+
+
+def _create_index(conninfo: str, definition: str) -> None:
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute("SET maintenance_work_mem = '512MB'")
+        conn.execute(definition)
+
+
+def generate(
+    database_url: str,
+    clients: int,
+    notes: int,
+    advisors: int,
+    seed: int = 0,
+    workers: int = 1,
+    skew: float = DEFAULT_SKEW,
+    until: datetime = DEFAULT_UNTIL,
+    years: int = DEFAULT_YEARS,
+    password: str = "password",
+    bcrypt_rounds: int = Config().bcrypt_rounds,
+    truncate: bool = False,
+) -> None:
+    conninfo = _libpq_url(database_url)
+    rng = random.Random(f"{seed}:advisors")
+    since = until - timedelta(days=365 * years)
+    advisor_ids = [_uuid(rng, since) for _ in range(advisors)]
+
+    with psycopg.connect(conninfo) as conn:
+        if truncate:
+            conn.execute('TRUNCATE client_note, client, refresh_token, "user"')
+        elif conn.execute("SELECT EXISTS (SELECT FROM client)").fetchone()[0]:
+            raise SystemExit("The database already has clients, pass --truncate")
+
+        # Every advisor gets the same password, so hash it once.
+        password_hashed = hash_password(password, bcrypt_rounds)
+        with conn.cursor().copy(
+            'COPY "user" (id, email, password_hashed, created_at) FROM STDIN'
+        ) as copy:
+            for i, advisor_id in enumerate(advisor_ids):
+                copy.write_row(
+                    (advisor_id, f"advisor{i}@example.com", password_hashed, since)
+                )
+        index_definitions = _drop_indexes(conn)
+
+    counts = note_counts(seed, clients, notes, skew)
+    chunks = [
+        (start, counts[start : start + CHUNK_SIZE])
+        for start in range(0, clients, CHUNK_SIZE)
+    ]
+    generator = _Generator(conninfo, seed, advisor_ids, since, until)
+
+    started = time.monotonic()
+    loaded_clients = loaded_notes = 0
+
+    def report(result: tuple[int, int]) -> None:
+        nonlocal loaded_clients, loaded_notes
+        loaded_clients += result[0]
+        loaded_notes += result[1]
+        elapsed = time.monotonic() - started
+        print(
+            f"{loaded_clients}/{clients} clients, {loaded_notes}/{notes} notes"
+            f" ({loaded_notes / elapsed:,.0f} notes/s)",
+            file=sys.stderr,
+        )
+
+    try:
+        if workers > 1:
+            with multiprocessing.Pool(
+                workers, initializer=_init_worker, initargs=(generator,)
+            ) as pool:
+                for result in pool.imap_unordered(_load_in_worker, chunks):
+                    report(result)
+        else:
+            for chunk in chunks:
+                report(generator.load(chunk))
+    finally:
+        print(f"Creating {len(index_definitions)} indexes...", file=sys.stderr)
+        with ThreadPoolExecutor(workers) as executor:
+            for _ in executor.map(
+                lambda definition: _create_index(conninfo, definition),
+                index_definitions,
+            ):
+                pass
+
+    print("Analyzing...", file=sys.stderr)
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        conn.execute("VACUUM ANALYZE")
+    print(f"Done in {time.monotonic() - started:.0f}s", file=sys.stderr)
+
+
+def main():
+    config = Config.from_env()
+    parser = argparse.ArgumentParser(
+        description="Fill the database with realistic generated advisors, clients "
+        "and notes. The same arguments always generate the same data."
+    )
+    parser.add_argument("--database-url", default=config.database_url)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--notes", type=int, default=5_000_000)
+    parser.add_argument("--advisors", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="Processes generating and loading clients in parallel.",
+    )
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=DEFAULT_SKEW,
+        help="Shape of the notes per client distribution, lower is more skewed.",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=DEFAULT_UNTIL,
+        help="The newest a generated row can be.",
+    )
+    parser.add_argument(
+        "--years", type=int, default=DEFAULT_YEARS, help="Years of history."
+    )
+    parser.add_argument(
+        "--password", default="password", help="Every advisor's password."
+    )
+    parser.add_argument("--bcrypt-rounds", type=int, default=config.bcrypt_rounds)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Delete all users, clients and notes first.",
+    )
+    args = parser.parse_args()
+
+    generate(
+        args.database_url,
+        clients=args.clients,
+        notes=args.notes,
+        advisors=args.advisors,
+        seed=args.seed,
+        workers=args.workers,
+        skew=args.skew,
+        until=args.until,
+        years=args.years,
+        password=args.password,
+        bcrypt_rounds=args.bcrypt_rounds,
+        truncate=args.truncate,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+from server.business.client.bulk_import import ClientImportFormatError, import_clients
+from server.business.client.schema import ClientImportFormat
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import create_cache
+from server.shared.config import Config
+
+CHUNK_SIZE = 64 * 1024
+
+FORMATS_BY_SUFFIX: dict[str, ClientImportFormat] = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+async def read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def run(path: Path, format: ClientImportFormat) -> int:
+    config = Config.from_env()
+    database = AsyncDatabaseManager.from_url(config.database_url)
+    # Only reaches the server's cache when that is shared (CACHE_URL).
+    cache = create_cache(config)
+    try:
+        async with database.create_session() as session:
+            result = await import_clients(session, cache, read_chunks(path), format)
+    except ClientImportFormatError as e:
+        print(f"Could not import {path}: {e}")
+        return 1
+    finally:
+        await database.dispose()
+
+    for error in result.errors:
+        print(f"Line {error.line}: {error.error}")
+    if result.error_count > len(result.errors):
+        print(f"... and {result.error_count - len(result.errors)} more errors")
+    print(
+        f"Created {result.created}, updated {result.updated}, "
+        f"unchanged {result.unchanged}, skipped {result.error_count} rows."
+    )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import clients from a CSV (email, first_name, last_name "
+        "columns) or NDJSON file."
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        help="Defaults to the one matching the file extension.",
+    )
+    args = parser.parse_args()
+
+    format = args.format or FORMATS_BY_SUFFIX.get(args.path.suffix.lower())
+    if format is None:
+        parser.error("Can't tell the format from the file extension, pass --format")
+
+    raise SystemExit(asyncio.run(run(args.path, format)))
+
+
+if __name__ == "__main__":
+    main()
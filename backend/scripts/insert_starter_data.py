@@ -1,10 +1,12 @@
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from server.business.auth.password import hash_password
 from server.data.models.client import Client
 from server.data.models.user import User
 from server.shared.config import Config
 from server.shared.databasemanager import DatabaseManager
+from server.shared.ids import new_id
 
 TEST_USER_EMAIL = "admin@hi.com"
 TEST_USER_PASSWORD = "password"
@@ -33,29 +35,39 @@ def main():
         else:
             user = User(
                 email=TEST_USER_EMAIL,
-                password_hashed=hash_password(TEST_USER_PASSWORD),
+                password_hashed=hash_password(TEST_USER_PASSWORD, config.bcrypt_rounds),
             )
             session.add(user)
             session.flush()
             user_id = user.id
             print(f"Created user {TEST_USER_EMAIL} with password '{TEST_USER_PASSWORD}'")
 
-        for test_client in TEST_CLIENTS:
-            existing_client = session.execute(
-                select(Client).where(Client.email == test_client["email"])
-            ).scalars().one_or_none()
+        # One statement for all of them, skipping clients that already exist.
+        created_emails = set(
+            session.execute(
+                insert(Client)
+                .values(
+                    [
+                        {
+                            "id": new_id(),
+                            "email": test_client["email"],
+                            "first_name": test_client["first_name"],
+                            "last_name": test_client["last_name"],
+                            "assigned_user_id": user_id if test_client["assigned"] else None,
+                        }
+                        for test_client in TEST_CLIENTS
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[Client.email])
+                .returning(Client.email)
+            ).scalars()
+        )
 
-            if existing_client:
+        for test_client in TEST_CLIENTS:
+            if test_client["email"] not in created_emails:
                 print(f"Client {test_client['email']} already exists, skipping.")
                 continue
 
-            client = Client(
-                email=test_client["email"],
-                first_name=test_client["first_name"],
-                last_name=test_client["last_name"],
-                assigned_user_id=user_id if test_client["assigned"] else None,
-            )
-            session.add(client)
             assigned_label = f" (assigned to {TEST_USER_EMAIL})" if test_client["assigned"] else " (unassigned)"
             print(f"Created client {test_client['first_name']} {test_client['last_name']}{assigned_label}")
 
@@ -1,9 +1,14 @@
+import hashlib
+import time
+from collections import OrderedDict
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 import jwt
 
 from server.business.auth.schema import UserTokenInfo
+from server.shared.cache import PCacheStats
 from server.shared.config import Config
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -12,26 +17,71 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 class AuthVerifier:
     def __init__(self, config: Config):
         self.config = config
+        # Verified tokens by the digest of the token, with their expiry (Unix
+        # time), least recently used first. Every authenticated request
+        # presents the same token, so this skips re-verifying it each time.
+        self._verified: OrderedDict[bytes, tuple[UserTokenInfo, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
-    def get_user_token_info(
-        self, token: str = Depends(oauth2_scheme)
-    ) -> UserTokenInfo:
+    def _verify(self, token: str) -> tuple[UserTokenInfo, float]:
         try:
             payload = jwt.decode(
                 token, self.config.access_token_secret_key, algorithms=["HS256"]
             )
-            user_id = payload.get("sub")
-            if user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token",
-                )
-            return UserTokenInfo(user_id=user_id)
         except jwt.PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token",
             )
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token",
+            )
+        # Tokens without an expiry are still re-verified now and then.
+        expires_at = payload.get(
+            "exp", time.time() + self.config.token_cache_max_ttl_seconds
+        )
+        return UserTokenInfo(user_id=user_id), expires_at
+
+    # Async so that FastAPI runs it on the event loop rather than handing it
+    # to the thread pool, which would cost more than a cache hit.
+    async def get_user_token_info(
+        self, token: str = Depends(oauth2_scheme)
+    ) -> UserTokenInfo:
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._verified.get(key)
+        if cached is not None:
+            token_info, expires_at = cached
+            # jwt.decode rejects tokens from their exp on, so match that.
+            if time.time() < expires_at:
+                self.hits += 1
+                self._verified.move_to_end(key)
+                return token_info
+            del self._verified[key]
+
+        self.misses += 1
+        token_info, expires_at = self._verify(token)
+        self._verified[key] = (token_info, expires_at)
+        while len(self._verified) > self.config.token_cache_max_entries:
+            self._verified.popitem(last=False)
+            self.evictions += 1
+        return token_info
+
+    def stats(self) -> PCacheStats:
+        lookups = self.hits + self.misses
+        return PCacheStats(
+            backend="AuthVerifier",
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / lookups if lookups else 0.0,
+            evictions=self.evictions,
+            entries=len(self._verified),
+            max_entries=self.config.token_cache_max_entries,
+        )
 
     def UserTokenInfo(self) -> UserTokenInfo:
         return Depends(self.get_user_token_info)
@@ -0,0 +1,31 @@
+# Check a user's email and password.
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.auth.password import PasswordHasher
+from server.data.models.user import User
+
+
+async def authenticate(
+    session: AsyncSession, hasher: PasswordHasher, email: str, password: str
+) -> str | None:
+    """
+    Return the id of the user with this email and password, or None. Raises
+    PasswordHasherBusyError when the password can't be checked right now.
+    """
+    user = (
+        await session.execute(select(User).where(User.email == email.lower()))
+    ).scalar_one_or_none()
+    if user is None or user.password_hashed is None:
+        return None
+
+    if not await hasher.verify(password, user.password_hashed):
+        return None
+
+    # The password is only known now, so this is the one chance to move its
+    # hash to the configured cost, whether that went up or down.
+    if hasher.needs_rehash(user.password_hashed):
+        user.password_hashed = await hasher.hash(password)
+        await session.commit()
+
+    return user.id
@@ -1,9 +1,78 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 import bcrypt
 
+from server.shared.config import Config
+
+T = TypeVar("T")
+
+DEFAULT_BCRYPT_ROUNDS = 12
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+def hash_password(password: str, rounds: int = DEFAULT_BCRYPT_ROUNDS) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
+def hash_rounds(hashed: str) -> int:
+    # bcrypt hashes look like $2b$<rounds>$<salt and hash>.
+    return int(hashed.split("$")[2])
+
+
+class PasswordHasherBusyError(Exception):
+    """Too many passwords are waiting to be hashed or verified already."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt, which is deliberately slow, on a bounded thread pool so that
+    it doesn't block the event loop (bcrypt releases the GIL while it works).
+    Callers that can't get a thread within queue_timeout seconds get a
+    PasswordHasherBusyError rather than piling up behind a login rush.
+    """
+
+    def __init__(self, rounds: int, max_concurrency: int, queue_timeout: float):
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="bcrypt"
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_config(cls, config: Config) -> "PasswordHasher":
+        return cls(
+            config.bcrypt_rounds,
+            config.password_hash_concurrency,
+            config.password_hash_queue_timeout_seconds,
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except TimeoutError:
+            raise PasswordHasherBusyError()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._run(verify_password, plain, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether hashed was made with a different cost than configured."""
+        return hash_rounds(hashed) != self.rounds
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
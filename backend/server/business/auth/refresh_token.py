@@ -0,0 +1,87 @@
+# Issue, rotate and revoke refresh tokens.
+import hashlib
+import secrets
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.data.models.refresh_token import RefreshToken
+from server.shared.ids import new_id
+
+REFRESH_TOKEN_EXPIRE_DAYS = 30
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token(
+    session: AsyncSession, user_id: str, family_id: str | None = None
+) -> str:
+    """Add a new refresh token to the session, for the caller to commit."""
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=_digest(token),
+            family_id=family_id or new_id(),
+            expires_at=func.now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def _revoke_family(session: AsyncSession, token: str) -> None:
+    await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.family_id
+            == select(RefreshToken.family_id)
+            .where(RefreshToken.token_hash == _digest(token))
+            .scalar_subquery(),
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=func.now())
+    )
+
+
+async def rotate_refresh_token(
+    session: AsyncSession, token: str
+) -> tuple[str, str] | None:
+    """
+    Use up a refresh token, returning its user's id and the token replacing
+    it, or None if it isn't valid (anymore).
+    """
+    # Claiming the token in the same statement that finds it means two
+    # requests racing with the same token can't both succeed.
+    used = (
+        await session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == _digest(token),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(revoked_at=func.now())
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+        )
+    ).one_or_none()
+
+    if used is None:
+        # Presenting a token that was already rotated means someone else may
+        # have a copy of it, so end every session descended from the same login.
+        await _revoke_family(session, token)
+        await session.commit()
+        return None
+
+    user_id, family_id = used
+    new_token = create_refresh_token(session, user_id, family_id)
+    await session.commit()
+    return user_id, new_token
+
+
+async def revoke_refresh_token(session: AsyncSession, token: str) -> None:
+    """Log out: revoke the token and every token rotated from the same login."""
+    await _revoke_family(session, token)
+    await session.commit()
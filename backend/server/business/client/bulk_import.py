@@ -0,0 +1,286 @@
+# Bulk import clients from a streamed CSV or NDJSON upload.
+#
+# Rows are parsed as the upload arrives and COPYed straight into a temporary
+# staging table, which is then merged into client in a single statement, so
+# memory use doesn't depend on the size of the upload.
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.cache import invalidate_all_clients
+from server.business.client.schema import (
+    ClientImportFormat,
+    PClientCreate,
+    PClientImportResult,
+    PClientImportRowError,
+)
+from server.shared.cache import Cache
+from server.shared.ids import new_id
+
+# Bounds the size of the report for uploads that are mostly bad rows.
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_CSV_COLUMNS = ("email", "first_name", "last_name")
+
+# Bounds how much of the upload one CSV record (a quoted field left open, say)
+# can hold in memory before it is reported as an error.
+MAX_CSV_RECORD_LINES = 100
+
+# A row is either the raw fields of a client or the reason it couldn't be read.
+ParsedRow = tuple[int, dict[str, Any] | str]
+
+
+class ClientImportFormatError(ValueError):
+    """The upload as a whole can't be read, as opposed to individual rows."""
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # utf-8-sig drops the byte order mark spreadsheet exports like to add.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                yield line
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ClientImportFormatError("Upload is not valid UTF-8") from e
+    if pending:
+        yield pending
+
+
+def _ends_quoted(line: str, quoted: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of line, given whether one
+    was at its start. As in csv.reader, only a quote that starts a field opens
+    one; any other is part of the field.
+    """
+    field_start = not quoted
+    closing = False
+    for char in line:
+        if closing:
+            closing = False
+            if char == '"':
+                # Escaped, so the field goes on.
+                quoted = True
+                continue
+        if quoted:
+            if char == '"':
+                quoted = False
+                closing = True
+            continue
+        if char == '"' and field_start:
+            quoted = True
+        field_start = char == ","
+    return quoted
+
+
+async def _csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    header: list[str] | None = None
+    record: list[str] = []
+    start = 0
+    quoted = False
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not record:
+            start = line_number
+        record.append(line)
+        # A quoted field left open continues on the next line.
+        quoted = _ends_quoted(line, quoted)
+        if quoted:
+            if len(record) < MAX_CSV_RECORD_LINES:
+                continue
+            record = []
+            quoted = False
+            if header is None:
+                raise ClientImportFormatError(
+                    "Invalid CSV header: unterminated quoted field"
+                )
+            error = f"Invalid CSV: quoted field spans over {MAX_CSV_RECORD_LINES} lines"
+            yield start, error
+            continue
+
+        raw = "\n".join(record)
+        record = []
+        if not raw.strip():
+            continue
+        try:
+            fields = next(csv.reader([raw], strict=True))
+        except csv.Error as e:
+            if header is None:
+                raise ClientImportFormatError(f"Invalid CSV header: {e}") from e
+            yield start, f"Invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [field.strip() for field in fields]
+            missing = [c for c in REQUIRED_CSV_COLUMNS if c not in header]
+            if missing:
+                raise ClientImportFormatError(
+                    f"CSV header is missing columns: {', '.join(missing)}"
+                )
+        elif len(fields) != len(header):
+            yield start, f"Expected {len(header)} fields, got {len(fields)}"
+        else:
+            yield start, dict(zip(header, fields))
+
+    if record:
+        yield start, "Invalid CSV: unterminated quoted field"
+    if header is None:
+        raise ClientImportFormatError("CSV upload is empty")
+
+
+async def _ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        if isinstance(value, dict):
+            yield line_number, value
+        else:
+            yield line_number, "Expected a JSON object"
+
+
+def _validate(fields: dict[str, Any]) -> PClientCreate | str:
+    try:
+        data = PClientCreate.model_validate(fields)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        )
+    empty = [name for name, value in data if not value.strip()]
+    if empty:
+        return "; ".join(f"{name}: Must not be empty" for name in empty)
+    return data
+
+
+async def import_clients(
+    session: AsyncSession,
+    cache: Cache,
+    chunks: AsyncIterable[bytes],
+    format: ClientImportFormat,
+) -> PClientImportResult:
+    """
+    Create clients from the upload, updating the names of clients whose email
+    already exists. When several rows share an email the last one wins. Rows
+    that fail validation are reported and skipped; the valid rows are imported
+    in one transaction.
+    """
+    parse = _csv_rows if format == "csv" else _ndjson_rows
+    errors: list[PClientImportRowError] = []
+    error_count = 0
+
+    def report(line: int, error: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(PClientImportRowError(line=line, error=error))
+
+    await session.execute(
+        text(
+            "CREATE TEMPORARY TABLE client_import "
+            "(line integer NOT NULL, id uuid NOT NULL, email text NOT NULL, "
+            "first_name text NOT NULL, last_name text NOT NULL) "
+            "ON COMMIT DROP"
+        )
+    )
+
+    # COPY through the session's own connection, so that it is part of the
+    # same transaction as the staging table and the merge.
+    connection = await session.connection()
+    raw_connection = (await connection.get_raw_connection()).driver_connection
+    async with raw_connection.cursor() as cursor:
+        async with cursor.copy(
+            "COPY client_import (line, id, email, first_name, last_name) FROM STDIN"
+        ) as copy:
+            async for line, fields in parse(_lines(chunks)):
+                data = fields if isinstance(fields, str) else _validate(fields)
+                if isinstance(data, str):
+                    report(line, data)
+                    continue
+                # Ids are made here rather than by Postgres, which (before
+                # version 18) can't make time-ordered ones.
+                await copy.write_row(
+                    (
+                        line,
+                        new_id(),
+                        data.email.lower(),
+                        data.first_name,
+                        data.last_name,
+                    )
+                )
+
+    error_count += (
+        await session.execute(
+            text("SELECT count(*) - count(DISTINCT email) FROM client_import")
+        )
+    ).scalar_one()
+    superseded = await session.execute(
+        text(
+            "SELECT line, last_line FROM ("
+            "SELECT line, max(line) OVER (PARTITION BY email) AS last_line "
+            "FROM client_import) AS lines "
+            "WHERE line <> last_line ORDER BY line LIMIT :limit"
+        ),
+        {"limit": MAX_REPORTED_ERRORS - len(errors)},
+    )
+    errors.extend(
+        PClientImportRowError(
+            line=line, error=f"Superseded by line {last_line}, which has the same email"
+        )
+        for line, last_line in superseded
+    )
+    errors.sort(key=lambda error: error.line)
+
+    # Rows matching an existing client exactly are left alone by the WHERE
+    # clause and so aren't returned; they are counted as unchanged.
+    created, updated, staged = (
+        await session.execute(
+            text(
+                "WITH latest AS ("
+                "SELECT DISTINCT ON (email) id, email, first_name, last_name "
+                "FROM client_import ORDER BY email, line DESC"
+                "), merged AS ("
+                "INSERT INTO client (id, email, first_name, last_name) "
+                "SELECT id, email, first_name, last_name "
+                "FROM latest "
+                "ON CONFLICT (email) DO UPDATE SET "
+                "first_name = excluded.first_name, "
+                "last_name = excluded.last_name, "
+                "updated_at = now() "
+                "WHERE (client.first_name, client.last_name) IS DISTINCT FROM "
+                "(excluded.first_name, excluded.last_name) "
+                "RETURNING xmax = 0 AS inserted"
+                ") SELECT "
+                "count(*) FILTER (WHERE inserted), "
+                "count(*) FILTER (WHERE NOT inserted), "
+                "(SELECT count(*) FROM latest) "
+                "FROM merged"
+            )
+        )
+    ).one()
+    await session.commit()
+    if updated:
+        await invalidate_all_clients(cache)
+
+    return PClientImportResult(
+        created=created,
+        updated=updated,
+        unchanged=staged - created - updated,
+        error_count=error_count,
+        errors=errors,
+    )
@@ -0,0 +1,31 @@
+# Read-through caching of single clients.
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.get import get_client
+from server.business.client.schema import PClient
+from server.shared.cache import Cache
+
+# Every cached client lives in one namespace, so that bulk writes can
+# invalidate all of them at once.
+CLIENT_NAMESPACE = "client"
+
+
+async def get_client_cached(
+    session: AsyncSession, cache: Cache, client_id: str
+) -> PClient | None:
+    key = f"{await cache.namespace(CLIENT_NAMESPACE)}:{client_id}"
+    client = await cache.get_model(key, PClient)
+    if client is None:
+        # Missing clients aren't cached, so creating one invalidates nothing.
+        client = await get_client(session, client_id)
+        if client is not None:
+            await cache.set_model(key, client)
+    return client
+
+
+async def invalidate_client(cache: Cache, client_id: str) -> None:
+    await cache.delete(f"{await cache.namespace(CLIENT_NAMESPACE)}:{client_id}")
+
+
+async def invalidate_all_clients(cache: Cache) -> None:
+    await cache.invalidate_namespace(CLIENT_NAMESPACE)
@@ -1,19 +1,19 @@
 # Create a new client record.
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.business.client.schema import PClient, PClientCreate
 from server.data.models.client import Client
 
 
-def create_client(session: Session, data: PClientCreate) -> PClient:
+async def create_client(session: AsyncSession, data: PClientCreate) -> PClient:
     client = Client(
         email=data.email.lower(),
         first_name=data.first_name,
         last_name=data.last_name,
     )
     session.add(client)
-    session.commit()
-    session.refresh(client)
+    await session.commit()
+    await session.refresh(client)
     return PClient(
         id=client.id,
         email=client.email,
@@ -22,5 +22,6 @@ def create_client(session: Session, data: PClientCreate) -> PClient:
         assigned_user_id=client.assigned_user_id,
         created_at=client.created_at,
         updated_at=client.updated_at,
-        last_contacted_at=None,
+        last_contacted_at=client.last_contacted_at,
+        note_count=client.note_count,
     )
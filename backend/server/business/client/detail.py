@@ -0,0 +1,95 @@
+# Everything the client detail page shows, in one call.
+import asyncio
+from typing import get_args
+
+from sqlalchemy import func, select, true
+
+from server.business.client.cache import get_client_cached
+from server.business.client.schema import PClient, PClientAdvisor, PClientDetail
+from server.business.client_note.cache import list_client_notes_cached
+from server.business.client_note.schema import NoteCategory, PClientNote
+from server.data.models.client import Client
+from server.data.models.client_note import ClientNote
+from server.data.models.user import User
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
+from server.shared.ids import is_uuid
+from server.shared.pydantic import PPage
+
+
+async def _get_client_and_notes(
+    database: AsyncDatabaseManager, cache: Cache, client_id: str, limit: int
+) -> tuple[PClient | None, PPage[PClientNote]]:
+    # One after the other on one session, as both are usually cached and so
+    # need no connection at all.
+    async with database.create_session() as session:
+        client = await get_client_cached(session, cache, client_id)
+        notes = await list_client_notes_cached(session, cache, client_id, limit)
+        return client, notes
+
+
+async def _get_note_counts_and_advisor(
+    database: AsyncDatabaseManager, client_id: str, user_id: str | None
+) -> tuple[dict[NoteCategory, int], PClientAdvisor | None]:
+    counts = (
+        select(ClientNote.category, func.count().label("count"))
+        .where(ClientNote.client_id == client_id)
+        .group_by(ClientNote.category)
+        .subquery()
+    )
+    advisor = (
+        select(User.id, User.email)
+        .join(Client, Client.assigned_user_id == User.id)
+        .where(Client.id == client_id)
+        .subquery()
+    )
+    # One statement: a full join keeps the counts when there is no advisor,
+    # and the advisor when there are no notes to count.
+    async with database.create_read_session(user_id) as session:
+        rows = (
+            await session.execute(
+                select(counts.c.category, counts.c.count, advisor.c.id, advisor.c.email)
+                .select_from(counts)
+                .join(advisor, true(), full=True)
+            )
+        ).all()
+
+    note_counts = dict.fromkeys(get_args(NoteCategory), 0)
+    note_counts.update((row.category, row.count) for row in rows if row.category)
+    advisor_row = next((row for row in rows if row.id is not None), None)
+    return note_counts, (
+        None
+        if advisor_row is None
+        else PClientAdvisor(id=advisor_row.id, email=advisor_row.email)
+    )
+
+
+async def get_client_detail(
+    database: AsyncDatabaseManager,
+    cache: Cache,
+    client_id: str,
+    notes_limit: int,
+    user_id: str | None = None,
+) -> PClientDetail | None:
+    """
+    The client with the first page of its notes, its note counts by category
+    and its advisor.
+
+    The client and notes are read through the cache from the primary, and
+    the note counts and advisor in one statement from a replica on behalf of
+    user_id. An AsyncSession runs one statement at a time, so the two halves
+    get a session each and run at once: a view takes at most two pooled
+    connections, and usually one, as the cached half needs none.
+    """
+    if not is_uuid(client_id):
+        return None
+
+    (client, notes), (note_counts, advisor) = await asyncio.gather(
+        _get_client_and_notes(database, cache, client_id, notes_limit),
+        _get_note_counts_and_advisor(database, client_id, user_id),
+    )
+    if client is None:
+        return None
+    return PClientDetail(
+        client=client, notes=notes, note_counts=note_counts, advisor=advisor
+    )
@@ -0,0 +1,44 @@
+# Stream every client, oldest first, for exports.
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.schema import PClient
+from server.data.models.client import Client
+from server.shared.export import EXPORT_BATCH_SIZE
+
+
+async def export_clients(session: AsyncSession) -> AsyncIterator[list[PClient]]:
+    # session.stream reads through a server-side cursor, so only one batch of
+    # rows is held at a time. Plain columns avoid building ORM objects.
+    result = await session.stream(
+        select(
+            Client.id,
+            Client.email,
+            Client.first_name,
+            Client.last_name,
+            Client.assigned_user_id,
+            Client.created_at,
+            Client.updated_at,
+            Client.last_contacted_at,
+            Client.note_count,
+        )
+        .order_by(Client.created_at, Client.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async for rows in result.partitions():
+        yield [
+            PClient(
+                id=row.id,
+                email=row.email,
+                first_name=row.first_name,
+                last_name=row.last_name,
+                assigned_user_id=row.assigned_user_id,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+                last_contacted_at=row.last_contacted_at,
+                note_count=row.note_count,
+            )
+            for row in rows
+        ]
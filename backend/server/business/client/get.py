@@ -1,35 +1,61 @@
-# Fetch a single client by ID.
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+# Fetch clients by ID.
+import uuid
+from typing import Any
 
-from server.business.client.schema import PClient
+from sqlalchemy import ARRAY, any_, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.schema import PClient, PClientBatchGetResponse
 from server.data.models.client import Client
-from server.data.models.client_note import ClientNote
+from server.shared.ids import is_uuid
 
 
-def get_client(session: Session, client_id: str) -> PClient | None:
-    last_note_subq = (
-        select(
-            ClientNote.client_id,
-            func.max(ClientNote.created_at).label("last_contacted_at"),
-        )
-        .group_by(ClientNote.client_id)
-        .subquery()
-    )
+async def get_client(session: AsyncSession, client_id: str) -> PClient | None:
+    # Nothing else can be an id, and Postgres would reject it as one.
+    if not is_uuid(client_id):
+        return None
+
+    client = (
+        await session.execute(select(Client).where(Client.id == client_id))
+    ).scalar_one_or_none()
+
+    if client is None:
+        return None
 
-    row = (
-        session.execute(
-            select(Client, last_note_subq.c.last_contacted_at)
-            .outerjoin(last_note_subq, Client.id == last_note_subq.c.client_id)
-            .where(Client.id == client_id)
+    return _to_pclient(client)
+
+
+async def get_clients(
+    session: AsyncSession, client_ids: list[str]
+) -> PClientBatchGetResponse:
+    """
+    The clients with the given ids, in the order asked for, with the ids that
+    don't match a client.
+    """
+    # In the form Postgres gives ids back in, as any case of a uuid is the
+    # same id.
+    client_ids = list(
+        dict.fromkeys(str(uuid.UUID(id)) if is_uuid(id) else id for id in client_ids)
+    )
+    candidates = [id for id in client_ids if is_uuid(id)]
+    # A single array parameter rather than IN with one parameter per id, so
+    # that the statement is the same however many ids there are.
+    clients = (
+        await session.execute(
+            select(Client).where(
+                Client.id == any_(literal(candidates, ARRAY(Client.id.type)))
+            )
         )
-        .one_or_none()
+    ).scalars()
+    by_id = {client.id: client for client in clients}
+
+    return PClientBatchGetResponse(
+        data=[_to_pclient(by_id[id]) for id in client_ids if id in by_id],
+        missing_ids=[id for id in client_ids if id not in by_id],
     )
 
-    if row is None:
-        return None
 
-    client, last_contacted_at = row
+def _to_pclient(client: Client) -> PClient:
     return PClient(
         id=client.id,
         email=client.email,
@@ -38,5 +64,14 @@ def get_client(session: Session, client_id: str) -> PClient | None:
         assigned_user_id=client.assigned_user_id,
         created_at=client.created_at,
         updated_at=client.updated_at,
-        last_contacted_at=last_contacted_at,
+        last_contacted_at=client.last_contacted_at,
+        note_count=client.note_count,
     )
+
+
+def client_version(client: PClient) -> list[Any]:
+    """
+    Values that change whenever the client does, or a note is added to it, for
+    ETags.
+    """
+    return [client.updated_at, client.note_count, client.last_contacted_at]
@@ -1,40 +1,211 @@
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from typing import Any
 
-from server.business.client.schema import PClient
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Row,
+    Select,
+    func,
+    literal,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.get import client_version
+from server.business.client.schema import ClientSort, PClient, SortDirection
 from server.data.models.client import Client
-from server.data.models.client_note import ClientNote
+from server.shared.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+    parse_cursor_id,
+    parse_cursor_string,
+)
+from server.shared.pydantic import PPage
+
+# Never-contacted clients sort as the oldest, i.e. last when showing the most
+# recently contacted first. Coalescing instead of using NULLS FIRST/LAST keeps
+# the keyset condition a plain row comparison that the index can seek to.
+NEVER_CONTACTED = literal_column("'-infinity'::timestamp")
+LAST_CONTACTED_AT_KEY = func.coalesce(Client.last_contacted_at, NEVER_CONTACTED)
+
+# Each sort is unique (ending with Client.id where needed) so that the order is
+# total and a cursor always points at exactly one row. Each has a matching
+# index on client.
+SORT_COLUMNS: dict[ClientSort, tuple[ColumnElement[Any], ...]] = {
+    "name": (Client.first_name, Client.last_name, Client.id),
+    "email": (Client.email,),
+    "created_at": (Client.created_at, Client.id),
+    "last_contacted_at": (LAST_CONTACTED_AT_KEY, Client.id),
+}
+
+# The columns _sort_key reads, besides those of client_version.
+SORT_KEY_COLUMNS: dict[ClientSort, tuple[ColumnElement[Any], ...]] = {
+    "name": (Client.first_name, Client.last_name),
+    "email": (Client.email,),
+    "created_at": (Client.created_at,),
+    "last_contacted_at": (),
+}
+
+DEFAULT_SORT_DIRECTION: dict[ClientSort, SortDirection] = {
+    "name": "asc",
+    "email": "asc",
+    "created_at": "desc",
+    "last_contacted_at": "desc",
+}
+
+
+def _sort_key(client: Client | Row[Any], sort: ClientSort) -> list[Any]:
+    if sort == "name":
+        return [client.first_name, client.last_name, client.id]
+    if sort == "email":
+        return [client.email]
+    if sort == "created_at":
+        return [client.created_at, client.id]
+    return [client.last_contacted_at, client.id]
 
 
-def list_clients(session: Session) -> list[PClient]:
-    last_note_subq = (
-        select(
-            ClientNote.client_id,
-            func.max(ClientNote.created_at).label("last_contacted_at"),
+def _parse_cursor(cursor: str, sort: ClientSort, direction: SortDirection) -> list[Any]:
+    values = decode_cursor(cursor)
+    # A cursor only makes sense for the ordering it was issued for.
+    if values[:2] != [sort, direction] or len(values) != len(SORT_COLUMNS[sort]) + 2:
+        raise InvalidCursorError("Cursor does not match the requested sort")
+
+    values = values[2:]
+    if sort != "email":
+        values[-1] = literal(parse_cursor_id(values[-1]), Client.id.type)
+    if sort == "name":
+        values[:2] = [parse_cursor_string(value) for value in values[:2]]
+    elif sort == "email":
+        values[0] = parse_cursor_string(values[0])
+    elif sort == "created_at":
+        values[0] = parse_cursor_datetime(values[0])
+        if values[0] is None:
+            raise InvalidCursorError("Invalid cursor")
+    elif sort == "last_contacted_at":
+        values[0] = func.coalesce(
+            literal(parse_cursor_datetime(values[0]), DateTime), NEVER_CONTACTED
         )
-        .group_by(ClientNote.client_id)
-        .subquery()
+    return values
+
+
+def _page_query(
+    entities: tuple[Any, ...],
+    limit: int,
+    sort: ClientSort,
+    direction: SortDirection,
+    cursor: str | None,
+) -> Select[Any]:
+    columns = SORT_COLUMNS[sort]
+    if direction == "asc":
+        query = select(*entities).order_by(*(column.asc() for column in columns))
+    else:
+        query = select(*entities).order_by(*(column.desc() for column in columns))
+
+    if cursor is not None:
+        values = _parse_cursor(cursor, sort, direction)
+        if direction == "asc":
+            query = query.where(tuple_(*columns) > tuple_(*values))
+        else:
+            query = query.where(tuple_(*columns) < tuple_(*values))
+
+    # Fetch one extra row to find out whether there is another page.
+    return query.limit(limit + 1)
+
+
+async def list_clients_version(
+    session: AsyncSession,
+    limit: int,
+    sort: ClientSort = "name",
+    direction: SortDirection | None = None,
+    cursor: str | None = None,
+) -> tuple[list[Any], list[str], str | None]:
+    """
+    The clients_page_version of the page list_clients would return, read from
+    only the columns it takes, along with that page's client ids (for
+    get_clients to load if the version turns out to have changed) and
+    next_cursor.
+    """
+    direction = direction or DEFAULT_SORT_DIRECTION[sort]
+    query = _page_query(
+        (
+            Client.id,
+            Client.updated_at,
+            Client.note_count,
+            Client.last_contacted_at,
+            *SORT_KEY_COLUMNS[sort],
+        ),
+        limit,
+        sort,
+        direction,
+        cursor,
     )
 
-    rows = (
-        session.execute(
-            select(Client, last_note_subq.c.last_contacted_at).outerjoin(
-                last_note_subq, Client.id == last_note_subq.c.client_id
+    rows = (await session.execute(query)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([sort, direction, *_sort_key(rows[-1], sort)])
+
+    # The same values, in the same order, as client_version.
+    version = [
+        [
+            [row.id, row.updated_at, row.note_count, row.last_contacted_at]
+            for row in rows
+        ],
+        next_cursor,
+    ]
+    return version, [row.id for row in rows], next_cursor
+
+
+async def list_clients(
+    session: AsyncSession,
+    limit: int,
+    sort: ClientSort = "name",
+    direction: SortDirection | None = None,
+    cursor: str | None = None,
+) -> PPage[PClient]:
+    direction = direction or DEFAULT_SORT_DIRECTION[sort]
+    query = _page_query((Client,), limit, sort, direction, cursor)
+
+    clients = (await session.execute(query)).scalars().all()
+    has_more = len(clients) > limit
+    clients = clients[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor([sort, direction, *_sort_key(clients[-1], sort)])
+
+    return PPage(
+        data=[
+            PClient(
+                id=client.id,
+                email=client.email,
+                first_name=client.first_name,
+                last_name=client.last_name,
+                assigned_user_id=client.assigned_user_id,
+                created_at=client.created_at,
+                updated_at=client.updated_at,
+                last_contacted_at=client.last_contacted_at,
+                note_count=client.note_count,
             )
-        )
-        .all()
+            for client in clients
+        ],
+        next_cursor=next_cursor,
     )
 
+
+def clients_page_version(page: PPage[PClient]) -> list[Any]:
+    """
+    Values that change whenever the page does, for ETags: which clients are
+    on it, what changes about them, and whether there are more.
+    """
     return [
-        PClient(
-            id=client.id,
-            email=client.email,
-            first_name=client.first_name,
-            last_name=client.last_name,
-            assigned_user_id=client.assigned_user_id,
-            created_at=client.created_at,
-            updated_at=client.updated_at,
-            last_contacted_at=last_contacted_at,
-        )
-        for client, last_contacted_at in rows
+        [[client.id, *client_version(client)] for client in page.data],
+        page.next_cursor,
     ]
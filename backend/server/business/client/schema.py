@@ -1,6 +1,11 @@
 from datetime import datetime
+from typing import Literal
 
-from server.shared.pydantic import BaseModel
+from server.business.client_note.schema import NoteCategory, PClientNote
+from server.shared.pydantic import BaseModel, Field, PPage
+
+ClientSort = Literal["name", "email", "created_at", "last_contacted_at"]
+SortDirection = Literal["asc", "desc"]
 
 
 class PClient(BaseModel):
@@ -12,9 +17,58 @@ class PClient(BaseModel):
     created_at: datetime
     updated_at: datetime
     last_contacted_at: datetime | None
+    note_count: int
+
+
+# Enough for any page of clients, while keeping the query a single index probe
+# per id.
+MAX_BATCH_GET_IDS = 100
+
+
+class PClientBatchGetRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_GET_IDS)
+
+
+class PClientBatchGetResponse(BaseModel):
+    # In the order requested, without duplicates.
+    data: list[PClient]
+    missing_ids: list[str]
 
 
 class PClientCreate(BaseModel):
     email: str
     first_name: str
     last_name: str
+
+
+ClientImportFormat = Literal["csv", "ndjson"]
+
+
+class PClientImportRowError(BaseModel):
+    # 1-based line in the upload where the row starts.
+    line: int
+    error: str
+
+
+class PClientImportResult(BaseModel):
+    created: int
+    updated: int
+    # Rows matching an existing client exactly.
+    unchanged: int
+    error_count: int
+    # The first MAX_REPORTED_ERRORS of error_count.
+    errors: list[PClientImportRowError]
+
+
+class PClientAdvisor(BaseModel):
+    id: str
+    email: str
+
+
+class PClientDetail(BaseModel):
+    client: PClient
+    # The first page of the client's notes, newest first.
+    notes: PPage[PClientNote]
+    # Every category, including those without notes.
+    note_counts: dict[NoteCategory, int]
+    advisor: PClientAdvisor | None
@@ -0,0 +1,82 @@
+# Typeahead search for clients by name and email, best matches first.
+from typing import Any
+
+from sqlalchemy import ColumnElement, Float, and_, case, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client.schema import PClient
+from server.data.models.client import Client
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+# Each of these has a gin_trgm_ops index that serves both the prefix (ILIKE)
+# and fuzzy (%>) conditions below.
+SEARCH_COLUMNS = (Client.first_name, Client.last_name, Client.email)
+
+# Trigram matching needs a few characters to say anything useful; shorter
+# terms are matched by prefix only.
+MIN_FUZZY_TERM_LENGTH = 3
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _match_term(term: str) -> tuple[ColumnElement[bool], ColumnElement[Any]]:
+    """Return the condition for one search term and its contribution to the
+    rank: word similarity to the closest column, plus 1 for a prefix match."""
+    pattern = f"{_escape_like(term)}%"
+    prefix = or_(*(column.ilike(pattern, escape="\\") for column in SEARCH_COLUMNS))
+    score = case((prefix, 1.0), else_=0.0)
+    if len(term) < MIN_FUZZY_TERM_LENGTH:
+        return prefix, score
+
+    fuzzy = or_(*(column.op("%>")(term) for column in SEARCH_COLUMNS))
+    similarity = func.greatest(
+        *(
+            func.word_similarity(literal(term), column, type_=Float)
+            for column in SEARCH_COLUMNS
+        )
+    )
+    return or_(prefix, fuzzy), score + similarity
+
+
+async def search_clients(
+    session: AsyncSession, query: str, limit: int = DEFAULT_SEARCH_LIMIT
+) -> list[PClient]:
+    terms = query.split()
+    if not terms:
+        return []
+
+    # Every term has to match some column, so "jane do" finds Jane Doe.
+    matches = [_match_term(term) for term in terms]
+    rank = sum((score for _, score in matches[1:]), matches[0][1])
+
+    clients = (
+        (
+            await session.execute(
+                select(Client)
+                .where(and_(*(condition for condition, _ in matches)))
+                .order_by(rank.desc(), Client.last_name, Client.first_name, Client.id)
+                .limit(limit)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    return [
+        PClient(
+            id=client.id,
+            email=client.email,
+            first_name=client.first_name,
+            last_name=client.last_name,
+            assigned_user_id=client.assigned_user_id,
+            created_at=client.created_at,
+            updated_at=client.updated_at,
+            last_contacted_at=client.last_contacted_at,
+            note_count=client.note_count,
+        )
+        for client in clients
+    ]
@@ -0,0 +1,35 @@
+# Read-through caching of pages of a client's notes.
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client_note.list import list_client_notes
+from server.business.client_note.schema import PClientNote
+from server.shared.cache import Cache
+from server.shared.pydantic import PPage
+
+
+def _namespace(client_id: str) -> str:
+    # One namespace per client, as a new note can change any of its pages.
+    return f"client_note:{client_id}"
+
+
+async def list_client_notes_cached(
+    session: AsyncSession,
+    cache: Cache,
+    client_id: str,
+    limit: int,
+    before: str | None = None,
+    after: str | None = None,
+) -> PPage[PClientNote]:
+    namespace = await cache.namespace(_namespace(client_id))
+    key = f"{namespace}:{limit}:{before or ''}:{after or ''}"
+    page = await cache.get_model(key, PPage[PClientNote])
+    if page is None:
+        page = await list_client_notes(
+            session, client_id, limit, before=before, after=after
+        )
+        await cache.set_model(key, page)
+    return page
+
+
+async def invalidate_client_notes(cache: Cache, client_id: str) -> None:
+    await cache.invalidate_namespace(_namespace(client_id))
@@ -1,18 +1,30 @@
 # Create a new note on a client.
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.business.client.cache import invalidate_client
+from server.business.client_note.cache import invalidate_client_notes
+from server.business.client_note.feed import notify_client_note
 from server.business.client_note.schema import PClientNote, PClientNoteCreate
+from server.data.models.client import Client
 from server.data.models.client_note import ClientNote
 from server.data.models.user import User
+from server.shared.cache import Cache
+from server.shared.ids import is_uuid
 
 
-def create_client_note(
-    session: Session,
+async def create_client_note(
+    session: AsyncSession,
+    cache: Cache,
     client_id: str,
     creator_user_id: str,
     data: PClientNoteCreate,
-) -> PClientNote:
+) -> PClientNote | None:
+    """The new note, or None if client_id can't be a client's id."""
+    # Postgres would reject it as the note's client_id when flushing.
+    if not is_uuid(client_id):
+        return None
+
     note = ClientNote(
         client_id=client_id,
         creator_user_id=creator_user_id,
@@ -20,13 +32,33 @@ def create_client_note(
         category=data.category,
     )
     session.add(note)
-    session.commit()
-    session.refresh(note)
+    # now() is the transaction start time, so this matches the note's
+    # created_at exactly. A transaction that started earlier can still commit
+    # after one that started later, so never move last_contacted_at back
+    # (greatest ignores the NULL of a client never contacted). A new note
+    # isn't an edit to the client record, so leave updated_at alone.
+    await session.execute(
+        update(Client)
+        .where(Client.id == client_id)
+        .values(
+            last_contacted_at=func.greatest(Client.last_contacted_at, func.now()),
+            note_count=Client.note_count + 1,
+            updated_at=Client.updated_at,
+        )
+    )
+    # Delivered by Postgres on commit, so followers only hear of the note
+    # once they can read it.
+    await notify_client_note(session, client_id)
+    await session.commit()
+    # Only once committed: invalidating earlier would let a concurrent read
+    # cache the old state again before the commit lands.
+    await invalidate_client(cache, client_id)
+    await invalidate_client_notes(cache, client_id)
+    await session.refresh(note)
 
     creator_email = (
-        session.execute(select(User.email).where(User.id == creator_user_id))
-        .scalar_one()
-    )
+        await session.execute(select(User.email).where(User.id == creator_user_id))
+    ).scalar_one()
 
     return PClientNote(
         id=note.id,
@@ -0,0 +1,45 @@
+# Stream every client note, grouped by client and oldest first, for exports.
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client_note.schema import PClientNote
+from server.data.models.client_note import ClientNote
+from server.data.models.user import User
+from server.shared.export import EXPORT_BATCH_SIZE
+
+
+async def export_client_notes(
+    session: AsyncSession,
+) -> AsyncIterator[list[PClientNote]]:
+    # session.stream reads through a server-side cursor, so only one batch of
+    # rows is held at a time. The order follows
+    # ix_client_note_client_id_created_at_id.
+    result = await session.stream(
+        select(
+            ClientNote.id,
+            ClientNote.client_id,
+            ClientNote.creator_user_id,
+            User.email,
+            ClientNote.content,
+            ClientNote.category,
+            ClientNote.created_at,
+        )
+        .join(User, ClientNote.creator_user_id == User.id)
+        .order_by(ClientNote.client_id, ClientNote.created_at, ClientNote.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    async for rows in result.partitions():
+        yield [
+            PClientNote(
+                id=row.id,
+                client_id=row.client_id,
+                creator_user_id=row.creator_user_id,
+                creator_name=row.email,
+                content=row.content,
+                category=row.category,
+                created_at=row.created_at,
+            )
+            for row in rows
+        ]
@@ -0,0 +1,89 @@
+# Live feed of new notes on a client, driven by Postgres notifications.
+import asyncio
+import uuid
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client_note.list import (
+    list_client_notes,
+    note_cursor,
+    parse_note_cursor,
+)
+from server.business.client_note.schema import PClientNote
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.listener import PgListener
+from server.shared.pagination import encode_cursor
+from server.shared.querymonitor import allow_repeated_queries
+
+# Notified with the client's id whenever a note is added to it.
+NOTE_CHANNEL = "client_note"
+
+# A cursor before every note, for clients that had none when the feed
+# started.
+START_CURSOR = encode_cursor([datetime.min, str(uuid.UUID(int=0))])
+
+# Notes read at a time when catching up.
+FEED_BATCH_SIZE = 100
+
+
+async def notify_client_note(session: AsyncSession, client_id: str) -> None:
+    """Notify followers of the client once the session's transaction commits."""
+    await session.execute(select(func.pg_notify(NOTE_CHANNEL, client_id)))
+
+
+async def note_feed_cursor(
+    session: AsyncSession, client_id: str, last_event_id: str | None
+) -> str:
+    """
+    Where a feed starts: after the last note the follower saw, if it is
+    resuming, otherwise after the newest note so far.
+    """
+    if last_event_id is not None:
+        parse_note_cursor(last_event_id)
+        return last_event_id
+    newest = await list_client_notes(session, client_id, 1)
+    return newest.prev_cursor or START_CURSOR
+
+
+async def follow_client_notes(
+    database: AsyncDatabaseManager,
+    listener: PgListener,
+    client_id: str,
+    cursor: str,
+    heartbeat_seconds: float,
+) -> AsyncIterator[tuple[str, PClientNote] | None]:
+    """
+    Yields the client's notes after cursor, oldest first, each with its own
+    cursor to resume from, and then new notes as they are added. Yields None
+    whenever heartbeat_seconds pass without a note.
+
+    Sessions are only opened to read new notes, so a follower holds no
+    database connection while it waits.
+    """
+    # Reads the same page of notes on every notification, by design.
+    allow_repeated_queries()
+    async with listener.subscribe(client_id) as notified:
+        while True:
+            # Cleared before reading, so that a note added while reading
+            # wakes the next wait rather than being missed.
+            notified.clear()
+            while True:
+                # On the primary: notifications are sent on commit, when a
+                # replica may not have the note yet.
+                async with database.create_session() as session:
+                    page = await list_client_notes(
+                        session, client_id, FEED_BATCH_SIZE, after=cursor
+                    )
+                for note in reversed(page.data):
+                    cursor = note_cursor(note)
+                    yield cursor, note
+                if len(page.data) < FEED_BATCH_SIZE:
+                    break
+
+            try:
+                await asyncio.wait_for(notified.wait(), heartbeat_seconds)
+            except TimeoutError:
+                yield None
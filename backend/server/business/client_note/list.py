@@ -1,31 +1,108 @@
-# List notes for a given client.
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+# List notes for a given client, newest first.
+from datetime import datetime
+
+from sqlalchemy import Tuple, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.business.client_note.schema import PClientNote
 from server.data.models.client_note import ClientNote
 from server.data.models.user import User
+from server.shared.ids import is_uuid
+from server.shared.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_datetime,
+    parse_cursor_id,
+)
+from server.shared.pydantic import PPage
+
+
+def note_cursor(note: ClientNote | PClientNote) -> str:
+    return encode_cursor([note.created_at, note.id])
+
+
+def parse_note_cursor(cursor: str) -> tuple[datetime, str]:
+    values = decode_cursor(cursor)
+    if len(values) != 2:
+        raise InvalidCursorError("Invalid cursor")
+    created_at = parse_cursor_datetime(values[0])
+    if created_at is None:
+        raise InvalidCursorError("Invalid cursor")
+    return created_at, parse_cursor_id(values[1])
+
+
+def _cursor_key(cursor: str) -> Tuple:
+    created_at, id = parse_note_cursor(cursor)
+    return tuple_(created_at, literal(id, ClientNote.id.type))
+
+
+async def list_client_notes(
+    session: AsyncSession,
+    client_id: str,
+    limit: int,
+    before: str | None = None,
+    after: str | None = None,
+) -> PPage[PClientNote]:
+    """
+    Notes are always returned newest first. `before` pages back through older
+    notes, `after` fetches the notes newer than a cursor (e.g. to pick up notes
+    added since the page was loaded). The response's next_cursor is the
+    `before` for the following page, and prev_cursor is the `after` for
+    anything newer than this page.
+    """
+    if before is not None and after is not None:
+        raise InvalidCursorError("Pass either before or after, not both")
+    # No client has any other id, and Postgres would reject it as one.
+    if not is_uuid(client_id):
+        return PPage(data=[], next_cursor=None, prev_cursor=None)
+
+    key = tuple_(ClientNote.created_at, ClientNote.id)
+    query = (
+        select(ClientNote, User.email)
+        .join(User, ClientNote.creator_user_id == User.id)
+        .where(ClientNote.client_id == client_id)
+    )
+    if after is None:
+        query = query.order_by(ClientNote.created_at.desc(), ClientNote.id.desc())
+        if before is not None:
+            query = query.where(key < _cursor_key(before))
+    else:
+        # Walk forwards from the cursor so the limit keeps the notes closest
+        # to it, then flip the page back to newest first.
+        query = query.order_by(ClientNote.created_at.asc(), ClientNote.id.asc())
+        query = query.where(key > _cursor_key(after))
+
+    # Fetch one extra row to find out whether there is another page.
+    rows = (await session.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after is not None:
+        rows.reverse()
+
+    if not rows:
+        # Nothing newer than `after` yet, so hand the same cursor back.
+        return PPage(data=[], next_cursor=None, prev_cursor=after)
 
+    # Going forwards there are always older notes (at least the one the cursor
+    # points at), going backwards only if the extra row came back.
+    older_exists = after is not None or has_more
+    next_cursor = note_cursor(rows[-1][0]) if older_exists else None
+    prev_cursor = note_cursor(rows[0][0])
 
-def list_client_notes(session: Session, client_id: str) -> list[PClientNote]:
-    rows = (
-        session.execute(
-            select(ClientNote, User.email)
-            .join(User, ClientNote.creator_user_id == User.id)
-            .where(ClientNote.client_id == client_id)
-            .order_by(ClientNote.created_at.desc())
-        )
-        .all()
+    return PPage(
+        data=[
+            PClientNote(
+                id=note.id,
+                client_id=note.client_id,
+                creator_user_id=note.creator_user_id,
+                creator_name=email,
+                content=note.content,
+                category=note.category,
+                created_at=note.created_at,
+            )
+            for note, email in rows
+        ],
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
     )
-    return [
-        PClientNote(
-            id=note.id,
-            client_id=note.client_id,
-            creator_user_id=note.creator_user_id,
-            creator_name=email,
-            content=note.content,
-            category=note.category,
-            created_at=note.created_at,
-        )
-        for note, email in rows
-    ]
@@ -20,3 +20,13 @@ class PClientNote(BaseModel):
 class PClientNoteCreate(BaseModel):
     content: str
     category: NoteCategory = "note"
+
+
+class PClientNoteSearchResult(BaseModel):
+    note: PClientNote
+    client_first_name: str
+    client_last_name: str
+    # The best matching fragments of the note as HTML: the note's text is
+    # escaped, and matched terms are wrapped in <mark></mark>.
+    snippet: str
+    rank: float
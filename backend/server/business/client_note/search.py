@@ -0,0 +1,130 @@
+# Full-text search over all client notes, best matches first.
+import html
+
+from sqlalchemy import REAL, cast, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.client_note.schema import PClientNote, PClientNoteSearchResult
+from server.data.models.client import Client
+from server.data.models.client_note import ClientNote
+from server.data.models.user import User
+from server.shared.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    parse_cursor_id,
+)
+from server.shared.pydantic import PPage
+
+# Must match the configuration client_note.content_tsv is generated with, or
+# the GIN index can't be used.
+SEARCH_CONFIG = "english"
+# Matches are marked with control characters rather than <mark> tags, so that
+# the note's own text can be HTML-escaped around them afterwards.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, "
+    "MaxFragments=2, MaxWords=30, MinWords=10"
+)
+
+
+def _snippet(headline: str) -> str:
+    return (
+        html.escape(headline)
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+def _parse_cursor(cursor: str, query: str) -> tuple[float, str]:
+    values = decode_cursor(cursor)
+    # A cursor only makes sense for the search it was issued for.
+    if (
+        len(values) != 3
+        or values[0] != query
+        or not isinstance(values[1], (int, float))
+    ):
+        raise InvalidCursorError("Cursor does not match the search")
+    return float(values[1]), parse_cursor_id(values[2])
+
+
+async def search_client_notes(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    cursor: str | None = None,
+) -> PPage[PClientNoteSearchResult]:
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank = func.ts_rank_cd(ClientNote.content_tsv, ts_query, type_=REAL)
+
+    # Rank the matches (found through the GIN index) and pick the page first,
+    # so that the expensive ts_headline only runs for the rows returned.
+    matches = (
+        select(ClientNote.id, rank.label("rank"))
+        .where(ClientNote.content_tsv.bool_op("@@")(ts_query))
+        .order_by(rank.desc(), ClientNote.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        cursor_rank, cursor_id = _parse_cursor(cursor, query)
+        # ts_rank_cd returns real; compare the cursor's rank as real too, or
+        # widening it to double precision skips rows that tie with it.
+        matches = matches.where(
+            tuple_(rank, ClientNote.id)
+            < tuple_(
+                cast(literal(cursor_rank), REAL),
+                literal(cursor_id, ClientNote.id.type),
+            )
+        )
+    page = matches.subquery()
+
+    rows = (
+        await session.execute(
+            select(
+                ClientNote,
+                User.email,
+                Client.first_name,
+                Client.last_name,
+                page.c.rank,
+                func.ts_headline(
+                    SEARCH_CONFIG, ClientNote.content, ts_query, HEADLINE_OPTIONS
+                ),
+            )
+            .join(page, ClientNote.id == page.c.id)
+            .join(User, ClientNote.creator_user_id == User.id)
+            .join(Client, ClientNote.client_id == Client.id)
+            .order_by(page.c.rank.desc(), page.c.id.desc())
+        )
+    ).all()
+
+    # Fetch one extra row to find out whether there is another page.
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last_note, *_, last_rank, _ = rows[-1]
+        next_cursor = encode_cursor([query, last_rank, last_note.id])
+
+    return PPage(
+        data=[
+            PClientNoteSearchResult(
+                note=PClientNote(
+                    id=note.id,
+                    client_id=note.client_id,
+                    creator_user_id=note.creator_user_id,
+                    creator_name=email,
+                    content=note.content,
+                    category=note.category,
+                    created_at=note.created_at,
+                ),
+                client_first_name=first_name,
+                client_last_name=last_name,
+                snippet=_snippet(headline),
+                rank=note_rank,
+            )
+            for note, email, first_name, last_name, note_rank, headline in rows
+        ],
+        next_cursor=next_cursor,
+    )
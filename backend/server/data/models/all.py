@@ -1,3 +1,4 @@
 import server.data.models.client  # noqa
 import server.data.models.client_note  # noqa
+import server.data.models.refresh_token  # noqa
 import server.data.models.user  # noqa
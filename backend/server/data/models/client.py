@@ -1,12 +1,12 @@
 from typing import TYPE_CHECKING
-import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Uuid, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from server.data.models.base import Base
+from server.shared.ids import new_id
 
 if TYPE_CHECKING:
     from server.data.models.user import User
@@ -14,15 +14,35 @@ if TYPE_CHECKING:
 
 class Client(Base):
     __tablename__ = "client"
+    # Backing indexes for each sort order offered by list_clients.
+    __table_args__ = (
+        Index("ix_client_first_name_last_name_id", "first_name", "last_name", "id"),
+        Index("ix_client_created_at_id", "created_at", "id"),
+        Index(
+            "ix_client_last_contacted_at_id",
+            text("coalesce(last_contacted_at, '-infinity'::timestamp)"),
+            "id",
+        ),
+        # Trigram indexes for search_clients' prefix and fuzzy matching.
+        *(
+            Index(
+                f"ix_client_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("first_name", "last_name", "email")
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        Uuid(as_uuid=False), primary_key=True, default=new_id
     )
     email: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     first_name: Mapped[str] = mapped_column(String, nullable=False)
     last_name: Mapped[str] = mapped_column(String, nullable=False)
     assigned_user_id: Mapped[str | None] = mapped_column(
-        String, ForeignKey("user.id"), nullable=True
+        Uuid(as_uuid=False), ForeignKey("user.id"), nullable=True, index=True
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now()
@@ -30,6 +50,14 @@ class Client(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
     )
+    # Denormalized from client_note and maintained by create_client_note, so
+    # that reading a client never has to aggregate over its notes.
+    last_contacted_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True
+    )
+    note_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
 
     assigned_user: Mapped["User | None"] = relationship(
         "User", foreign_keys=[assigned_user_id]
@@ -1,14 +1,24 @@
 # ClientNote model — stores advisor notes on clients.
 from typing import TYPE_CHECKING
 
-import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import (
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    Uuid,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from server.data.models.base import Base
+from server.shared.ids import new_id
 
 if TYPE_CHECKING:
     from server.data.models.client import Client
@@ -17,15 +27,26 @@ if TYPE_CHECKING:
 
 class ClientNote(Base):
     __tablename__ = "client_note"
+    # Matches list_client_notes' keyset order, so any page of a client's notes
+    # is a single index range scan.
+    __table_args__ = (
+        Index(
+            "ix_client_note_client_id_created_at_id",
+            "client_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        Index("ix_client_note_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
 
     id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        Uuid(as_uuid=False), primary_key=True, default=new_id
     )
     client_id: Mapped[str] = mapped_column(
-        String, ForeignKey("client.id"), nullable=False
+        Uuid(as_uuid=False), ForeignKey("client.id"), nullable=False
     )
     creator_user_id: Mapped[str] = mapped_column(
-        String, ForeignKey("user.id"), nullable=False
+        Uuid(as_uuid=False), ForeignKey("user.id"), nullable=False, index=True
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     category: Mapped[str] = mapped_column(
@@ -34,6 +55,13 @@ class ClientNote(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now()
     )
+    # Full-text search document for search_client_notes, kept up to date by
+    # Postgres. Deferred so that loading notes doesn't fetch it.
+    content_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', content)", persisted=True),
+        deferred=True,
+    )
 
     client: Mapped["Client"] = relationship("Client", foreign_keys=[client_id])
     creator: Mapped["User"] = relationship("User", foreign_keys=[creator_user_id])
@@ -0,0 +1,34 @@
+# RefreshToken model — long-lived tokens exchanged for new access tokens.
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, String, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from server.data.models.base import Base
+from server.shared.ids import new_id
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_token"
+
+    id: Mapped[str] = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=new_id
+    )
+    user_id: Mapped[str] = mapped_column(
+        Uuid(as_uuid=False), ForeignKey("user.id"), nullable=False, index=True
+    )
+    # Only a SHA-256 digest of the token is stored, so a leaked table can't be
+    # used to log in. Tokens are random, so they don't need a slow hash.
+    token_hash: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    # Every token rotated from the same login shares a family, so that the
+    # whole chain can be revoked when a used token is presented again.
+    family_id: Mapped[str] = mapped_column(
+        Uuid(as_uuid=False), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Set once the token has been used (rotated) or the session logged out.
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
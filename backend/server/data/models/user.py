@@ -1,18 +1,18 @@
-import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import DateTime, String, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
 from server.data.models.base import Base
+from server.shared.ids import new_id
 
 
 class User(Base):
     __tablename__ = "user"
 
     id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=lambda: str(uuid.uuid4())
+        Uuid(as_uuid=False), primary_key=True, default=new_id
     )
     email: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     password_hashed: Mapped[str | None] = mapped_column(String, nullable=True)
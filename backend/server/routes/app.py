@@ -1,20 +1,44 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.password import PasswordHasher
+from server.business.client_note.feed import NOTE_CHANNEL
 from server.routes.routes import get_all_routes
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import create_cache
 from server.shared.config import Config, Env
-from server.shared.databasemanager import DatabaseManager
+from server.shared.listener import PgListener
+from server.shared.metrics import Metrics, MetricsMiddleware
+from server.shared.querymonitor import QueryMonitor, QueryMonitorMiddleware
 
 load_dotenv()
 
 config = Config.from_env()
-database = DatabaseManager.from_url(config.database_url)
+database = AsyncDatabaseManager.from_config(config, QueryMonitor.from_config(config))
 auth_verifier = AuthVerifier(config)
+cache = create_cache(config)
+password_hasher = PasswordHasher.from_config(config)
+note_listener = PgListener.from_config(config, NOTE_CHANNEL)
+metrics = Metrics()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    await database.prewarm(config.database_pool_size)
+    yield
+    await note_listener.close()
+    password_hasher.shutdown()
+    await database.dispose()
+
 
 app = FastAPI(
     title="Hi Interview",
+    lifespan=lifespan,
     docs_url=None if config.env == Env.PROD else "/docs",
     redoc_url=None if config.env == Env.PROD else "/redoc",
     openapi_url=None if config.env == Env.PROD else "/openapi.json",
@@ -27,5 +51,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryMonitorMiddleware)
+if config.metrics_enabled:
+    metrics.instrument_engine(database.engine)
+    for replica in database.replicas.engines if database.replicas else []:
+        metrics.instrument_engine(replica)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
 
-app.include_router(get_all_routes(config, database, auth_verifier))
+app.include_router(
+    get_all_routes(
+        config,
+        database,
+        auth_verifier,
+        cache,
+        password_hasher,
+        note_listener,
+        metrics,
+    )
+)
@@ -1,46 +1,82 @@
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
 
 from server.business.auth.auth_verifier import AuthVerifier
-from server.business.auth.password import verify_password
-from server.business.auth.schema import LoginRequest, TokenResponse, UserTokenInfo
+from server.business.auth.login import authenticate
+from server.business.auth.password import PasswordHasher, PasswordHasherBusyError
+from server.business.auth.refresh_token import (
+    create_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from server.business.auth.schema import (
+    LoginRequest,
+    RefreshTokenRequest,
+    TokenResponse,
+    UserTokenInfo,
+)
 from server.business.auth.token import create_access_token
-from server.data.models.user import User
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
 from server.shared.config import Config
-from server.shared.databasemanager import DatabaseManager
 from server.shared.pydantic import PEmpty
 
 
 def get_router(
-    config: Config, database: DatabaseManager, auth_verifier: AuthVerifier
+    config: Config,
+    database: AsyncDatabaseManager,
+    auth_verifier: AuthVerifier,
+    password_hasher: PasswordHasher,
 ) -> APIRouter:
     router = APIRouter()
 
     @router.post("/token")
     async def login(login_data: LoginRequest) -> TokenResponse:
-        with database.create_session() as session:
-            user = (
-                session.execute(
-                    select(User).where(User.email == login_data.email.lower())
+        try:
+            async with database.create_session() as session:
+                user_id = await authenticate(
+                    session, password_hasher, login_data.email, login_data.password
                 )
-                .scalars()
-                .one_or_none()
+                if user_id is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Incorrect email or password",
+                    )
+                refresh_token = create_refresh_token(session, user_id)
+                await session.commit()
+        except PasswordHasherBusyError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins at once, please try again",
+                headers={"Retry-After": "1"},
             )
 
-            if not user or user.password_hashed is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Incorrect email or password",
-                )
+        return TokenResponse(
+            access_token=create_access_token(config, user_id),
+            refresh_token=refresh_token,
+        )
 
-            if not verify_password(login_data.password, user.password_hashed):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Incorrect email or password",
-                )
+    # Exchanges a refresh token for a new access token, and a new refresh
+    # token replacing the one used, without asking for the password again.
+    @router.post("/token/refresh")
+    async def refresh(data: RefreshTokenRequest) -> TokenResponse:
+        async with database.create_session() as session:
+            rotated = await rotate_refresh_token(session, data.refresh_token)
+        if rotated is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+            )
 
-            access_token = create_access_token(config, user.id)
-            return TokenResponse(access_token=access_token)
+        user_id, refresh_token = rotated
+        return TokenResponse(
+            access_token=create_access_token(config, user_id),
+            refresh_token=refresh_token,
+        )
+
+    @router.post("/token/revoke")
+    async def revoke(data: RefreshTokenRequest) -> PEmpty:
+        async with database.create_session() as session:
+            await revoke_refresh_token(session, data.refresh_token)
+        return PEmpty()
 
     @router.get("/check_auth")
     async def check_auth(
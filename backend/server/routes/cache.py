@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.schema import UserTokenInfo
+from server.shared.cache import Cache, PCacheStats
+from server.shared.pydantic import BaseModel
+
+
+class PCacheStatsResponse(BaseModel):
+    # The client and note cache.
+    data: PCacheStats
+    # Verified access tokens.
+    auth_tokens: PCacheStats
+
+
+def get_router(cache: Cache, auth_verifier: AuthVerifier) -> APIRouter:
+    router = APIRouter()
+
+    # Counters are per process, since the caches were created.
+    @router.get("/cache/stats")
+    async def cache_stats(
+        _: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PCacheStatsResponse:
+        return PCacheStatsResponse(
+            data=cache.stats(), auth_tokens=auth_verifier.stats()
+        )
+
+    return router
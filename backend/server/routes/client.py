@@ -1,54 +1,197 @@
-from fastapi import APIRouter, HTTPException, status
-
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 
 from server.business.auth.auth_verifier import AuthVerifier
 from server.business.auth.schema import UserTokenInfo
+from server.business.client.bulk_import import (
+    ClientImportFormatError,
+    import_clients,
+)
+from server.business.client.cache import get_client_cached
 from server.business.client.create import create_client
-from server.business.client.get import get_client
-from server.business.client.list import list_clients
-from server.business.client.schema import PClient, PClientCreate
-from server.shared.databasemanager import DatabaseManager
-from server.shared.pydantic import PList
+from server.business.client.detail import get_client_detail
+from server.business.client.get import client_version, get_clients
+from server.business.client.list import (
+    clients_page_version,
+    list_clients,
+    list_clients_version,
+)
+from server.business.client.schema import (
+    ClientImportFormat,
+    ClientSort,
+    PClient,
+    PClientBatchGetRequest,
+    PClientBatchGetResponse,
+    PClientCreate,
+    PClientDetail,
+    PClientImportResult,
+    SortDirection,
+)
+from server.business.client.search import (
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    search_clients,
+)
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
+from server.shared.etag import check_etag, compute_etag
+from server.shared.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+)
+from server.shared.pydantic import PPage
+
+IMPORT_CONTENT_TYPES: dict[str, ClientImportFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
 
 
-def get_router(database: DatabaseManager, auth_verifier: AuthVerifier) -> APIRouter:
+def get_router(
+    database: AsyncDatabaseManager, auth_verifier: AuthVerifier, cache: Cache
+) -> APIRouter:
     router = APIRouter()
 
     @router.get("/client")
     async def list_clients_route(
-        _: UserTokenInfo = auth_verifier.UserTokenInfo(),
-    ) -> PList[PClient]:
-        with database.create_session() as session:
-            clients = list_clients(session)
-            return PList(data=clients)
+        request: Request,
+        response: Response,
+        sort: ClientSort = "name",
+        direction: SortDirection | None = None,
+        cursor: str | None = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PPage[PClient]:
+        try:
+            async with database.create_read_session(user.user_id) as session:
+                if "if-none-match" not in request.headers:
+                    # Nothing to compare the ETag with, so read the page in
+                    # one go and take it from that.
+                    page = await list_clients(
+                        session, limit, sort=sort, direction=direction, cursor=cursor
+                    )
+                    check_etag(
+                        request, response, compute_etag(clients_page_version(page))
+                    )
+                    return page
+
+                # Only the columns the ETag needs, so that an unchanged page is
+                # answered before any client is loaded. A changed one costs a
+                # second query, by primary key; a client changing in between
+                # only makes the page newer than its ETag, which the next
+                # request then doesn't match.
+                version, ids, next_cursor = await list_clients_version(
+                    session, limit, sort=sort, direction=direction, cursor=cursor
+                )
+                check_etag(request, response, compute_etag(version))
+                clients = await get_clients(session, ids)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        return PPage(data=clients.data, next_cursor=next_cursor)
+
+    # Registered before /client/{client_id} so that "search" isn't taken for an
+    # id.
+    @router.get("/client/search")
+    async def search_clients_route(
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> list[PClient]:
+        async with database.create_read_session(user.user_id) as session:
+            return await search_clients(session, q, limit)
+
+    # A POST so that the ids don't have to fit in a URL.
+    @router.post("/client/batch_get")
+    async def batch_get_clients_route(
+        data: PClientBatchGetRequest,
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PClientBatchGetResponse:
+        async with database.create_read_session(user.user_id) as session:
+            return await get_clients(session, data.ids)
 
     @router.get("/client/{client_id}")
     async def get_client_route(
         client_id: str,
+        request: Request,
+        response: Response,
         _: UserTokenInfo = auth_verifier.UserTokenInfo(),
     ) -> PClient:
-        with database.create_session() as session:
-            client = get_client(session, client_id)
-            if client is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Client not found",
-                )
-            return client
+        # On the primary, as what it reads is cached for everyone: a replica
+        # that is behind would leave a stale client in the cache.
+        async with database.create_session() as session:
+            client = await get_client_cached(session, cache, client_id)
+        if client is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Client not found",
+            )
+        # Cheap to check once the client is cached, as that needs no query.
+        check_etag(request, response, compute_etag(client_version(client)))
+        return client
+
+    @router.get("/client/{client_id}/detail")
+    async def get_client_detail_route(
+        client_id: str,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PClientDetail:
+        detail = await get_client_detail(
+            database, cache, client_id, limit, user.user_id
+        )
+        if detail is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Client not found",
+            )
+        return detail
 
     @router.post("/client")
     async def create_client_route(
         data: PClientCreate,
-        _: UserTokenInfo = auth_verifier.UserTokenInfo(),
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
     ) -> PClient:
         try:
-            with database.create_session() as session:
-                return create_client(session, data)
+            async with database.create_session() as session:
+                client = await create_client(session, data)
         except IntegrityError:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="A client with this email already exists",
             )
+        database.record_write(user.user_id)
+        return client
+
+    @router.post("/client/import")
+    async def import_clients_route(
+        request: Request,
+        format: ClientImportFormat | None = None,
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PClientImportResult:
+        if format is None:
+            content_type = request.headers.get("content-type", "").split(";")[0]
+            format = IMPORT_CONTENT_TYPES.get(content_type.strip().lower())
+            if format is None:
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail="Upload text/csv or application/x-ndjson, or pass format",
+                )
+
+        # Read the body as it arrives rather than as a form upload, so that it
+        # is never held in memory or spooled to disk in full.
+        try:
+            async with database.create_session() as session:
+                result = await import_clients(session, cache, request.stream(), format)
+        except ClientImportFormatError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        database.record_write(user.user_id)
+        return result
 
     return router
@@ -1,26 +1,121 @@
-# Routes for client notes (list and create).
-from fastapi import APIRouter
+# Routes for client notes (list, create, search and live feed).
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 from server.business.auth.auth_verifier import AuthVerifier
 from server.business.auth.schema import UserTokenInfo
+from server.business.client.cache import get_client_cached
+from server.business.client.get import client_version
+from server.business.client_note.cache import list_client_notes_cached
 from server.business.client_note.create import create_client_note
-from server.business.client_note.list import list_client_notes
-from server.business.client_note.schema import PClientNote, PClientNoteCreate
-from server.shared.databasemanager import DatabaseManager
-from server.shared.pydantic import PList
+from server.business.client_note.feed import follow_client_notes, note_feed_cursor
+from server.business.client_note.schema import (
+    PClientNote,
+    PClientNoteCreate,
+    PClientNoteSearchResult,
+)
+from server.business.client_note.search import search_client_notes
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
+from server.shared.config import Config
+from server.shared.etag import check_etag, compute_etag
+from server.shared.listener import PgListener
+from server.shared.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+)
+from server.shared.pydantic import PPage
+from server.shared.sse import SSE_HEADERS, SSE_HEARTBEAT, SSE_MEDIA_TYPE, sse_event
 
 
-def get_router(database: DatabaseManager, auth_verifier: AuthVerifier) -> APIRouter:
+def get_router(
+    config: Config,
+    database: AsyncDatabaseManager,
+    auth_verifier: AuthVerifier,
+    cache: Cache,
+    note_listener: PgListener,
+) -> APIRouter:
     router = APIRouter()
 
     @router.get("/client/{client_id}/note")
     async def list_notes_route(
         client_id: str,
+        request: Request,
+        response: Response,
+        before: str | None = None,
+        after: str | None = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        _: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PPage[PClientNote]:
+        try:
+            # On the primary, as pages are cached for everyone (see
+            # get_client_route).
+            async with database.create_session() as session:
+                # Notes can only be added, and adding one changes the client's
+                # note_count, so the client's version covers its notes too.
+                client = await get_client_cached(session, cache, client_id)
+                if client is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Client not found",
+                    )
+                check_etag(
+                    request,
+                    response,
+                    compute_etag(client_version(client), before, after, limit),
+                )
+                return await list_client_notes_cached(
+                    session, cache, client_id, limit, before=before, after=after
+                )
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+    @router.get("/client/{client_id}/note/stream")
+    async def stream_notes_route(
+        client_id: str,
+        last_event_id: str | None = Header(None),
         _: UserTokenInfo = auth_verifier.UserTokenInfo(),
-    ) -> PList[PClientNote]:
-        with database.create_session() as session:
-            notes = list_client_notes(session, client_id)
-            return PList(data=notes)
+    ) -> StreamingResponse:
+        """
+        Server-Sent Events: a "note" event for each note added to the client
+        from now on, or since the note whose event id is sent back as
+        Last-Event-ID when reconnecting.
+        """
+        try:
+            async with database.create_session() as session:
+                if await get_client_cached(session, cache, client_id) is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Client not found",
+                    )
+                cursor = await note_feed_cursor(session, client_id, last_event_id)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+
+        async def body() -> AsyncIterator[str]:
+            async for item in follow_client_notes(
+                database,
+                note_listener,
+                client_id,
+                cursor,
+                config.note_stream_heartbeat_seconds,
+            ):
+                if item is None:
+                    yield SSE_HEARTBEAT
+                else:
+                    note_cursor, note = item
+                    yield sse_event("note", note, id=note_cursor)
+
+        return StreamingResponse(body(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
 
     @router.post("/client/{client_id}/note")
     async def create_note_route(
@@ -28,7 +123,36 @@ def get_router(database: DatabaseManager, auth_verifier: AuthVerifier) -> APIRou
         data: PClientNoteCreate,
         user: UserTokenInfo = auth_verifier.UserTokenInfo(),
     ) -> PClientNote:
-        with database.create_session() as session:
-            return create_client_note(session, client_id, user.user_id, data)
+        async with database.create_session() as session:
+            # Clients are never deleted, so one found here is still there for
+            # the note's foreign key.
+            note = None
+            if await get_client_cached(session, cache, client_id) is not None:
+                note = await create_client_note(
+                    session, cache, client_id, user.user_id, data
+                )
+        if note is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Client not found",
+            )
+        database.record_write(user.user_id)
+        return note
+
+    @router.get("/note/search")
+    async def search_notes_route(
+        q: str = Query(..., min_length=1, max_length=500),
+        cursor: str | None = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PPage[PClientNoteSearchResult]:
+        try:
+            async with database.create_read_session(user.user_id) as session:
+                return await search_client_notes(session, q, limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
 
     return router
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.schema import UserTokenInfo
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.databasemanager import PPoolStats
+
+
+def get_router(
+    database: AsyncDatabaseManager, auth_verifier: AuthVerifier
+) -> APIRouter:
+    router = APIRouter()
+
+    # This process's pool only.
+    @router.get("/database/pool")
+    async def database_pool(
+        _: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> PPoolStats:
+        return database.pool_stats()
+
+    return router
@@ -0,0 +1,67 @@
+# Routes for full exports of clients and notes, streamed as they are read.
+from typing import AsyncIterator, Callable, Sequence
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.schema import UserTokenInfo
+from server.business.client.export import export_clients
+from server.business.client.schema import PClient
+from server.business.client_note.export import export_client_notes
+from server.business.client_note.schema import PClientNote
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.export import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    encode_export,
+    export_filename,
+)
+from server.shared.pydantic import BaseModel
+
+
+def get_router(
+    database: AsyncDatabaseManager, auth_verifier: AuthVerifier
+) -> APIRouter:
+    router = APIRouter()
+
+    def stream_export(
+        name: str,
+        export: Callable[[AsyncSession], AsyncIterator[Sequence[BaseModel]]],
+        model: type[BaseModel],
+        format: ExportFormat,
+        user_id: str,
+    ) -> StreamingResponse:
+        # The session is opened by the response body rather than the route,
+        # so that it stays open while the body streams and is closed when it
+        # finishes or the client goes away.
+        async def body() -> AsyncIterator[bytes]:
+            async with database.create_read_session(user_id) as session:
+                async for chunk in encode_export(export(session), model, format):
+                    yield chunk
+
+        filename = export_filename(name, format)
+        return StreamingResponse(
+            body(),
+            media_type=EXPORT_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @router.get("/export/clients")
+    async def export_clients_route(
+        format: ExportFormat = "ndjson",
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> StreamingResponse:
+        return stream_export("clients", export_clients, PClient, format, user.user_id)
+
+    @router.get("/export/notes")
+    async def export_notes_route(
+        format: ExportFormat = "ndjson",
+        user: UserTokenInfo = auth_verifier.UserTokenInfo(),
+    ) -> StreamingResponse:
+        return stream_export(
+            "notes", export_client_notes, PClientNote, format, user.user_id
+        )
+
+    return router
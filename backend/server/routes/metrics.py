@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from server.shared.metrics import Metrics
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_router(metrics: Metrics) -> APIRouter:
+    router = APIRouter()
+
+    # Unauthenticated for Prometheus to scrape, so it should only be reachable
+    # from inside the network, or turned off with METRICS_ENABLED=false.
+    @router.get("/metrics", include_in_schema=False)
+    async def get_metrics() -> Response:
+        return Response(metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+    return router
@@ -1,22 +1,22 @@
 from fastapi import APIRouter
-from server.shared.pydantic import BaseModel, Field
 from sqlalchemy import select
 
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
 from server.shared.config import Config
-from server.shared.databasemanager import DatabaseManager
+from server.shared.pydantic import BaseModel, Field
 
 
 class PingResponse(BaseModel):
     healthy: str = Field(...)
 
 
-def get_router(_: Config, database: DatabaseManager) -> APIRouter:
+def get_router(_: Config, database: AsyncDatabaseManager) -> APIRouter:
     router = APIRouter()
 
     @router.get("/ping")
     async def ping() -> PingResponse:
-        with database.create_session() as session:
-            session.execute(select(1)).all()
+        async with database.create_session() as session:
+            (await session.execute(select(1))).all()
             return PingResponse(healthy="true")
 
     return router
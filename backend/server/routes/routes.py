@@ -1,24 +1,48 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.password import PasswordHasher
 from server.routes.auth import get_router as get_router_auth
+from server.routes.cache import get_router as get_router_cache
 from server.routes.client import get_router as get_router_client
 from server.routes.client_note import get_router as get_router_client_note
+from server.routes.database import get_router as get_router_database
+from server.routes.export import get_router as get_router_export
+from server.routes.metrics import get_router as get_router_metrics
 from server.routes.ping import get_router as get_router_ping
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
 from server.shared.config import Config
-from server.shared.databasemanager import DatabaseManager
+from server.shared.listener import PgListener
+from server.shared.metrics import Metrics
 
 
 def get_all_routes(
     config: Config,
-    database: DatabaseManager,
+    database: AsyncDatabaseManager,
     auth_verifier: AuthVerifier,
+    cache: Cache,
+    password_hasher: PasswordHasher,
+    note_listener: PgListener,
+    metrics: Metrics,
 ) -> APIRouter:
-    router = APIRouter()
+    # Responses are already plain JSON types by the time they are encoded, and
+    # orjson encodes them several times faster than the json module.
+    router = APIRouter(default_response_class=ORJSONResponse)
 
     router.include_router(get_router_ping(config, database))
-    router.include_router(get_router_auth(config, database, auth_verifier))
-    router.include_router(get_router_client(database, auth_verifier))
-    router.include_router(get_router_client_note(database, auth_verifier))
+    router.include_router(
+        get_router_auth(config, database, auth_verifier, password_hasher)
+    )
+    router.include_router(get_router_client(database, auth_verifier, cache))
+    router.include_router(
+        get_router_client_note(config, database, auth_verifier, cache, note_listener)
+    )
+    router.include_router(get_router_export(database, auth_verifier))
+    router.include_router(get_router_cache(cache, auth_verifier))
+    router.include_router(get_router_database(database, auth_verifier))
+    if config.metrics_enabled:
+        router.include_router(get_router_metrics(metrics))
 
     return router
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from server.shared.config import Config
+from server.shared.databasemanager import PPoolStats, engine_options, pool_stats
+from server.shared.metrics import TimedQueuePool
+from server.shared.querymonitor import QueryMonitor
+from server.shared.replicas import Replicas
+
+
+class AsyncDatabaseManager:
+    engine: AsyncEngine
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        query_monitor: QueryMonitor | None = None,
+        replicas: Replicas | None = None,
+        read_your_writes_seconds: float = 0,
+    ):
+        self.engine = engine
+        self.replicas = replicas
+        self.read_your_writes_seconds = read_your_writes_seconds
+        if query_monitor is not None:
+            query_monitor.instrument_engine(engine.sync_engine)
+            for replica in replicas.engines if replicas is not None else []:
+                query_monitor.instrument_engine(replica.sync_engine)
+        # Attributes can't be lazily reloaded outside of an await, so keep them
+        # populated after commit rather than expiring them.
+        self.session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        # When each user last wrote (on the monotonic clock), least recent
+        # first.
+        self._writes: OrderedDict[str, float] = OrderedDict()
+
+    def create_session(self) -> AsyncSession:
+        """A session on the primary, for writes and reads that must be current."""
+        return self.session_factory()
+
+    def create_read_session(self, user_id: str | None = None) -> AsyncSession:
+        """
+        A session on a replica, for reads that can be slightly behind. It is
+        on the primary instead if there are no replicas or none are caught
+        up, or if user_id wrote recently.
+        """
+        if self.replicas is None or self._wrote_recently(user_id):
+            return self.session_factory()
+        replica = self.replicas.choose()
+        if replica is None:
+            return self.session_factory()
+        return self.session_factory(bind=replica)
+
+    def record_write(self, user_id: str) -> None:
+        """Send user_id's reads to the primary for read_your_writes_seconds."""
+        now = time.monotonic()
+        self._writes[user_id] = now
+        self._writes.move_to_end(user_id)
+        # Forget writes whose window has passed.
+        while next(iter(self._writes.values())) < now - self.read_your_writes_seconds:
+            self._writes.popitem(last=False)
+
+    def _wrote_recently(self, user_id: str | None) -> bool:
+        if user_id is None:
+            return False
+        wrote_at = self._writes.get(user_id)
+        return (
+            wrote_at is not None
+            and time.monotonic() - wrote_at < self.read_your_writes_seconds
+        )
+
+    async def prewarm(self, connections: int) -> None:
+        """
+        Open connections at once and return them to the pool, so that the
+        first requests don't each wait for a connection to be set up.
+        """
+        engines = [self.engine]
+        if self.replicas is not None:
+            engines.extend(self.replicas.engines)
+        opened = await asyncio.gather(
+            *(
+                engine.connect().start()
+                for engine in engines
+                for _ in range(connections)
+            )
+        )
+        await asyncio.gather(*(connection.close() for connection in opened))
+
+    def pool_stats(self) -> PPoolStats:
+        return pool_stats(self.engine.pool)
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+        if self.replicas is not None:
+            await self.replicas.dispose()
+
+    @classmethod
+    def from_url(
+        cls, url: str, query_monitor: QueryMonitor | None = None
+    ) -> "AsyncDatabaseManager":
+        return cls(create_async_engine(url, poolclass=TimedQueuePool), query_monitor)
+
+    @classmethod
+    def from_config(
+        cls, config: Config, query_monitor: QueryMonitor | None = None
+    ) -> "AsyncDatabaseManager":
+        def create(url: str) -> AsyncEngine:
+            return create_async_engine(
+                url, poolclass=TimedQueuePool, **engine_options(config)
+            )
+
+        replicas = None
+        if config.database_replica_urls:
+            replicas = Replicas(
+                [create(url) for url in config.database_replica_urls],
+                config.replica_max_lag_seconds,
+                config.replica_lag_check_seconds,
+            )
+        return cls(
+            create(config.database_url),
+            query_monitor,
+            replicas,
+            config.read_your_writes_seconds,
+        )
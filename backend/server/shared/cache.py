@@ -0,0 +1,186 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Protocol, TypeVar
+
+from pydantic import BaseModel as PydanticBaseModel
+
+from server.shared.config import Config
+from server.shared.pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=PydanticBaseModel)
+
+
+class PCacheStats(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    # Only known for the in-memory backend.
+    entries: int | None
+    max_entries: int | None
+
+
+class Cache(ABC):
+    """
+    A key-value cache of serialized models. Values are stored as JSON so that
+    every backend behaves the same, including handing out a fresh copy on
+    every read.
+
+    Groups of keys that have to be invalidated together live in a namespace:
+    keys are prefixed with the namespace's current generation, and
+    invalidating it starts a new generation, orphaning the old keys until
+    they expire or are evicted.
+    """
+
+    def __init__(self, default_ttl: float):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None:
+        """Store value, expiring it after ttl seconds, or never if None."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    async def get_model(self, key: str, model: type[ModelT]) -> ModelT | None:
+        value = await self.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return model.model_validate_json(value)
+
+    async def set_model(
+        self, key: str, value: PydanticBaseModel, ttl: float | None = None
+    ) -> None:
+        await self.set(key, value.model_dump_json().encode(), ttl or self.default_ttl)
+
+    async def namespace(self, name: str) -> str:
+        generation_key = f"{name}:generation"
+        generation = await self.get(generation_key)
+        if generation is None:
+            generation = uuid.uuid4().hex[:12].encode()
+            await self.set(generation_key, generation, None)
+        return f"{name}:{generation.decode()}"
+
+    async def invalidate_namespace(self, name: str) -> None:
+        await self.delete(f"{name}:generation")
+
+    def stats(self) -> PCacheStats:
+        lookups = self.hits + self.misses
+        return PCacheStats(
+            backend=type(self).__name__,
+            hits=self.hits,
+            misses=self.misses,
+            hit_ratio=self.hits / lookups if lookups else 0.0,
+            evictions=0,
+            entries=None,
+            max_entries=None,
+        )
+
+
+class InMemoryCache(Cache):
+    """An LRU cache local to the process, with per-entry expiry."""
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self.evictions = 0
+        # Values with their expiry time on the monotonic clock, least recently
+        # used first.
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> PCacheStats:
+        return (
+            super()
+            .stats()
+            .model_copy(
+                update={
+                    "evictions": self.evictions,
+                    "entries": len(self._entries),
+                    "max_entries": self.max_entries,
+                }
+            )
+        )
+
+
+class RedisClient(Protocol):
+    """The subset of redis.asyncio.Redis that RedisCache uses."""
+
+    async def get(self, name: str) -> Any: ...
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> Any: ...
+
+    async def delete(self, *names: str) -> Any: ...
+
+
+class RedisCache(Cache):
+    """
+    A cache shared between processes, on anything speaking the Redis protocol
+    (Redis, Valkey, KeyDB...). Eviction is left to the server's maxmemory
+    policy.
+    """
+
+    def __init__(self, client: RedisClient, default_ttl: float, prefix: str = "hi:"):
+        super().__init__(default_ttl)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, default_ttl: float) -> "RedisCache":
+        # Optional dependency, only needed when a Redis cache is configured.
+        try:
+            from redis.asyncio import Redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_URL is a Redis URL but the redis package is not installed"
+            ) from e
+        return cls(Redis.from_url(url), default_ttl)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None:
+        px = None if ttl is None else int(ttl * 1000)
+        await self.client.set(self.prefix + key, value, px=px)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+def create_cache(config: Config) -> Cache:
+    if config.cache_url:
+        return RedisCache.from_url(config.cache_url, config.cache_ttl_seconds)
+    return InMemoryCache(config.cache_max_entries, config.cache_ttl_seconds)
@@ -1,17 +1,84 @@
-from sqlalchemy import Engine, create_engine
+from typing import Any
+
+from sqlalchemy import Engine, Pool, QueuePool, create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from server.shared.config import Config
+from server.shared.pydantic import BaseModel
+from server.shared.querymonitor import QueryMonitor
+
+
+class PPoolStats(BaseModel):
+    pool: str
+    # Only known for queue pools (not NullPool, as used in tests).
+    size: int | None
+    checked_out: int | None
+    # Open connections waiting in the pool.
+    checked_in: int | None
+    # Connections open beyond size, negative while the pool is filling up.
+    overflow: int | None
+
+
+def pool_stats(pool: Pool) -> PPoolStats:
+    if not isinstance(pool, QueuePool):
+        return PPoolStats(
+            pool=type(pool).__name__,
+            size=None,
+            checked_out=None,
+            checked_in=None,
+            overflow=None,
+        )
+    return PPoolStats(
+        pool=type(pool).__name__,
+        size=pool.size(),
+        checked_out=pool.checkedout(),
+        checked_in=pool.checkedin(),
+        overflow=pool.overflow(),
+    )
+
+
+def engine_options(config: Config) -> dict[str, Any]:
+    """create_engine's pool and connection arguments, from config."""
+    options: dict[str, Any] = {
+        "pool_size": config.database_pool_size,
+        "max_overflow": config.database_max_overflow,
+        "pool_timeout": config.database_pool_timeout_seconds,
+        "pool_recycle": config.database_pool_recycle_seconds,
+        "pool_pre_ping": config.database_pool_pre_ping,
+    }
+    if config.database_pgbouncer:
+        # PgBouncer hands each transaction to any of its server connections,
+        # which won't have the statements psycopg prepared on another.
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
 
 class DatabaseManager:
     engine: Engine
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine, query_monitor: QueryMonitor | None = None):
         self.engine = engine
+        if query_monitor is not None:
+            query_monitor.instrument_engine(engine)
         self.session_factory = sessionmaker(bind=engine)
 
     def create_session(self) -> Session:
         return self.session_factory()
 
+    def pool_stats(self) -> PPoolStats:
+        return pool_stats(self.engine.pool)
+
+    @classmethod
+    def from_url(
+        cls, url: str, query_monitor: QueryMonitor | None = None
+    ) -> "DatabaseManager":
+        return cls(create_engine(url), query_monitor)
+
     @classmethod
-    def from_url(cls, url: str) -> "DatabaseManager":
-        return cls(create_engine(url))
+    def from_config(
+        cls, config: Config, query_monitor: QueryMonitor | None = None
+    ) -> "DatabaseManager":
+        return cls(
+            create_engine(config.database_url, **engine_options(config)),
+            query_monitor,
+        )
@@ -0,0 +1,37 @@
+import hashlib
+import json
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+
+# Let browsers keep responses but revalidate them with If-None-Match on every
+# use, so that they never show stale data.
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """A strong ETag for a response, from values that change whenever it does."""
+    raw = json.dumps(parts, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so ignore any W/ prefix.
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """
+    Raise a 304 Not Modified if the request's If-None-Match already has etag,
+    otherwise set it on the response. Call this before doing the work of
+    building the response.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
@@ -0,0 +1,54 @@
+import csv
+import io
+from datetime import date
+from typing import AsyncIterable, AsyncIterator, Literal, Sequence
+
+from server.shared.pydantic import BaseModel
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Rows fetched from the server-side cursor at a time, and so also the number
+# of rows encoded into each chunk of the response.
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_filename(name: str, format: ExportFormat) -> str:
+    return f"{name}-{date.today().isoformat()}.{format}"
+
+
+def _encode_csv_rows(rows: Sequence[Sequence[object]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def encode_export(
+    batches: AsyncIterable[Sequence[BaseModel]],
+    model: type[BaseModel],
+    format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """
+    Encode batches of models as NDJSON, one JSON object per line, or as CSV
+    with a header row of the model's fields. Values are encoded the same way
+    they are in JSON responses, with None as an empty CSV field.
+    """
+    if format == "csv":
+        # Sent before the first batch has been fetched.
+        yield _encode_csv_rows([list(model.model_fields)])
+
+    async for batch in batches:
+        if format == "ndjson":
+            yield b"".join(item.model_dump_json().encode() + b"\n" for item in batch)
+        else:
+            yield _encode_csv_rows(
+                [
+                    ["" if value is None else value for value in row.values()]
+                    for row in (item.model_dump(mode="json") for item in batch)
+                ]
+            )
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import psycopg
+from psycopg import sql
+from sqlalchemy.engine import make_url
+
+from server.shared.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PgListener:
+    """
+    Shares one Postgres LISTEN connection between every subscriber in the
+    process. Each subscriber waits on notifications for one key (the
+    notification payload), as an asyncio.Event that is set when one arrives.
+
+    Notifications only say that something changed: subscribers clear their
+    event, read what they are interested in and wait again, so a burst of
+    notifications costs them one read. Notifications sent while the
+    connection is down are lost, so every subscriber is woken whenever it
+    (re)connects.
+    """
+
+    def __init__(self, database_url: str, channel: str, reconnect_delay: float = 1):
+        # The SQLAlchemy URL without its driver, for psycopg.
+        self.conninfo = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: dict[str, set[asyncio.Event]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_config(cls, config: Config, channel: str) -> "PgListener":
+        if config.database_listen_url is not None:
+            return cls(config.database_listen_url, channel)
+        # PgBouncer would hand the LISTEN to a server connection that goes
+        # back to its pool after it, so notifications would never arrive.
+        if config.database_pgbouncer:
+            raise ValueError(
+                "DATABASE_LISTEN_URL must connect to the database directly when "
+                "DATABASE_PGBOUNCER is set"
+            )
+        return cls(config.database_url, channel)
+
+    @asynccontextmanager
+    async def subscribe(self, key: str) -> AsyncIterator[asyncio.Event]:
+        # Connected on first use, so that processes that never stream anything
+        # never hold the connection.
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+        event = asyncio.Event()
+        self._subscribers.setdefault(key, set()).add(event)
+        try:
+            yield event
+        finally:
+            subscribers = self._subscribers[key]
+            subscribers.discard(event)
+            if not subscribers:
+                del self._subscribers[key]
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                    for subscribers in self._subscribers.values():
+                        for event in subscribers:
+                            event.set()
+                    async for notify in conn.notifies():
+                        for event in self._subscribers.get(notify.payload, ()):
+                            event.set()
+            except psycopg.Error:
+                logger.warning(
+                    "Lost the LISTEN connection for %s, reconnecting",
+                    self.channel,
+                    exc_info=True,
+                )
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
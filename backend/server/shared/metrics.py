@@ -0,0 +1,299 @@
+"""
+Request, database and connection pool metrics, exposed in the Prometheus text
+format. Everything runs on the event loop, so the metrics aren't locked.
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, cast
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds, from a fast cache hit to a slow export.
+DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# The route label of requests that didn't match a route, rather than their
+# path, which would make a new series per path.
+UNMATCHED_ROUTE = "unmatched"
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in self.values.items():
+            labels = _labels(self.labels, label_values)
+            lines.append(f"{self.name}{labels} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...],
+        labels: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.help = help
+        self.buckets = (*buckets, math.inf)
+        self.labels = labels
+        # Per label values: the count in each bucket (not cumulative), the sum
+        # and the count of observations.
+        self.values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = ([0] * len(self.buckets), [0.0])
+        bucket_counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                bucket_counts[i] += 1
+                break
+        total[0] += value
+
+    def count(self, *label_values: str) -> int:
+        series = self.values.get(label_values)
+        return sum(series[0]) if series is not None else 0
+
+    def sum(self, *label_values: str) -> float:
+        series = self.values.get(label_values)
+        return series[1][0] if series is not None else 0.0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bucket_labels = (*self.labels, "le")
+        for label_values, (bucket_counts, total) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _labels(bucket_labels, (*label_values, _number(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _RequestStats:
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# The stats of the request being handled, which queries are attributed to.
+_request_stats: ContextVar[_RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    create_async_engine's default pool, also passing how long each checkout
+    took (including waiting for a connection to be returned, or opening a new
+    one) to on_checkout.
+    """
+
+    on_checkout: Callable[[float], None] | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        connection = super().connect()
+        if self.on_checkout is not None:
+            self.on_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> "TimedQueuePool":
+        # Engine.dispose() replaces the pool with a recreated one.
+        pool = cast(TimedQueuePool, super().recreate())
+        pool.on_checkout = self.on_checkout
+        return pool
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests handled.",
+            ("method", "route", "status"),
+        )
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Time to handle an HTTP request, until the end of its response body.",
+            DURATION_BUCKETS,
+            ("method", "route"),
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries",
+            "Database queries made while handling an HTTP request.",
+            QUERY_COUNT_BUCKETS,
+            ("method", "route"),
+        )
+        self.request_db_duration = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent on database queries while handling an HTTP request.",
+            DURATION_BUCKETS,
+            ("method", "route"),
+        )
+        self.queries = Counter("db_queries_total", "Database queries made.")
+        self.query_duration = Histogram(
+            "db_query_duration_seconds",
+            "Time for the database to execute a query.",
+            DURATION_BUCKETS,
+        )
+        self.pool_checkout_duration = Histogram(
+            "db_pool_checkout_duration_seconds",
+            "Time to check a connection out of the pool, including waiting for "
+            "one to be free.",
+            DURATION_BUCKETS,
+        )
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        """
+        Record engine's queries, attributing them to the current request if
+        any. Pool checkouts are only timed if engine uses a TimedQueuePool.
+        """
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            context._metrics_started = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            elapsed = time.perf_counter() - context._metrics_started
+            self.queries.inc()
+            self.query_duration.observe(elapsed)
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.queries += 1
+                stats.db_seconds += elapsed
+
+        if isinstance(sync_engine.pool, TimedQueuePool):
+            sync_engine.pool.on_checkout = self.pool_checkout_duration.observe
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        stats: _RequestStats,
+    ) -> None:
+        self.requests.inc(method, route, str(status))
+        self.request_duration.observe(seconds, method, route)
+        self.request_queries.observe(stats.queries, method, route)
+        self.request_db_duration.observe(stats.db_seconds, method, route)
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.requests,
+            self.request_duration,
+            self.request_queries,
+            self.request_db_duration,
+            self.queries,
+            self.query_duration,
+            self.pool_checkout_duration,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Records every HTTP request, labelled with its route's path template (like
+    /client/{client_id}) rather than its actual path.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Unless a response is started, the server answers with a 500.
+        status = 500
+
+        async def send_and_record_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = _RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            # The router adds the matched route to the scope.
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self.metrics.observe_request(scope["method"], route, status, elapsed, stats)
@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from server.shared.ids import is_uuid
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """
+    Cursors are opaque to clients: the sort key of the last row on a page,
+    JSON encoded and then base64 encoded. Datetimes are encoded as ISO strings,
+    so callers need to parse them back out of decode_cursor's result.
+    """
+    raw = json.dumps(values, default=_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+    if not isinstance(values, list):
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def parse_cursor_datetime(value: Any) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def parse_cursor_string(value: Any) -> str:
+    # Compared with a text column, which Postgres won't do for anything else.
+    if not isinstance(value, str):
+        raise InvalidCursorError("Invalid cursor")
+    return value
+
+
+def parse_cursor_id(value: Any) -> str:
+    if not isinstance(value, str) or not is_uuid(value):
+        raise InvalidCursorError("Invalid cursor")
+    return value
@@ -24,11 +24,10 @@ class BaseModel(PydanticBaseModel):
         """
         We use frozen=True so our Pydantic models are immutable. This is a helper
         method that will clone the object and update the given key with the new
-        value.
+        value. The value isn't validated, so it must already be of the right
+        type.
         """
-        self_dict = self.model_dump()
-        self_dict[key] = value
-        return self.model_validate(self_dict)
+        return self.model_copy(update={key: value})
 
 
 class PEmpty(BaseModel):
@@ -40,3 +39,11 @@ PListT = TypeVar("PListT", bound=BaseModel)
 
 class PList(BaseModel, Generic[PListT]):
     data: list[PListT]
+
+
+class PPage(BaseModel, Generic[PListT]):
+    data: list[PListT]
+    # Cursor for the page after this one, None on the last page.
+    next_cursor: str | None
+    # Cursor for rows ahead of this page, for endpoints that can page backwards.
+    prev_cursor: str | None = None
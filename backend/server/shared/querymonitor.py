@@ -0,0 +1,189 @@
+"""
+Watches the queries an engine sends: logs slow ones with their parameters and
+plan, and flags statements repeated within one request, the sign of a query
+per row (N+1) where one query for all the rows would do.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from server.shared.config import Config, Env
+
+logger = logging.getLogger(__name__)
+
+# Statements that EXPLAIN accepts.
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Logged statements and parameters are cut to this many characters.
+_MAX_LOGGED = 2000
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+class _QueryScope:
+    def __init__(self, describe: Callable[[], str]):
+        self.describe = describe
+        self.counts: dict[str, int] = {}
+        self.allow_repeats = False
+
+
+_current_scope: ContextVar[_QueryScope | None] = ContextVar("query_scope", default=None)
+
+
+@contextmanager
+def track_queries(describe: Callable[[], str]) -> Iterator[None]:
+    """
+    Check the queries made inside for N+1s. describe names the scope (a
+    request, say) in reports, and is only called if there is one.
+    """
+    token = _current_scope.set(_QueryScope(describe))
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+def allow_repeated_queries() -> None:
+    """
+    Don't flag repeated statements for the rest of the current scope, for
+    deliberate loops like reading a long-lived stream's new rows.
+    """
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.allow_repeats = True
+
+
+def _truncate(value: object) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= _MAX_LOGGED else text[:_MAX_LOGGED] + "..."
+
+
+class QueryMonitor:
+    def __init__(
+        self,
+        slow_query_seconds: float | None,
+        n_plus_one_threshold: int,
+        raise_on_n_plus_one: bool,
+    ):
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.raise_on_n_plus_one = raise_on_n_plus_one
+
+    @classmethod
+    def from_config(cls, config: Config) -> "QueryMonitor":
+        # Tests fail on N+1s, elsewhere they are only logged.
+        return cls(
+            config.slow_query_seconds,
+            config.n_plus_one_threshold,
+            raise_on_n_plus_one=config.env == Env.TEST,
+        )
+
+    def instrument_engine(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            context._query_monitor_started = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            elapsed = time.perf_counter() - context._query_monitor_started
+            if self.slow_query_seconds is not None and (
+                elapsed >= self.slow_query_seconds
+            ):
+                self._log_slow(conn, statement, parameters, executemany, elapsed)
+            self._count(statement)
+
+    def _log_slow(
+        self,
+        conn: Any,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        elapsed: float,
+    ) -> None:
+        plan = "(not explained)"
+        if not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+            plan = self._explain(conn, statement, parameters)
+        logger.warning(
+            "Slow query (%.0f ms): %s\nParameters: %s\n%s",
+            elapsed * 1000,
+            _truncate(statement),
+            _truncate(parameters),
+            plan,
+        )
+
+    def _explain(self, conn: Any, statement: str, parameters: Any) -> str:
+        # On the query's own connection, as it may depend on the transaction
+        # (temporary tables, uncommitted rows), and inside a savepoint so that
+        # a failed EXPLAIN can't abort that transaction. EXPLAIN without
+        # ANALYZE only plans the statement, so it writes nothing.
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT query_monitor_explain")
+            try:
+                cursor.execute("EXPLAIN " + statement, parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT query_monitor_explain")
+                plan = f"(EXPLAIN failed: {e})"
+            cursor.execute("RELEASE SAVEPOINT query_monitor_explain")
+        finally:
+            cursor.close()
+        return plan
+
+    def _count(self, statement: str) -> None:
+        scope = _current_scope.get()
+        if scope is None or self.n_plus_one_threshold <= 0:
+            return
+        count = scope.counts[statement] = scope.counts.get(statement, 0) + 1
+        # Only reported once per statement, when it reaches the threshold.
+        if count != self.n_plus_one_threshold or scope.allow_repeats:
+            return
+        message = (
+            f"Possible N+1: {scope.describe()} ran the same statement {count} "
+            f"times: {_truncate(statement)}"
+        )
+        if self.raise_on_n_plus_one:
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+class QueryMonitorMiddleware:
+    """Checks each HTTP request's queries for N+1s."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        def describe() -> str:
+            # The router adds the matched route to the scope.
+            route = getattr(scope.get("route"), "path", scope["path"])
+            return f"{scope['method']} {route}"
+
+        with track_queries(describe):
+            await self.app(scope, receive, send)
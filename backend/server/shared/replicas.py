@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import logging
+import math
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. Unknown (NULL) unless it is
+# streaming from the primary: a replica cut off from it has replayed all it
+# received, but has no idea what it is missing. The receiver stops streaming
+# as soon as the connection drops, or after wal_receiver_timeout without
+# hearing from the primary, which otherwise sends keepalives even when idle.
+# Zero once it has replayed everything it received, as the last replayed
+# transaction's time only says how long ago the primary last wrote. Zero for a
+# database that isn't a replica at all, like the one tests use.
+LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN NOT EXISTS"
+    " (SELECT FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+class Replicas:
+    """
+    Read-only replicas of the database, taken in turn. Each one's lag is
+    checked in the background, and replicas too far behind (or unreachable)
+    are skipped until they catch up. Until its lag is first checked, a
+    replica counts as too far behind.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ):
+        self.engines = list(engines)
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds = [math.inf] * len(self.engines)
+        self._next = itertools.count()
+        self._task: asyncio.Task[None] | None = None
+
+    def choose(self) -> AsyncEngine | None:
+        """The next replica that is caught up, or None if none is."""
+        # Checked on first use, so that processes that never read from a
+        # replica never connect to one. Restarted if the loop it ran on is
+        # gone, as when tests start a new one per client.
+        if (
+            self._task is None
+            or self._task.done()
+            or self._task.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._task = asyncio.create_task(self._check_lag_forever())
+
+        start = next(self._next)
+        for i in range(len(self.engines)):
+            index = (start + i) % len(self.engines)
+            if self.lag_seconds[index] <= self.max_lag_seconds:
+                return self.engines[index]
+        return None
+
+    async def check_lag(self) -> None:
+        await asyncio.gather(*(self._check(i) for i in range(len(self.engines))))
+
+    async def _check(self, index: int) -> None:
+        try:
+            async with self.engines[index].connect() as connection:
+                lag = (await connection.execute(LAG_QUERY)).scalar_one()
+        except Exception:
+            logger.warning("Replica %d is unreachable", index, exc_info=True)
+            lag = None
+        # No lag means the replica isn't streaming from the primary, or hasn't
+        # replayed anything yet.
+        self.lag_seconds[index] = math.inf if lag is None else float(lag)
+
+    async def _check_lag_forever(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval_seconds)
+
+    async def dispose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
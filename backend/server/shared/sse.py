@@ -0,0 +1,21 @@
+# Server-Sent Events framing.
+from server.shared.pydantic import BaseModel
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+# A comment line, which EventSource ignores. Sent while there is nothing else
+# to send, so that proxies don't time the stream out and dead connections
+# are noticed.
+SSE_HEARTBEAT = ": heartbeat\n\n"
+
+# Keep proxies (nginx in particular) from buffering the stream.
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: BaseModel, id: str | None = None) -> str:
+    # JSON never contains a raw newline, so the data fits on one data: line.
+    lines = [f"event: {event}"]
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append(f"data: {data.model_dump_json()}")
+    return "\n".join(lines) + "\n\n"
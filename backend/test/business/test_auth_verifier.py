@@ -0,0 +1,69 @@
+# Tests for AuthVerifier's cache of verified tokens.
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.token import create_access_token
+from server.shared.config import Config
+
+
+@pytest.fixture
+def verifier(config: Config) -> AuthVerifier:
+    return AuthVerifier(config.model_copy(update={"token_cache_max_entries": 2}))
+
+
+def _token(config: Config, user_id: str, expires_in: timedelta) -> str:
+    return jwt.encode(
+        {"sub": user_id, "exp": datetime.now(timezone.utc) + expires_in},
+        config.access_token_secret_key,
+        algorithm="HS256",
+    )
+
+
+def test_caches_verified_tokens(verifier: AuthVerifier, config: Config) -> None:
+    token = create_access_token(config, "user-1")
+
+    for _ in range(3):
+        token_info = asyncio.run(verifier.get_user_token_info(token))
+        assert token_info.user_id == "user-1"
+
+    stats = verifier.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 1)
+
+
+def test_rejects_expired_cached_token(verifier: AuthVerifier, config: Config) -> None:
+    token = _token(config, "user-1", timedelta(seconds=1))
+    asyncio.run(verifier.get_user_token_info(token))
+
+    expires_at = jwt.decode(token, options={"verify_signature": False})["exp"]
+    time.sleep(max(0, expires_at - time.time()) + 0.01)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(verifier.get_user_token_info(token))
+    assert e.value.status_code == 401
+    assert verifier.stats().entries == 0
+
+
+def test_rejects_invalid_tokens(verifier: AuthVerifier, config: Config) -> None:
+    wrong_key = jwt.encode({"sub": "user-1"}, "not-the-key", algorithm="HS256")
+    for token in ["garbage", wrong_key]:
+        with pytest.raises(HTTPException):
+            asyncio.run(verifier.get_user_token_info(token))
+    assert verifier.stats().entries == 0
+
+
+def test_evicts_least_recently_used(verifier: AuthVerifier, config: Config) -> None:
+    tokens = [create_access_token(config, f"user-{i}") for i in range(3)]
+    for token in tokens:
+        asyncio.run(verifier.get_user_token_info(token))
+
+    stats = verifier.stats()
+    assert (stats.evictions, stats.entries) == (1, 2)
+
+    # The first token was evicted, so it is verified again.
+    asyncio.run(verifier.get_user_token_info(tokens[0]))
+    assert verifier.stats().misses == 4
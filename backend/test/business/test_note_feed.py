@@ -0,0 +1,132 @@
+# Tests for the live note feed.
+import asyncio
+from typing import AsyncIterator
+
+from server.business.client_note.create import create_client_note
+from server.business.client_note.feed import (
+    NOTE_CHANNEL,
+    follow_client_notes,
+    note_feed_cursor,
+)
+from server.business.client_note.list import note_cursor
+from server.business.client_note.schema import PClientNote, PClientNoteCreate
+from server.data.models.client import Client
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
+from server.shared.config import Config
+from server.shared.databasemanager import DatabaseManager
+from server.shared.listener import PgListener
+
+TIMEOUT = 5
+
+
+def _create_client(database: DatabaseManager, email: str) -> str:
+    with database.create_session() as session:
+        client = Client(email=email, first_name="Feed", last_name="Test")
+        session.add(client)
+        session.commit()
+        return client.id
+
+
+async def _add_note(
+    async_database: AsyncDatabaseManager,
+    cache: Cache,
+    client_id: str,
+    user_id: str,
+    content: str,
+) -> PClientNote:
+    async with async_database.create_session() as session:
+        note = await create_client_note(
+            session, cache, client_id, user_id, PClientNoteCreate(content=content)
+        )
+    assert note is not None
+    return note
+
+
+async def _cursor(
+    async_database: AsyncDatabaseManager, client_id: str, last_event_id: str | None
+) -> str:
+    async with async_database.create_session() as session:
+        return await note_feed_cursor(session, client_id, last_event_id)
+
+
+async def _next_note(feed: AsyncIterator) -> tuple[str, PClientNote]:
+    while True:
+        item = await asyncio.wait_for(anext(feed), TIMEOUT)
+        if item is not None:
+            return item
+
+
+def test_follow_pushes_new_notes(
+    async_database: AsyncDatabaseManager,
+    database: DatabaseManager,
+    config: Config,
+    cache: Cache,
+    user_id: str,
+) -> None:
+    client_id = _create_client(database, "feed-new@example.com")
+
+    async def run() -> list[str]:
+        listener = PgListener(config.database_url, NOTE_CHANNEL)
+        await _add_note(async_database, cache, client_id, user_id, "Before")
+        cursor = await _cursor(async_database, client_id, None)
+        feed = follow_client_notes(async_database, listener, client_id, cursor, 60)
+        try:
+            # Nothing to catch up on, so the feed is waiting for a notification
+            # once the first read is done.
+            first = asyncio.ensure_future(_next_note(feed))
+            await asyncio.sleep(0.5)
+            await _add_note(async_database, cache, client_id, user_id, "After 1")
+            await _add_note(async_database, cache, client_id, user_id, "After 2")
+            _, note1 = await first
+            _, note2 = await _next_note(feed)
+            return [note1.content, note2.content]
+        finally:
+            await feed.aclose()
+            await listener.close()
+
+    assert asyncio.run(run()) == ["After 1", "After 2"]
+
+
+def test_follow_resumes_from_last_event_id(
+    async_database: AsyncDatabaseManager,
+    database: DatabaseManager,
+    config: Config,
+    cache: Cache,
+    user_id: str,
+) -> None:
+    client_id = _create_client(database, "feed-resume@example.com")
+
+    async def run() -> list[str]:
+        listener = PgListener(config.database_url, NOTE_CHANNEL)
+        seen = await _add_note(async_database, cache, client_id, user_id, "Seen")
+        for content in ["Missed 1", "Missed 2"]:
+            await _add_note(async_database, cache, client_id, user_id, content)
+
+        cursor = await _cursor(async_database, client_id, note_cursor(seen))
+        feed = follow_client_notes(async_database, listener, client_id, cursor, 60)
+        try:
+            return [(await _next_note(feed))[1].content for _ in range(2)]
+        finally:
+            await feed.aclose()
+            await listener.close()
+
+    assert asyncio.run(run()) == ["Missed 1", "Missed 2"]
+
+
+def test_follow_sends_heartbeats(
+    async_database: AsyncDatabaseManager, database: DatabaseManager, config: Config
+) -> None:
+    client_id = _create_client(database, "feed-heartbeat@example.com")
+
+    async def run() -> object:
+        listener = PgListener(config.database_url, NOTE_CHANNEL)
+        cursor = await _cursor(async_database, client_id, None)
+        feed = follow_client_notes(async_database, listener, client_id, cursor, 0.1)
+        try:
+            return await asyncio.wait_for(anext(feed), TIMEOUT)
+        finally:
+            await feed.aclose()
+            await listener.close()
+
+    assert asyncio.run(run()) is None
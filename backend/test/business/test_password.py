@@ -0,0 +1,66 @@
+# Tests for PasswordHasher.
+import asyncio
+
+from server.business.auth.password import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    hash_password,
+    hash_rounds,
+)
+
+
+def test_hash_and_verify() -> None:
+    hasher = PasswordHasher(rounds=4, max_concurrency=2, queue_timeout=1)
+
+    async def run() -> None:
+        hashed = await hasher.hash("secret")
+        assert hash_rounds(hashed) == 4
+        assert await hasher.verify("secret", hashed)
+        assert not await hasher.verify("wrong", hashed)
+
+    asyncio.run(run())
+    hasher.shutdown()
+
+
+def test_needs_rehash() -> None:
+    hasher = PasswordHasher(rounds=5, max_concurrency=1, queue_timeout=1)
+    assert not hasher.needs_rehash(hash_password("secret", 5))
+    assert hasher.needs_rehash(hash_password("secret", 4))
+    assert hasher.needs_rehash(hash_password("secret", 6))
+    hasher.shutdown()
+
+
+def test_busy_when_queue_timeout_passes() -> None:
+    # Slow enough that the second verify is still queued when it times out.
+    hashed = hash_password("secret", 12)
+    hasher = PasswordHasher(rounds=12, max_concurrency=1, queue_timeout=0.01)
+
+    async def run() -> list[bool | BaseException]:
+        return await asyncio.gather(
+            hasher.verify("secret", hashed),
+            hasher.verify("secret", hashed),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(run())
+    assert first is True
+    assert isinstance(second, PasswordHasherBusyError)
+    hasher.shutdown()
+
+
+def test_does_not_block_event_loop() -> None:
+    hashed = hash_password("secret", 12)
+    hasher = PasswordHasher(rounds=12, max_concurrency=1, queue_timeout=5)
+
+    async def run() -> int:
+        ticks = 0
+        verify = asyncio.create_task(hasher.verify("secret", hashed))
+        while not verify.done():
+            ticks += 1
+            await asyncio.sleep(0.005)
+        assert verify.result()
+        return ticks
+
+    # The loop kept running other work while bcrypt ran.
+    assert asyncio.run(run()) > 5
+    hasher.shutdown()
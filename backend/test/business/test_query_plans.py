@@ -0,0 +1,312 @@
+# Guard the business layer's queries against regressing to scans.
+#
+# Each test runs a business function, captures the SQL it sent, and EXPLAINs
+# every statement with sequential scans disabled. The tables here are far too
+# small for the planner to prefer an index on its own, but with enable_seqscan
+# off it only falls back to a Seq Scan when no usable index exists. It can
+# still walk a whole unrelated index and filter the rows it reads, so scans
+# with a Filter are treated as regressions too: every predicate on a hot path
+# should be an index condition.
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Generator
+
+import pytest
+from sqlalchemy import Engine, event, text
+
+from server.business.auth.refresh_token import (
+    create_refresh_token,
+    rotate_refresh_token,
+)
+from server.business.client.create import create_client
+from server.business.client.detail import get_client_detail
+from server.business.client.get import get_client, get_clients
+from server.business.client.list import list_clients, list_clients_version
+from server.business.client.schema import PClientCreate
+from server.business.client.search import search_clients
+from server.business.client_note.create import create_client_note
+from server.business.client_note.list import list_client_notes
+from server.business.client_note.schema import PClientNoteCreate
+from server.business.client_note.search import search_client_notes
+from server.data.models.client import Client
+from server.data.models.client_note import ClientNote
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache, InMemoryCache
+from server.shared.databasemanager import DatabaseManager
+
+SEED_CLIENTS = 50
+SEED_NOTES_PER_CLIENT = 20
+
+Statement = tuple[str, Any]
+
+
+@pytest.fixture(scope="module")
+def seeded_client_id(database: DatabaseManager, user_id: str) -> str:
+    with database.create_session() as session:
+        clients = [
+            Client(
+                email=f"plan-{i}@example.com",
+                first_name=f"Plan{i}",
+                last_name="Seed",
+                assigned_user_id=user_id if i % 2 else None,
+                # Notes are added directly below, so fill in what
+                # create_client_note would have maintained.
+                last_contacted_at=(
+                    datetime(2026, 1, 1) + timedelta(days=i) if i % 3 else None
+                ),
+                note_count=SEED_NOTES_PER_CLIENT,
+            )
+            for i in range(SEED_CLIENTS)
+        ]
+        session.add_all(clients)
+        session.flush()
+        session.add_all(
+            ClientNote(
+                client_id=client.id,
+                creator_user_id=user_id,
+                content=f"Seed note {j}",
+            )
+            for client in clients
+            for j in range(SEED_NOTES_PER_CLIENT)
+        )
+        session.commit()
+        client_id = clients[0].id
+
+    with database.engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+    return client_id
+
+
+def _capture(
+    async_database: AsyncDatabaseManager,
+    call: Callable[[Any], Awaitable[Any]],
+) -> list[Statement]:
+    statements: list[Statement] = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        statements.append((statement, parameters))
+
+    async def run() -> None:
+        async with async_database.create_session() as session:
+            await call(session)
+
+    sync_engine = async_database.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        asyncio.run(run())
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return [
+        (statement, parameters)
+        for statement, parameters in statements
+        if statement.lstrip().split(None, 1)[0].upper()
+        in ("SELECT", "INSERT", "UPDATE", "DELETE")
+    ]
+
+
+SCAN_NODE_TYPES = ("Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+
+
+def _bad_scans(
+    plan: dict[str, Any], allowed_filters: tuple[str, ...]
+) -> Generator[str, None, None]:
+    if plan["Node Type"] == "Seq Scan":
+        yield f"Seq Scan on {plan['Relation Name']}"
+    elif (
+        plan["Node Type"] in SCAN_NODE_TYPES
+        and "Filter" in plan
+        and not any(allowed in plan["Filter"] for allowed in allowed_filters)
+    ):
+        yield f"{plan['Node Type']} on {plan['Relation Name']} filtering {plan['Filter']}"
+    for child in plan.get("Plans", []):
+        yield from _bad_scans(child, allowed_filters)
+
+
+def assert_indexed_plans(
+    engine: Engine,
+    statements: list[Statement],
+    allowed_filters: tuple[str, ...] = (),
+) -> None:
+    """allowed_filters lists expressions that may appear in a scan's Filter,
+    for predicates that can't be index conditions by design."""
+    assert statements, "No statements were captured"
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            result = conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            ).scalar_one()
+            plan = (result if isinstance(result, list) else json.loads(result))[0]
+            bad_scans = list(_bad_scans(plan["Plan"], allowed_filters))
+            assert not bad_scans, (
+                f"{'; '.join(bad_scans)} for:\n{statement}\n"
+                f"{json.dumps(plan['Plan'], indent=2)}"
+            )
+        conn.rollback()
+
+
+@pytest.mark.parametrize("sort", ["name", "email", "created_at", "last_contacted_at"])
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_list_clients_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+    sort: str,
+    direction: str,
+) -> None:
+    async def call(session) -> None:
+        page = await list_clients(session, 10, sort=sort, direction=direction)
+        await list_clients_version(
+            session, 10, sort=sort, direction=direction, cursor=page.next_cursor
+        )
+        await list_clients(
+            session, 10, sort=sort, direction=direction, cursor=page.next_cursor
+        )
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+@pytest.mark.parametrize("query", ["p", "pla", "plan7", "plna"])
+def test_search_clients_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+    query: str,
+) -> None:
+    async def call(session) -> None:
+        await search_clients(session, query)
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_get_client_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        await get_client(session, seeded_client_id)
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_get_clients_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        await get_clients(session, [seeded_client_id, "missing-id"])
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_get_client_detail_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        # An empty cache, so that every part is queried.
+        cache = InMemoryCache(max_entries=100, default_ttl=60)
+        await get_client_detail(async_database, cache, seeded_client_id, 10)
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_create_client_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        await create_client(
+            session,
+            PClientCreate(
+                email="plan-created@example.com", first_name="Plan", last_name="New"
+            ),
+        )
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_list_client_notes_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        page = await list_client_notes(session, seeded_client_id, 5)
+        await list_client_notes(session, seeded_client_id, 5, before=page.next_cursor)
+        await list_client_notes(session, seeded_client_id, 5, after=page.next_cursor)
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_search_client_notes_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+) -> None:
+    async def call(session) -> None:
+        page = await search_client_notes(session, "seed note", 5)
+        await search_client_notes(session, "seed note", 5, cursor=page.next_cursor)
+
+    # Rank depends on the query, so the keyset on it can only filter the rows
+    # the GIN index matched.
+    assert_indexed_plans(
+        migrated_database,
+        _capture(async_database, call),
+        allowed_filters=("ts_rank_cd",),
+    )
+
+
+def test_create_client_note_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    seeded_client_id: str,
+    user_id: str,
+    cache: Cache,
+) -> None:
+    async def call(session) -> None:
+        await create_client_note(
+            session,
+            cache,
+            seeded_client_id,
+            user_id,
+            PClientNoteCreate(content="Plan check"),
+        )
+
+    assert_indexed_plans(migrated_database, _capture(async_database, call))
+
+
+def test_rotate_refresh_token_plan(
+    async_database: AsyncDatabaseManager,
+    migrated_database: Engine,
+    user_id: str,
+) -> None:
+    async def create() -> str:
+        async with async_database.create_session() as session:
+            token = create_refresh_token(session, user_id)
+            await session.commit()
+            return token
+
+    token = asyncio.run(create())
+
+    async def call(session) -> None:
+        await rotate_refresh_token(session, token)
+        # Presenting it again takes the reuse path.
+        await rotate_refresh_token(session, token)
+
+    # Tokens are found through the unique index on token_hash (or the family
+    # index), so the filters only ever check the handful of rows found.
+    assert_indexed_plans(
+        migrated_database,
+        _capture(async_database, call),
+        allowed_filters=("revoked_at IS NULL",),
+    )
@@ -4,14 +4,18 @@ from typing import Generator
 import pytest
 from alembic import command
 from alembic.config import Config as AlembicConfig
-from sqlalchemy import Engine, create_engine, text
+from sqlalchemy import Engine, NullPool, create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session
 
 from server.business.auth.auth_verifier import AuthVerifier
-from server.business.auth.password import hash_password
+from server.business.auth.password import PasswordHasher, hash_password
 from server.data.models.user import User
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache, InMemoryCache
 from server.shared.config import Config, Env
 from server.shared.databasemanager import DatabaseManager
+from server.shared.querymonitor import QueryMonitor
 
 
 @pytest.fixture(scope="session")
@@ -28,6 +32,8 @@ def config(database_url: str) -> Config:
         env=Env.TEST,
         database_url=database_url,
         access_token_secret_key="test-secret-key",
+        # The minimum cost, to keep tests fast.
+        bcrypt_rounds=4,
     )
 
 
@@ -36,8 +42,7 @@ def auth_verifier(config: Config) -> AuthVerifier:
     return AuthVerifier(config)
 
 
-@pytest.fixture(scope="session")
-def create_database_if_not_exists(database_url: str) -> None:
+def _create_database_if_not_exists(database_url: str) -> None:
     default_db_url = database_url.rsplit("/", 1)[0] + "/postgres"
     default_engine = create_engine(default_db_url)
 
@@ -57,13 +62,7 @@ def create_database_if_not_exists(database_url: str) -> None:
     default_engine.dispose()
 
 
-@pytest.fixture(scope="session")
-def engine(config: Config, create_database_if_not_exists: None) -> Engine:
-    return create_engine(config.database_url)
-
-
-@pytest.fixture(scope="session")
-def migrated_database(engine: Engine, config: Config) -> Generator[Engine, None, None]:
+def _migrate(engine: Engine, database_url: str) -> None:
     alembic_cfg = AlembicConfig()
     alembic_cfg.set_main_option(
         "script_location",
@@ -78,11 +77,47 @@ def migrated_database(engine: Engine, config: Config) -> Generator[Engine, None,
         session.execute(text("CREATE SCHEMA public;"))
         session.commit()
 
-    os.environ["DATABASE_URL"] = config.database_url
-    alembic_cfg.set_main_option("sqlalchemy.url", config.database_url)
+    os.environ["DATABASE_URL"] = database_url
+    alembic_cfg.set_main_option("sqlalchemy.url", database_url)
     command.upgrade(alembic_cfg, "head")
 
+
+@pytest.fixture(scope="session")
+def create_database_if_not_exists(database_url: str) -> None:
+    _create_database_if_not_exists(database_url)
+
+
+@pytest.fixture(scope="session")
+def engine(config: Config, create_database_if_not_exists: None) -> Engine:
+    return create_engine(config.database_url)
+
+
+@pytest.fixture(scope="session")
+def migrated_database(engine: Engine, config: Config) -> Generator[Engine, None, None]:
+    _migrate(engine, config.database_url)
+    yield engine
+
+
+@pytest.fixture(scope="session")
+def replica_database_url(database_url: str) -> str:
+    return os.environ.get("REPLICA_DATABASE_URL", database_url + "_replica")
+
+
+@pytest.fixture(scope="session")
+def replica_database(
+    replica_database_url: str, migrated_database: Engine, config: Config
+) -> Generator[Engine, None, None]:
+    """
+    A second database standing in for a replica of the test database. Nothing
+    is replicated to it, so what tests read through it shows which database
+    they read from.
+    """
+    _create_database_if_not_exists(replica_database_url)
+    engine = create_engine(replica_database_url)
+    _migrate(engine, replica_database_url)
+    os.environ["DATABASE_URL"] = config.database_url
     yield engine
+    engine.dispose()
 
 
 @pytest.fixture(scope="session")
@@ -90,6 +125,28 @@ def database(migrated_database: Engine) -> DatabaseManager:
     return DatabaseManager(migrated_database)
 
 
+@pytest.fixture(scope="session")
+def async_database(migrated_database: Engine, config: Config) -> AsyncDatabaseManager:
+    # TestClient runs the app on a fresh event loop per client, and async
+    # connections can't move between loops, so don't pool them in tests.
+    return AsyncDatabaseManager(
+        create_async_engine(config.database_url, poolclass=NullPool),
+        QueryMonitor.from_config(config),
+    )
+
+
+@pytest.fixture(scope="session")
+def password_hasher(config: Config) -> Generator[PasswordHasher, None, None]:
+    password_hasher = PasswordHasher.from_config(config)
+    yield password_hasher
+    password_hasher.shutdown()
+
+
+@pytest.fixture(scope="session")
+def cache(config: Config) -> Cache:
+    return InMemoryCache(config.cache_max_entries, config.cache_ttl_seconds)
+
+
 @pytest.fixture
 def session(database: DatabaseManager) -> Generator[Session, None, None]:
     with database.create_session() as session:
@@ -98,11 +155,11 @@ def session(database: DatabaseManager) -> Generator[Session, None, None]:
 
 
 @pytest.fixture(scope="session")
-def user_id(database: DatabaseManager) -> str:
+def user_id(database: DatabaseManager, config: Config) -> str:
     with database.create_session() as session:
         user = User(
             email="testuser@example.com",
-            password_hashed=hash_password("testpassword"),
+            password_hashed=hash_password("testpassword", config.bcrypt_rounds),
         )
         session.add(user)
         session.commit()
@@ -3,20 +3,48 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.password import PasswordHasher
 from server.business.auth.token import create_access_token
+from server.business.client_note.feed import NOTE_CHANNEL
 from server.routes.routes import get_all_routes
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
 from server.shared.config import Config
-from server.shared.databasemanager import DatabaseManager
+from server.shared.listener import PgListener
+from server.shared.metrics import Metrics, MetricsMiddleware
+from server.shared.querymonitor import QueryMonitorMiddleware
+
+
+@pytest.fixture(scope="session")
+def metrics(async_database: AsyncDatabaseManager) -> Metrics:
+    metrics = Metrics()
+    metrics.instrument_engine(async_database.engine)
+    return metrics
 
 
 @pytest.fixture(scope="session")
 def app(
     config: Config,
-    database: DatabaseManager,
+    async_database: AsyncDatabaseManager,
     auth_verifier: AuthVerifier,
+    cache: Cache,
+    password_hasher: PasswordHasher,
+    metrics: Metrics,
 ) -> FastAPI:
     app = FastAPI()
-    app.include_router(get_all_routes(config, database, auth_verifier))
+    app.add_middleware(QueryMonitorMiddleware)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    app.include_router(
+        get_all_routes(
+            config,
+            async_database,
+            auth_verifier,
+            cache,
+            password_hasher,
+            PgListener.from_config(config, NOTE_CHANNEL),
+            metrics,
+        )
+    )
     return app
 
 
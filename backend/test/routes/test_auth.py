@@ -1,6 +1,12 @@
+import pytest
 from fastapi.testclient import TestClient
 
-from server.business.auth.password import hash_password
+from server.business.auth.password import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    hash_password,
+    hash_rounds,
+)
 from server.data.models.user import User
 from server.shared.databasemanager import DatabaseManager
 
@@ -59,3 +65,125 @@ def test_check_auth(test_client: TestClient) -> None:
 def test_check_auth_unauthenticated(unauthenticated_test_client: TestClient) -> None:
     response = unauthenticated_test_client.get("/check_auth")
     assert response.status_code == 401
+
+
+def test_login_rehashes_password_at_configured_cost(
+    unauthenticated_test_client: TestClient,
+    database: DatabaseManager,
+    password_hasher: PasswordHasher,
+) -> None:
+    with database.create_session() as session:
+        user = User(
+            email="rehash@example.com",
+            password_hashed=hash_password("testpassword", password_hasher.rounds + 1),
+        )
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    for _ in range(2):
+        response = unauthenticated_test_client.post(
+            "/token",
+            json={"email": "rehash@example.com", "password": "testpassword"},
+        )
+        assert response.status_code == 200
+
+    with database.create_session() as session:
+        password_hashed = session.get(User, user_id).password_hashed
+    assert hash_rounds(password_hashed) == password_hasher.rounds
+
+
+def test_login_when_password_hasher_busy(
+    unauthenticated_test_client: TestClient,
+    password_hasher: PasswordHasher,
+    user_id: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def busy(plain: str, hashed: str) -> bool:
+        raise PasswordHasherBusyError()
+
+    monkeypatch.setattr(password_hasher, "verify", busy)
+    response = unauthenticated_test_client.post(
+        "/token",
+        json={"email": "testuser@example.com", "password": "testpassword"},
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def _login(client: TestClient, database: DatabaseManager, email: str) -> dict:
+    with database.create_session() as session:
+        session.add(User(email=email, password_hashed=hash_password("testpassword", 4)))
+        session.commit()
+
+    response = client.post("/token", json={"email": email, "password": "testpassword"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_token(
+    unauthenticated_test_client: TestClient, database: DatabaseManager
+) -> None:
+    tokens = _login(unauthenticated_test_client, database, "refresh@example.com")
+
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    response = unauthenticated_test_client.get(
+        "/check_auth",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    # The new refresh token can be used in turn.
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": refreshed["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_family(
+    unauthenticated_test_client: TestClient, database: DatabaseManager
+) -> None:
+    tokens = _login(unauthenticated_test_client, database, "refresh-reuse@example.com")
+    refreshed = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    ).json()
+
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+    # Reusing the old token also ended the session rotated from it.
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": refreshed["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+def test_revoke_refresh_token(
+    unauthenticated_test_client: TestClient, database: DatabaseManager
+) -> None:
+    tokens = _login(unauthenticated_test_client, database, "refresh-revoke@example.com")
+
+    response = unauthenticated_test_client.post(
+        "/token/revoke", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+def test_refresh_token_invalid(unauthenticated_test_client: TestClient) -> None:
+    response = unauthenticated_test_client.post(
+        "/token/refresh", json={"refresh_token": "not-a-token"}
+    )
+    assert response.status_code == 401
@@ -1,8 +1,13 @@
+from datetime import datetime
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
 
 from server.data.models.client import Client
 from server.data.models.client_note import ClientNote
 from server.shared.databasemanager import DatabaseManager
+from server.shared.pagination import encode_cursor
 
 
 def test_list_clients(test_client: TestClient, database: DatabaseManager) -> None:
@@ -91,6 +96,121 @@ def test_get_client_unauthenticated(
     assert response.status_code == 401
 
 
+def test_get_client_detail(
+    test_client: TestClient, database: DatabaseManager, user_id: str
+) -> None:
+    with database.create_session() as session:
+        client = Client(
+            email="full-detail@example.com",
+            first_name="Gail",
+            last_name="Gray",
+            assigned_user_id=user_id,
+        )
+        session.add(client)
+        session.commit()
+        client_id = client.id
+
+    for content, category in [("One", "call"), ("Two", "call"), ("Three", "email")]:
+        test_client.post(
+            f"/client/{client_id}/note",
+            json={"content": content, "category": category},
+        )
+
+    response = test_client.get(f"/client/{client_id}/detail", params={"limit": 2})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["client"]["id"] == client_id
+    assert data["client"]["note_count"] == 3
+    assert [note["content"] for note in data["notes"]["data"]] == ["Three", "Two"]
+    assert data["notes"]["next_cursor"] is not None
+    assert data["note_counts"] == {
+        "note": 0,
+        "call": 2,
+        "meeting": 0,
+        "email": 1,
+        "follow_up": 0,
+    }
+    assert data["advisor"] == {"id": user_id, "email": "testuser@example.com"}
+
+
+def test_get_client_detail_without_advisor(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    with database.create_session() as session:
+        client = Client(
+            email="no-advisor@example.com", first_name="Hal", last_name="Green"
+        )
+        session.add(client)
+        session.commit()
+        client_id = client.id
+
+    data = test_client.get(f"/client/{client_id}/detail").json()
+    assert data["advisor"] is None
+    assert data["notes"]["data"] == []
+    assert set(data["note_counts"].values()) == {0}
+
+    test_client.post(
+        f"/client/{client_id}/note", json={"content": "One", "category": "email"}
+    )
+    data = test_client.get(f"/client/{client_id}/detail").json()
+    assert data["advisor"] is None
+    assert data["note_counts"]["email"] == 1
+
+
+def test_get_client_detail_not_found(test_client: TestClient) -> None:
+    assert test_client.get("/client/nonexistent-id/detail").status_code == 404
+
+
+def test_batch_get_clients(test_client: TestClient, database: DatabaseManager) -> None:
+    with database.create_session() as session:
+        clients = [
+            Client(
+                email=f"batch-{i}@example.com", first_name=f"Batch{i}", last_name="Get"
+            )
+            for i in range(3)
+        ]
+        session.add_all(clients)
+        session.commit()
+        ids = [client.id for client in clients]
+
+    response = test_client.post(
+        "/client/batch_get",
+        json={"ids": [ids[2], "missing-id", ids[0], ids[2]]},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [client["id"] for client in data["data"]] == [ids[2], ids[0]]
+    assert data["data"][0]["email"] == "batch-2@example.com"
+    assert data["missing_ids"] == ["missing-id"]
+
+    # Any case of an id is the same id.
+    response = test_client.post(
+        "/client/batch_get", json={"ids": [ids[1].upper(), ids[1]]}
+    )
+    data = response.json()
+    assert [client["id"] for client in data["data"]] == [ids[1]]
+    assert data["missing_ids"] == []
+
+
+def test_batch_get_clients_limits(test_client: TestClient) -> None:
+    assert test_client.post("/client/batch_get", json={"ids": []}).status_code == 422
+    response = test_client.post(
+        "/client/batch_get", json={"ids": [str(i) for i in range(101)]}
+    )
+    assert response.status_code == 422
+
+
+def test_batch_get_clients_unauthenticated(
+    unauthenticated_test_client: TestClient,
+) -> None:
+    response = unauthenticated_test_client.post(
+        "/client/batch_get", json={"ids": ["any"]}
+    )
+    assert response.status_code == 401
+
+
 def test_create_client(test_client: TestClient) -> None:
     response = test_client.post(
         "/client",
@@ -144,30 +264,56 @@ def test_create_client_unauthenticated(
 
 
 def test_get_client_last_contacted_at_with_notes(
-    test_client: TestClient, database: DatabaseManager, user_id: str
+    test_client: TestClient, database: DatabaseManager
 ) -> None:
     with database.create_session() as session:
         client = Client(
             email="contacted@example.com", first_name="Grace", last_name="Lee"
         )
         session.add(client)
-        session.flush()
-        note1 = ClientNote(
-            client_id=client.id, creator_user_id=user_id, content="First note"
-        )
-        note2 = ClientNote(
-            client_id=client.id, creator_user_id=user_id, content="Second note"
-        )
-        session.add(note1)
-        session.add(note2)
         session.commit()
         client_id = client.id
 
+    test_client.post(f"/client/{client_id}/note", json={"content": "First note"})
+    second = test_client.post(
+        f"/client/{client_id}/note", json={"content": "Second note"}
+    ).json()
+
     response = test_client.get(f"/client/{client_id}")
     assert response.status_code == 200
 
     data = response.json()
-    assert data["last_contacted_at"] is not None
+    assert data["last_contacted_at"] == second["created_at"]
+    assert data["note_count"] == 2
+
+
+def test_note_does_not_move_last_contacted_at_back(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    # As if a note from a transaction that started later had committed first.
+    later = datetime(2100, 1, 1)
+    with database.create_session() as session:
+        client = Client(
+            email="contacted-later@example.com",
+            first_name="Ivy",
+            last_name="Chen",
+            last_contacted_at=later,
+        )
+        session.add(client)
+        session.commit()
+        client_id = client.id
+
+    test_client.post(f"/client/{client_id}/note", json={"content": "Earlier note"})
+
+    data = test_client.get(f"/client/{client_id}").json()
+    assert datetime.fromisoformat(data["last_contacted_at"]) == later
+    assert data["note_count"] == 1
+
+    # Or it would come first in every other test's most recently contacted.
+    with database.create_session() as session:
+        session.execute(delete(ClientNote).where(ClientNote.client_id == client_id))
+        session.execute(delete(Client).where(Client.id == client_id))
+        session.commit()
 
 
 def test_get_client_last_contacted_at_without_notes(
@@ -186,10 +332,11 @@ def test_get_client_last_contacted_at_without_notes(
 
     data = response.json()
     assert data["last_contacted_at"] is None
+    assert data["note_count"] == 0
 
 
 def test_list_clients_last_contacted_at(
-    test_client: TestClient, database: DatabaseManager, user_id: str
+    test_client: TestClient, database: DatabaseManager
 ) -> None:
     with database.create_session() as session:
         client_with = Client(
@@ -200,13 +347,10 @@ def test_list_clients_last_contacted_at(
         )
         session.add(client_with)
         session.add(client_without)
-        session.flush()
-        session.add(
-            ClientNote(
-                client_id=client_with.id, creator_user_id=user_id, content="A note"
-            )
-        )
         session.commit()
+        client_with_id = client_with.id
+
+    test_client.post(f"/client/{client_with_id}/note", json={"content": "A note"})
 
     response = test_client.get("/client")
     assert response.status_code == 200
@@ -215,3 +359,420 @@ def test_list_clients_last_contacted_at(
     by_email = {c["email"]: c for c in data["data"]}
     assert by_email["list-contacted@example.com"]["last_contacted_at"] is not None
     assert by_email["list-no-contact@example.com"]["last_contacted_at"] is None
+
+
+def _list_all_clients(test_client: TestClient, **params: str) -> list[dict]:
+    clients = []
+    cursor = None
+    while True:
+        query = {**params, "limit": "2"}
+        if cursor is not None:
+            query["cursor"] = cursor
+        response = test_client.get("/client", params=query)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["data"]) <= 2
+        clients.extend(page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return clients
+
+
+def test_list_clients_paginates_by_name(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    with database.create_session() as session:
+        for i in range(3):
+            session.add(
+                Client(
+                    email=f"page-{i}@example.com", first_name="Paige", last_name=f"{i}"
+                )
+            )
+        session.commit()
+
+    clients = _list_all_clients(test_client)
+
+    ids = [c["id"] for c in clients]
+    assert len(ids) == len(set(ids))
+    names = [(c["first_name"], c["last_name"], c["id"]) for c in clients]
+    assert names == sorted(names)
+    emails = [c["email"] for c in clients]
+    assert {"page-0@example.com", "page-1@example.com", "page-2@example.com"} <= set(
+        emails
+    )
+
+
+def test_list_clients_paginates_by_last_contacted_at(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    with database.create_session() as session:
+        recent = Client(
+            email="sort-recent@example.com", first_name="Rita", last_name="Recent"
+        )
+        never = Client(email="sort-never@example.com", first_name="Ned", last_name="Never")
+        session.add(recent)
+        session.add(never)
+        session.commit()
+        recent_id = recent.id
+
+    test_client.post(f"/client/{recent_id}/note", json={"content": "Just called"})
+
+    for direction in ("desc", "asc"):
+        clients = _list_all_clients(
+            test_client, sort="last_contacted_at", direction=direction
+        )
+        ids = [c["id"] for c in clients]
+        assert len(ids) == len(set(ids))
+
+        contacted = [c["last_contacted_at"] for c in clients if c["last_contacted_at"]]
+        never_contacted = [c for c in clients if c["last_contacted_at"] is None]
+        if direction == "desc":
+            assert contacted == sorted(contacted, reverse=True)
+            assert clients[len(contacted) :] == never_contacted
+            assert clients[0]["email"] == "sort-recent@example.com"
+        else:
+            assert contacted == sorted(contacted)
+            assert clients[: len(never_contacted)] == never_contacted
+        assert "sort-never@example.com" in [c["email"] for c in never_contacted]
+
+
+def test_list_clients_invalid_cursor(test_client: TestClient) -> None:
+    response = test_client.get("/client", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_list_clients_cursor_with_wrong_types(test_client: TestClient) -> None:
+    id = "00000000-0000-7000-8000-000000000000"
+    for sort, values in (
+        ("name", [1, 2, id]),
+        ("name", ["First", None, id]),
+        ("email", [{"email": "x"}]),
+    ):
+        cursor = encode_cursor([sort, "asc", *values])
+        response = test_client.get(
+            "/client", params={"sort": sort, "direction": "asc", "cursor": cursor}
+        )
+        assert response.status_code == 400
+
+
+def test_list_clients_cursor_for_other_sort(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    with database.create_session() as session:
+        session.add(Client(email="mismatch-a@example.com", first_name="M", last_name="A"))
+        session.add(Client(email="mismatch-b@example.com", first_name="M", last_name="B"))
+        session.commit()
+
+    page = test_client.get("/client", params={"limit": "1"}).json()
+    response = test_client.get(
+        "/client", params={"cursor": page["next_cursor"], "sort": "created_at"}
+    )
+    assert response.status_code == 400
+
+
+def test_list_clients_limit_is_capped(test_client: TestClient) -> None:
+    response = test_client.get("/client", params={"limit": "100000"})
+    assert response.status_code == 422
+
+
+@pytest.fixture(scope="module")
+def search_clients(database: DatabaseManager) -> None:
+    with database.create_session() as session:
+        session.add_all(
+            [
+                Client(
+                    email="zephyrine.q@example.com",
+                    first_name="Zephyrine",
+                    last_name="Quackenbush",
+                ),
+                Client(
+                    email="zeph.jonas@example.com",
+                    first_name="Zeph",
+                    last_name="Jonasson",
+                ),
+                Client(
+                    email="wquackenbos@example.com",
+                    first_name="Wilma",
+                    last_name="Quackenbos",
+                ),
+            ]
+        )
+        session.commit()
+
+
+def _search_emails(test_client: TestClient, q: str, **params: str) -> list[str]:
+    response = test_client.get("/client/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [c["email"] for c in response.json()]
+
+
+@pytest.mark.usefixtures("search_clients")
+def test_search_clients(test_client: TestClient) -> None:
+    # Prefix matches on each column.
+    assert _search_emails(test_client, "zephyr") == ["zephyrine.q@example.com"]
+    assert _search_emails(test_client, "jonass") == ["zeph.jonas@example.com"]
+    assert _search_emails(test_client, "wquack") == ["wquackenbos@example.com"]
+
+    # Every term has to match.
+    assert _search_emails(test_client, "zeph quack") == ["zephyrine.q@example.com"]
+
+    # Fuzzy matches rank below prefix matches.
+    emails = _search_emails(test_client, "quackenbush")
+    assert emails[0] == "zephyrine.q@example.com"
+    assert "wquackenbos@example.com" in emails
+
+    # Typos still find the client.
+    assert "zephyrine.q@example.com" in _search_emails(test_client, "Quakenbush")
+
+
+@pytest.mark.usefixtures("search_clients")
+def test_search_clients_escapes_wildcards(test_client: TestClient) -> None:
+    assert _search_emails(test_client, "%") == []
+    assert _search_emails(test_client, "z_ph") == []
+
+
+@pytest.mark.usefixtures("search_clients")
+def test_search_clients_limit(test_client: TestClient) -> None:
+    assert len(_search_emails(test_client, "zeph", limit="1")) == 1
+
+    response = test_client.get("/client/search", params={"q": "zeph", "limit": 51})
+    assert response.status_code == 422
+
+
+def test_search_clients_requires_query(test_client: TestClient) -> None:
+    response = test_client.get("/client/search", params={"q": ""})
+    assert response.status_code == 422
+
+
+def test_import_clients_csv(test_client: TestClient, database: DatabaseManager) -> None:
+    with database.create_session() as session:
+        session.add(
+            Client(email="import-existing@example.com", first_name="Old", last_name="Name")
+        )
+        session.commit()
+
+    body = (
+        "email,first_name,last_name\n"
+        "Import-Existing@example.com,New,Name\n"
+        'import-new@example.com,"Quoted, ""Name""",Person\n'
+        "import-short@example.com,Short\n"
+        'import-multiline@example.com,"Two\nLines",Person\n'
+        "import-new@example.com,Later,Person\n"
+        ",No,Email\n"
+    )
+    response = test_client.post(
+        "/client/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert data["updated"] == 1
+    assert data["unchanged"] == 0
+    assert data["error_count"] == 3
+    assert data["errors"] == [
+        {"line": 3, "error": "Superseded by line 7, which has the same email"},
+        {"line": 4, "error": "Expected 3 fields, got 2"},
+        {"line": 8, "error": "email: Must not be empty"},
+    ]
+
+    with database.create_session() as session:
+        clients = {
+            client.email: client
+            for client in session.query(Client).filter(
+                Client.email.like("import-%@example.com")
+            )
+        }
+    assert clients["import-existing@example.com"].first_name == "New"
+    assert clients["import-new@example.com"].first_name == "Later"
+    assert clients["import-multiline@example.com"].first_name == "Two\nLines"
+
+    # Importing the same file again changes nothing.
+    response = test_client.post(
+        "/client/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    data = response.json()
+    assert (data["created"], data["updated"], data["unchanged"]) == (0, 0, 3)
+
+
+def test_import_clients_csv_quote_mid_field(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    # Only a quote at the start of a field opens a quoted field, so the rows
+    # after this one are read as rows of their own.
+    body = (
+        "email,first_name,last_name\n"
+        'import-quote-1@example.com,Ann,O"Neil\n'
+        "import-quote-2@example.com,Bob,Jones\n"
+        "import-quote-3@example.com,Cat\n"
+        "import-quote-4@example.com,Dan,Smith\n"
+    )
+    response = test_client.post(
+        "/client/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 3
+    assert data["errors"] == [{"line": 4, "error": "Expected 3 fields, got 2"}]
+
+    with database.create_session() as session:
+        client = (
+            session.query(Client)
+            .filter(Client.email == "import-quote-1@example.com")
+            .one()
+        )
+    assert client.last_name == 'O"Neil'
+
+
+def test_import_clients_csv_unterminated_quote(test_client: TestClient) -> None:
+    body = (
+        "email,first_name,last_name\n"
+        'import-open@example.com,"Open,Quote\n'
+        + "import-lost@example.com,Lost,Row\n" * 150
+    )
+    response = test_client.post(
+        "/client/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+
+    # The open field gives up after so many lines, and the lines after those
+    # are read as rows again: 51 of them, one kept and the others superseded.
+    data = response.json()
+    assert data["errors"][0] == {
+        "line": 2,
+        "error": "Invalid CSV: quoted field spans over 100 lines",
+    }
+    assert data["created"] == 1
+    assert data["error_count"] == 1 + 50
+
+
+def test_import_clients_ndjson(test_client: TestClient) -> None:
+    body = (
+        '{"email": "ndjson-1@example.com", "first_name": "Nd", "last_name": "One"}\n'
+        "\n"
+        "not json\n"
+        '["not", "an", "object"]\n'
+        '{"email": "ndjson-2@example.com", "first_name": "Nd"}\n'
+        '{"email": "ndjson-3@example.com", "first_name": "Nd", "last_name": "Three"}'
+    )
+    response = test_client.post("/client/import?format=ndjson", content=body)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["created"] == 2
+    assert [error["line"] for error in data["errors"]] == [3, 4, 5]
+    assert data["errors"][1]["error"] == "Expected a JSON object"
+    assert data["errors"][2]["error"] == "last_name: Field required"
+
+
+def test_import_clients_missing_columns(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/client/import",
+        content="email,name\nimport-bad@example.com,Bad\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 400
+    assert "first_name, last_name" in response.json()["detail"]
+
+
+def test_import_clients_unknown_format(test_client: TestClient) -> None:
+    response = test_client.post(
+        "/client/import", content="{}", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 415
+
+
+def test_import_clients_unauthenticated(
+    unauthenticated_test_client: TestClient,
+) -> None:
+    response = unauthenticated_test_client.post(
+        "/client/import?format=csv", content="email,first_name,last_name\n"
+    )
+    assert response.status_code == 401
+
+
+def test_get_client_etag(test_client: TestClient, database: DatabaseManager) -> None:
+    with database.create_session() as session:
+        client = Client(email="etag@example.com", first_name="Etag", last_name="Test")
+        session.add(client)
+        session.commit()
+        client_id = client.id
+
+    response = test_client.get(f"/client/{client_id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    response = test_client.get(f"/client/{client_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = test_client.get(
+        f"/client/{client_id}", headers={"If-None-Match": f'"other", W/{etag}'}
+    )
+    assert response.status_code == 304
+
+    test_client.post(f"/client/{client_id}/note", json={"content": "Changes it"})
+    response = test_client.get(f"/client/{client_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_list_clients_etag(test_client: TestClient) -> None:
+    params = {"sort": "created_at", "limit": 5}
+    response = test_client.get("/client", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = test_client.get("/client", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # A different page of the same list has its own ETag.
+    response = test_client.get(
+        "/client", params={**params, "limit": 4}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    test_client.post(
+        "/client",
+        json={"email": "etag-list@example.com", "first_name": "New", "last_name": "Client"},
+    )
+    response = test_client.get("/client", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"][0]["email"] == "etag-list@example.com"
+
+    # Loaded differently after a stale ETag, but the same page and ETag.
+    unconditional = test_client.get("/client", params=params)
+    assert response.json() == unconditional.json()
+    assert response.headers["etag"] == unconditional.headers["etag"]
+
+
+def test_get_client_is_cached_until_changed(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    with database.create_session() as session:
+        client = Client(email="cached@example.com", first_name="Cached", last_name="Test")
+        session.add(client)
+        session.commit()
+        client_id = client.id
+
+    hits = test_client.get("/cache/stats").json()["data"]["hits"]
+    assert test_client.get(f"/client/{client_id}").json()["note_count"] == 0
+    assert test_client.get(f"/client/{client_id}").json()["note_count"] == 0
+    assert test_client.get("/cache/stats").json()["data"]["hits"] > hits
+
+    test_client.post(f"/client/{client_id}/note", json={"content": "Invalidates"})
+    assert test_client.get(f"/client/{client_id}").json()["note_count"] == 1
+
+    test_client.post(
+        "/client/import",
+        content="email,first_name,last_name\ncached@example.com,Renamed,Test\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert test_client.get(f"/client/{client_id}").json()["first_name"] == "Renamed"
+
+
+def test_cache_stats_unauthenticated(unauthenticated_test_client: TestClient) -> None:
+    assert unauthenticated_test_client.get("/cache/stats").status_code == 401
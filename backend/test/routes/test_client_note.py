@@ -1,8 +1,11 @@
 # Tests for client note endpoints.
+from datetime import datetime
+
 from fastapi.testclient import TestClient
 
 from server.data.models.client import Client
 from server.shared.databasemanager import DatabaseManager
+from server.shared.pagination import encode_cursor
 
 
 def _create_client(database: DatabaseManager, email: str) -> str:
@@ -118,3 +121,259 @@ def test_list_notes_unauthenticated(
 
     response = unauthenticated_test_client.get(f"/client/{client_id}/note")
     assert response.status_code == 401
+
+
+def test_list_notes_paginates_with_before(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-page-before@example.com")
+    created = [
+        test_client.post(
+            f"/client/{client_id}/note", json={"content": f"Note {i}"}
+        ).json()
+        for i in range(5)
+    ]
+
+    notes = []
+    before = None
+    while True:
+        params = {"limit": "2"}
+        if before is not None:
+            params["before"] = before
+        response = test_client.get(f"/client/{client_id}/note", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["data"]) <= 2
+        notes.extend(page["data"])
+        before = page["next_cursor"]
+        if before is None:
+            break
+
+    assert [n["id"] for n in notes] == [n["id"] for n in reversed(created)]
+
+
+def test_list_notes_after_returns_newer_notes(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-page-after@example.com")
+    test_client.post(f"/client/{client_id}/note", json={"content": "Old note"})
+
+    first_page = test_client.get(f"/client/{client_id}/note").json()
+    after = first_page["prev_cursor"]
+
+    response = test_client.get(f"/client/{client_id}/note", params={"after": after})
+    assert response.status_code == 200
+    assert response.json() == {"data": [], "next_cursor": None, "prev_cursor": after}
+
+    newer = [
+        test_client.post(
+            f"/client/{client_id}/note", json={"content": f"New note {i}"}
+        ).json()
+        for i in range(3)
+    ]
+
+    response = test_client.get(
+        f"/client/{client_id}/note", params={"after": after, "limit": "2"}
+    )
+    assert response.status_code == 200
+    page = response.json()
+    # The two notes closest to the cursor, still newest first.
+    assert [n["id"] for n in page["data"]] == [newer[1]["id"], newer[0]["id"]]
+
+    response = test_client.get(
+        f"/client/{client_id}/note", params={"after": page["prev_cursor"]}
+    )
+    assert [n["id"] for n in response.json()["data"]] == [newer[2]["id"]]
+
+
+def test_list_notes_before_and_after(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-page-both@example.com")
+    test_client.post(f"/client/{client_id}/note", json={"content": "A note"})
+    cursor = test_client.get(f"/client/{client_id}/note").json()["prev_cursor"]
+
+    response = test_client.get(
+        f"/client/{client_id}/note", params={"before": cursor, "after": cursor}
+    )
+    assert response.status_code == 400
+
+
+def test_list_notes_invalid_cursor(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-page-invalid@example.com")
+
+    response = test_client.get(
+        f"/client/{client_id}/note", params={"before": "garbage"}
+    )
+    assert response.status_code == 400
+
+    # Well formed, but with something that can't be a note's id.
+    cursor = encode_cursor([datetime(2026, 1, 1), "not-an-id"])
+    response = test_client.get(
+        f"/client/{client_id}/note", params={"before": cursor}
+    )
+    assert response.status_code == 400
+
+
+def test_search_notes(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-search@example.com")
+    test_client.post(
+        f"/client/{client_id}/note",
+        json={"content": "Discussed the RRSP rollover before year end."},
+    )
+    test_client.post(
+        f"/client/{client_id}/note",
+        json={"content": "Client asked about travel insurance."},
+    )
+
+    response = test_client.get("/note/search", params={"q": "rrsp rollovers"})
+    assert response.status_code == 200
+
+    data = response.json()
+    assert len(data["data"]) == 1
+    result = data["data"][0]
+    assert result["note"]["client_id"] == client_id
+    assert result["note"]["content"] == "Discussed the RRSP rollover before year end."
+    assert result["client_first_name"] == "Note"
+    assert result["client_last_name"] == "Test"
+    assert "<mark>RRSP</mark>" in result["snippet"]
+    assert "<mark>rollover</mark>" in result["snippet"]
+    assert result["rank"] > 0
+    assert data["next_cursor"] is None
+
+
+def test_search_notes_escapes_snippet(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-search-escape@example.com")
+    test_client.post(
+        f"/client/{client_id}/note",
+        json={
+            "content": "Annuity review <img src=x onerror=alert(1)> "
+            "<script>alert(1)</script> & more"
+        },
+    )
+
+    response = test_client.get("/note/search", params={"q": "annuity"})
+    assert response.status_code == 200
+
+    snippet = response.json()["data"][0]["snippet"]
+    assert "<img" not in snippet
+    assert "<script>" not in snippet
+    assert "&lt;img src=x onerror=alert(1)&gt;" in snippet
+    assert "<mark>Annuity</mark>" in snippet
+    assert "&amp; more" in snippet
+
+
+def test_search_notes_paginates(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-search-pages@example.com")
+    for i in range(5):
+        test_client.post(
+            f"/client/{client_id}/note",
+            json={"content": f"Quarterly rebalancing review {i}"},
+        )
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"q": "rebalancing", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = test_client.get("/note/search", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(result["note"]["id"] for result in data["data"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_search_notes_cursor_from_other_query(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-search-cursor@example.com")
+    for i in range(3):
+        test_client.post(
+            f"/client/{client_id}/note",
+            json={"content": f"Estate planning follow-up {i}"},
+        )
+
+    response = test_client.get("/note/search", params={"q": "estate", "limit": 1})
+    cursor = response.json()["next_cursor"]
+    assert cursor is not None
+
+    response = test_client.get(
+        "/note/search", params={"q": "planning", "cursor": cursor}
+    )
+    assert response.status_code == 400
+
+
+def test_search_notes_requires_query(test_client: TestClient) -> None:
+    response = test_client.get("/note/search", params={"q": ""})
+    assert response.status_code == 422
+
+
+def test_list_notes_etag(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-etag@example.com")
+    test_client.post(f"/client/{client_id}/note", json={"content": "First note"})
+
+    response = test_client.get(f"/client/{client_id}/note")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = test_client.get(
+        f"/client/{client_id}/note", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    test_client.post(f"/client/{client_id}/note", json={"content": "Second note"})
+    response = test_client.get(
+        f"/client/{client_id}/note", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 2
+
+
+def test_notes_client_not_found(test_client: TestClient) -> None:
+    # Neither an id that can't be a client's nor one no client has.
+    for client_id in ("not-a-uuid", "00000000-0000-7000-8000-000000000000"):
+        assert test_client.get(f"/client/{client_id}/note").status_code == 404
+        response = test_client.post(
+            f"/client/{client_id}/note", json={"content": "Nobody to note"}
+        )
+        assert response.status_code == 404
+
+
+def test_stream_notes_not_found(test_client: TestClient) -> None:
+    assert test_client.get("/client/nonexistent-id/note/stream").status_code == 404
+
+
+def test_stream_notes_invalid_last_event_id(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-stream-cursor@example.com")
+
+    response = test_client.get(
+        f"/client/{client_id}/note/stream", headers={"Last-Event-ID": "bogus"}
+    )
+    assert response.status_code == 400
+
+
+def test_stream_notes_unauthenticated(
+    unauthenticated_test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "note-stream-unauth@example.com")
+
+    response = unauthenticated_test_client.get(f"/client/{client_id}/note/stream")
+    assert response.status_code == 401
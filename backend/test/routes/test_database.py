@@ -0,0 +1,15 @@
+from fastapi.testclient import TestClient
+
+
+def test_database_pool(test_client: TestClient) -> None:
+    response = test_client.get("/database/pool")
+    assert response.status_code == 200
+    # Tests don't pool connections.
+    assert response.json()["pool"] == "NullPool"
+
+
+def test_database_pool_unauthenticated(
+    unauthenticated_test_client: TestClient,
+) -> None:
+    response = unauthenticated_test_client.get("/database/pool")
+    assert response.status_code == 401
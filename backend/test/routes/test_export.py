@@ -0,0 +1,80 @@
+# Tests for the client and note export endpoints.
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from server.data.models.client import Client
+from server.shared.databasemanager import DatabaseManager
+
+
+def _create_client(database: DatabaseManager, email: str) -> str:
+    with database.create_session() as session:
+        client = Client(email=email, first_name="Export", last_name="Test")
+        session.add(client)
+        session.commit()
+        return client.id
+
+
+def test_export_clients_ndjson(
+    test_client: TestClient, database: DatabaseManager
+) -> None:
+    client_id = _create_client(database, "export-ndjson@example.com")
+
+    response = test_client.get("/export/clients")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+
+    clients = [json.loads(line) for line in response.text.splitlines()]
+    exported = next(c for c in clients if c["id"] == client_id)
+    assert exported == test_client.get(f"/client/{client_id}").json()
+
+
+def test_export_clients_csv(test_client: TestClient, database: DatabaseManager) -> None:
+    client_id = _create_client(database, "export-csv@example.com")
+
+    response = test_client.get("/export/clients", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    exported = next(row for row in rows if row["id"] == client_id)
+    assert exported["email"] == "export-csv@example.com"
+    assert exported["first_name"] == "Export"
+    assert exported["assigned_user_id"] == ""
+    assert exported["last_contacted_at"] == ""
+    assert exported["note_count"] == "0"
+
+
+def test_export_notes(test_client: TestClient, database: DatabaseManager) -> None:
+    client_id = _create_client(database, "export-notes@example.com")
+    test_client.post(
+        f"/client/{client_id}/note",
+        json={"content": 'Line one,\nline "two"', "category": "call"},
+    )
+
+    response = test_client.get("/export/notes", params={"format": "csv"})
+    assert response.status_code == 200
+
+    rows = [
+        row
+        for row in csv.DictReader(io.StringIO(response.text))
+        if row["client_id"] == client_id
+    ]
+    assert len(rows) == 1
+    assert rows[0]["content"] == 'Line one,\nline "two"'
+    assert rows[0]["category"] == "call"
+    assert rows[0]["creator_name"] == "testuser@example.com"
+
+    response = test_client.get("/export/notes")
+    notes = [json.loads(line) for line in response.text.splitlines()]
+    assert [n["content"] for n in notes if n["client_id"] == client_id] == [
+        'Line one,\nline "two"'
+    ]
+
+
+def test_export_unauthenticated(unauthenticated_test_client: TestClient) -> None:
+    assert unauthenticated_test_client.get("/export/clients").status_code == 401
+    assert unauthenticated_test_client.get("/export/notes").status_code == 401
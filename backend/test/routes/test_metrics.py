@@ -0,0 +1,69 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.business.auth.auth_verifier import AuthVerifier
+from server.business.auth.password import PasswordHasher
+from server.business.client_note.feed import NOTE_CHANNEL
+from server.routes.routes import get_all_routes
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.cache import Cache
+from server.shared.config import Config
+from server.shared.listener import PgListener
+from server.shared.metrics import Metrics
+
+
+def test_request_metrics(test_client: TestClient, metrics: Metrics) -> None:
+    requests_before = metrics.requests.values.get(("GET", "/ping", "200"), 0)
+    queries_before = metrics.request_queries.sum("GET", "/ping")
+
+    assert test_client.get("/ping").status_code == 200
+
+    assert metrics.requests.values[("GET", "/ping", "200")] == requests_before + 1
+    assert metrics.request_queries.sum("GET", "/ping") == queries_before + 1
+    assert metrics.request_db_duration.sum("GET", "/ping") > 0
+
+
+def test_metrics_labelled_by_route(test_client: TestClient, metrics: Metrics) -> None:
+    test_client.get("/client/00000000-0000-0000-0000-000000000000")
+    test_client.get("/no-such-route")
+
+    assert metrics.request_duration.count("GET", "/client/{client_id}") > 0
+    assert metrics.requests.values[("GET", "unmatched", "404")] > 0
+
+
+def test_get_metrics(test_client: TestClient) -> None:
+    test_client.get("/ping")
+
+    response = test_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in response.text
+    assert 'http_requests_total{method="GET",route="/ping",status="200"}' in (
+        response.text
+    )
+    assert (
+        'http_request_db_queries_bucket{method="GET",route="/ping",le="1"}'
+        in response.text
+    )
+
+
+def test_metrics_disabled(
+    config: Config,
+    async_database: AsyncDatabaseManager,
+    auth_verifier: AuthVerifier,
+    cache: Cache,
+    password_hasher: PasswordHasher,
+) -> None:
+    app = FastAPI()
+    app.include_router(
+        get_all_routes(
+            config.model_copy(update={"metrics_enabled": False}),
+            async_database,
+            auth_verifier,
+            cache,
+            password_hasher,
+            PgListener.from_config(config, NOTE_CHANNEL),
+            Metrics(),
+        )
+    )
+    assert TestClient(app).get("/metrics").status_code == 404
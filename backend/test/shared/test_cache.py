@@ -0,0 +1,98 @@
+# Tests for the cache backends.
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from server.shared.cache import Cache, InMemoryCache, RedisCache
+from server.shared.pydantic import BaseModel
+
+
+class PThing(BaseModel):
+    name: str
+
+
+class FakeRedis:
+    """Stands in for redis.asyncio.Redis, storing values in a dict."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, tuple[bytes, float | None]] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        value, expires_at = self.values.get(name, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            return None
+        return value
+
+    async def set(self, name: str, value: bytes, px: int | None = None) -> Any:
+        expires_at = None if px is None else time.monotonic() + px / 1000
+        self.values[name] = (value, expires_at)
+        return True
+
+    async def delete(self, *names: str) -> int:
+        return sum(self.values.pop(name, None) is not None for name in names)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request: pytest.FixtureRequest) -> Cache:
+    if request.param == "memory":
+        return InMemoryCache(max_entries=100, default_ttl=60)
+    return RedisCache(FakeRedis(), default_ttl=60)
+
+
+def test_get_and_set_model(backend: Cache) -> None:
+    async def run() -> None:
+        assert await backend.get_model("thing", PThing) is None
+        await backend.set_model("thing", PThing(name="one"))
+        assert await backend.get_model("thing", PThing) == PThing(name="one")
+        await backend.delete("thing")
+        assert await backend.get_model("thing", PThing) is None
+
+    asyncio.run(run())
+    stats = backend.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+    assert stats.hit_ratio == pytest.approx(1 / 3)
+
+
+def test_expiry(backend: Cache) -> None:
+    async def run() -> None:
+        await backend.set_model("thing", PThing(name="one"), ttl=0.01)
+        await asyncio.sleep(0.02)
+        assert await backend.get_model("thing", PThing) is None
+
+    asyncio.run(run())
+
+
+def test_invalidate_namespace(backend: Cache) -> None:
+    async def run() -> None:
+        first = await backend.namespace("things")
+        assert await backend.namespace("things") == first
+        await backend.set_model(f"{first}:a", PThing(name="a"))
+
+        await backend.invalidate_namespace("things")
+        second = await backend.namespace("things")
+        assert second != first
+        assert await backend.get_model(f"{second}:a", PThing) is None
+
+    asyncio.run(run())
+
+
+def test_in_memory_cache_evicts_least_recently_used() -> None:
+    cache = InMemoryCache(max_entries=2, default_ttl=60)
+
+    async def run() -> None:
+        await cache.set_model("a", PThing(name="a"))
+        await cache.set_model("b", PThing(name="b"))
+        assert await cache.get_model("a", PThing) is not None
+        await cache.set_model("c", PThing(name="c"))
+
+        assert await cache.get_model("b", PThing) is None
+        assert await cache.get_model("a", PThing) is not None
+        assert await cache.get_model("c", PThing) is not None
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+    assert stats.max_entries == 2
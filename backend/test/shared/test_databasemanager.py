@@ -0,0 +1,68 @@
+# Tests for the database managers' pool configuration.
+import asyncio
+
+from sqlalchemy import Engine, NullPool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.config import Config
+from server.shared.databasemanager import DatabaseManager
+from server.shared.metrics import TimedQueuePool
+
+
+def test_pool_from_config(migrated_database: Engine, config: Config) -> None:
+    database = DatabaseManager.from_config(
+        config.model_copy(update={"database_pool_size": 3})
+    )
+    try:
+        with database.create_session() as session:
+            session.execute(text("SELECT 1"))
+            stats = database.pool_stats()
+            assert (stats.size, stats.checked_out, stats.checked_in) == (3, 1, 0)
+        assert database.pool_stats().checked_in == 1
+    finally:
+        database.engine.dispose()
+
+
+def test_prewarm(migrated_database: Engine, config: Config) -> None:
+    async def run() -> None:
+        database = AsyncDatabaseManager.from_config(
+            config.model_copy(update={"database_pool_size": 3})
+        )
+        try:
+            assert isinstance(database.engine.pool, TimedQueuePool)
+            assert database.pool_stats().checked_in == 0
+            await database.prewarm(3)
+            stats = database.pool_stats()
+            assert (stats.checked_out, stats.checked_in, stats.overflow) == (0, 3, 0)
+        finally:
+            await database.dispose()
+
+    asyncio.run(run())
+
+
+def test_pgbouncer_disables_prepared_statements(
+    migrated_database: Engine, config: Config
+) -> None:
+    async def run(pgbouncer: bool) -> int | None:
+        database = AsyncDatabaseManager.from_config(
+            config.model_copy(update={"database_pgbouncer": pgbouncer})
+        )
+        try:
+            async with database.engine.connect() as connection:
+                raw = await connection.get_raw_connection()
+                return raw.driver_connection.prepare_threshold
+        finally:
+            await database.dispose()
+
+    assert asyncio.run(run(False)) is not None
+    assert asyncio.run(run(True)) is None
+
+
+def test_pool_stats_without_queue_pool(database_url: str) -> None:
+    database = AsyncDatabaseManager(
+        create_async_engine(database_url, poolclass=NullPool)
+    )
+    stats = database.pool_stats()
+    assert stats.pool == "NullPool"
+    assert stats.size is None
@@ -0,0 +1,42 @@
+import uuid
+
+from server.shared.ids import is_uuid, new_id, uuid7
+
+
+def test_uuid7_layout() -> None:
+    # 2026-01-01T00:00:00.5Z, with every random bit set.
+    id = uuid.UUID(uuid7(1_767_225_600_500_000_000, (1 << 62) - 1))
+
+    assert id.version == 7
+    assert id.variant == uuid.RFC_4122
+    assert id.int >> 80 == 1_767_225_600_500
+    assert id.int & (1 << 62) - 1 == (1 << 62) - 1
+
+
+def test_uuid7_sorts_by_time() -> None:
+    # Nanoseconds, further apart than the 244 or so that the fraction of a
+    # millisecond resolves.
+    times = [0, 1_000, 999_999, 1_000_000, 1_767_225_600_000_000_000]
+    # The random part doesn't get a say, even when it is larger for the
+    # earlier time.
+    ids = [uuid7(t, (1 << 62) - 1 - i) for i, t in enumerate(times)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_new_id() -> None:
+    ids = [new_id() for _ in range(100)]
+
+    assert all(is_uuid(id) and uuid.UUID(id).version == 7 for id in ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_is_uuid() -> None:
+    assert is_uuid("0192f0c4-5b1e-7c3a-9d2e-4f6a8b0c1d2e")
+    assert is_uuid("0192F0C4-5B1E-7C3A-9D2E-4F6A8B0C1D2E")
+    assert not is_uuid("")
+    assert not is_uuid("nonexistent-id")
+    assert not is_uuid("0192f0c45b1e7c3a9d2e4f6a8b0c1d2e")
+    assert not is_uuid("urn:uuid:0192f0c4-5b1e-7c3a-9d2e-4f6a8b0c1d2e")
+    assert not is_uuid("0192f0c4-5b1e-7c3a-9d2e-4f6a8b0c1d2e\n")
@@ -0,0 +1,60 @@
+# Tests for the metrics types and the Prometheus text they render.
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from server.shared.metrics import Counter, Histogram, Metrics, TimedQueuePool
+
+
+def test_counter_render() -> None:
+    counter = Counter("things_total", "Things.", ("kind",))
+    counter.inc("a")
+    counter.inc("a")
+    counter.inc('b"c')
+
+    assert counter.render() == [
+        "# HELP things_total Things.",
+        "# TYPE things_total counter",
+        'things_total{kind="a"} 2',
+        'things_total{kind="b\\"c"} 1',
+    ]
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram("size", "Sizes.", (1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.count() == 4
+    assert histogram.render() == [
+        "# HELP size Sizes.",
+        "# TYPE size histogram",
+        'size_bucket{le="1"} 2',
+        'size_bucket{le="5"} 3',
+        'size_bucket{le="+Inf"} 4',
+        "size_sum 14.5",
+        "size_count 4",
+    ]
+
+
+def test_queries_and_pool_checkouts(database_url: str) -> None:
+    async def run() -> None:
+        engine = create_async_engine(database_url, poolclass=TimedQueuePool)
+        metrics = Metrics()
+        metrics.instrument_engine(engine)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            # Engine.dispose() replaces the pool, which should still be timed.
+            await engine.dispose()
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 3"))
+        finally:
+            await engine.dispose()
+
+        assert metrics.queries.values[()] >= 3
+        assert metrics.pool_checkout_duration.count() == 2
+
+    asyncio.run(run())
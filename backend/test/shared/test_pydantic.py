@@ -0,0 +1,26 @@
+# Tests for the shared Pydantic base model.
+from datetime import datetime
+
+from server.business.client.schema import PClient
+
+CLIENT = PClient(
+    id="client-1",
+    email="update@example.com",
+    first_name="Uma",
+    last_name="Update",
+    assigned_user_id=None,
+    created_at=datetime(2026, 1, 2, 3, 4, 5),
+    updated_at=datetime(2026, 1, 2, 3, 4, 5),
+    last_contacted_at=None,
+    note_count=2,
+)
+
+
+def test_update_key() -> None:
+    updated = CLIENT.update_key("note_count", 3)
+
+    assert updated.note_count == 3
+    assert updated.model_dump(exclude={"note_count"}) == CLIENT.model_dump(
+        exclude={"note_count"}
+    )
+    assert CLIENT.note_count == 2
@@ -0,0 +1,103 @@
+# Tests for the slow query log and N+1 detection.
+import logging
+from typing import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, text
+
+from server.shared.asyncdatabasemanager import AsyncDatabaseManager
+from server.shared.querymonitor import (
+    NPlusOneError,
+    QueryMonitor,
+    QueryMonitorMiddleware,
+    allow_repeated_queries,
+    track_queries,
+)
+
+
+@pytest.fixture
+def monitored_engine(
+    migrated_database: Engine, database_url: str
+) -> Generator[Engine, None, None]:
+    # Its own engine, so that the listeners don't outlive the test.
+    engine = create_engine(database_url)
+    yield engine
+    engine.dispose()
+
+
+def _select_repeatedly(engine: Engine, times: int) -> None:
+    with engine.connect() as conn:
+        for i in range(times):
+            conn.execute(text("SELECT :i"), {"i": i})
+
+
+def test_raises_on_repeated_statement(monitored_engine: Engine) -> None:
+    QueryMonitor(None, 3, raise_on_n_plus_one=True).instrument_engine(monitored_engine)
+
+    with track_queries(lambda: "test"):
+        _select_repeatedly(monitored_engine, 2)
+    with pytest.raises(NPlusOneError, match="test ran the same statement 3 times"):
+        with track_queries(lambda: "test"):
+            _select_repeatedly(monitored_engine, 3)
+
+
+def test_repeats_outside_scope_or_allowed(monitored_engine: Engine) -> None:
+    QueryMonitor(None, 3, raise_on_n_plus_one=True).instrument_engine(monitored_engine)
+
+    _select_repeatedly(monitored_engine, 5)
+    with track_queries(lambda: "test"):
+        allow_repeated_queries()
+        _select_repeatedly(monitored_engine, 5)
+
+
+def test_logs_repeated_statement(
+    monitored_engine: Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    QueryMonitor(None, 3, raise_on_n_plus_one=False).instrument_engine(monitored_engine)
+
+    with caplog.at_level(logging.WARNING, logger="server.shared.querymonitor"):
+        with track_queries(lambda: "test"):
+            _select_repeatedly(monitored_engine, 5)
+    assert [record.message for record in caplog.records] == [
+        "Possible N+1: test ran the same statement 3 times: SELECT %(i)s"
+    ]
+
+
+def test_logs_slow_query_with_plan(
+    monitored_engine: Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    QueryMonitor(0, 0, raise_on_n_plus_one=True).instrument_engine(monitored_engine)
+
+    with caplog.at_level(logging.WARNING, logger="server.shared.querymonitor"):
+        with monitored_engine.connect() as conn:
+            conn.execute(
+                text("SELECT id FROM client WHERE email = :email"),
+                {"email": "slow@example.com"},
+            )
+            # The transaction is still usable after explaining.
+            assert conn.execute(text("SELECT 1")).scalar_one() == 1
+
+    message = caplog.records[0].message
+    assert message.startswith("Slow query")
+    assert "{'email': 'slow@example.com'}" in message
+    assert "Scan" in message
+
+
+def test_request_n_plus_one_fails_in_tests(
+    async_database: AsyncDatabaseManager,
+) -> None:
+    app = FastAPI()
+    app.add_middleware(QueryMonitorMiddleware)
+
+    @app.get("/loop/{times}")
+    async def loop(times: int) -> None:
+        async with async_database.create_session() as session:
+            for i in range(times):
+                await session.execute(text("SELECT :i"), {"i": i})
+
+    client = TestClient(app)
+    assert client.get("/loop/4").status_code == 200
+    with pytest.raises(NPlusOneError, match="GET /loop/{times}"):
+        client.get("/loop/5")
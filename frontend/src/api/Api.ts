@@ -1,4 +1,8 @@
-import axios, { AxiosInstance } from "axios";
+import axios, {
+    AxiosError,
+    AxiosInstance,
+    InternalAxiosRequestConfig,
+} from "axios";
 
 import { AuthData } from "@/types";
 
@@ -21,9 +25,19 @@ function getAuthData(): AuthData | null {
     return JSON.parse(data as string) as AuthData;
 }
 
+type RetriableRequestConfig = InternalAxiosRequestConfig & {
+    _retried?: boolean;
+};
+
+const TOKEN_URLS = ["token", "token/refresh", "token/revoke"];
+
 export default class Api {
     private axiosInstance: AxiosInstance;
 
+    // Shared by every request that fails while a refresh is in flight, so
+    // that the refresh token is only rotated once.
+    private refreshing: Promise<AuthData> | null = null;
+
     public clients: ClientsApi;
 
     constructor() {
@@ -36,7 +50,10 @@ export default class Api {
 
         this.configureInterceptors();
 
-        this.clients = new ClientsApi(this.axiosInstance);
+        this.clients = new ClientsApi(
+            this.axiosInstance,
+            () => getAuthData()?.access_token || null
+        );
     }
 
     private configureInterceptors() {
@@ -52,21 +69,70 @@ export default class Api {
 
         this.axiosInstance.interceptors.response.use(
             response => response,
-            async error => {
+            async (error: AxiosError) => {
+                const config = error.config as
+                    | RetriableRequestConfig
+                    | undefined;
+
                 if (
-                    error.response?.status === 401 &&
-                    error.config.url !== "token"
+                    error.response?.status !== 401 ||
+                    !config ||
+                    TOKEN_URLS.includes(config.url ?? "")
                 ) {
-                    storeAuthData({ access_token: "" });
-                    window.location.href = "/login";
+                    return Promise.reject(error);
                 }
 
+                if (!config._retried) {
+                    config._retried = true;
+
+                    try {
+                        await this.refreshAuth();
+                        return this.axiosInstance.request(config);
+                    } catch {
+                        // Fall through to logging out.
+                    }
+                }
+
+                storeAuthData({ access_token: "" });
+                window.location.href = "/login";
+
                 return Promise.reject(error);
             }
         );
     }
 
+    private refreshAuth = (): Promise<AuthData> => {
+        if (!this.refreshing) {
+            const refreshToken = getAuthData()?.refresh_token;
+
+            this.refreshing = (
+                refreshToken
+                    ? this.axiosInstance
+                          .post<AuthData>("token/refresh", {
+                              refresh_token: refreshToken,
+                          })
+                          .then(response => {
+                              storeAuthData(response.data);
+                              return response.data;
+                          })
+                    : Promise.reject(new Error("No refresh token"))
+            ).finally(() => {
+                this.refreshing = null;
+            });
+        }
+
+        return this.refreshing;
+    };
+
     public resetAuth = async (): Promise<void> => {
+        const refreshToken = getAuthData()?.refresh_token;
+
+        if (refreshToken) {
+            await this.axiosInstance
+                .post("token/revoke", { refresh_token: refreshToken })
+                .catch(() => undefined);
+        }
+
         storeAuthData({ access_token: "" });
     };
 
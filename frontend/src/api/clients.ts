@@ -1,17 +1,27 @@
 import { AxiosInstance } from "axios";
 
-import { Client, ClientNote, CreateClientNoteRequest, CreateClientRequest } from "@/types/clients";
+import { Page } from "@/types";
+import { BatchGetClientsResponse, Client, ClientDetail, ClientNote, CreateClientNoteRequest, CreateClientRequest, ListClientsParams, ListNotesParams } from "@/types/clients";
+
+const RECONNECT_DELAY_MS = 3000;
 
 export default class ClientsApi {
     private axiosInstance: AxiosInstance;
+    private getAccessToken: () => string | null;
 
-    constructor(axiosInstance: AxiosInstance) {
+    constructor(axiosInstance: AxiosInstance, getAccessToken: () => string | null) {
         this.axiosInstance = axiosInstance;
+        this.getAccessToken = getAccessToken;
     }
 
-    public listClients = async (): Promise<Client[]> => {
-        const response = await this.axiosInstance.get<{ data: Client[] }>("client");
-        return response.data.data;
+    public listClients = async (params: ListClientsParams = {}): Promise<Page<Client>> => {
+        const response = await this.axiosInstance.get<Page<Client>>("client", { params });
+        return response.data;
+    };
+
+    public searchClients = async (q: string, limit?: number): Promise<Client[]> => {
+        const response = await this.axiosInstance.get<Client[]>("client/search", { params: { q, limit } });
+        return response.data;
     };
 
     public getClient = async (clientId: string): Promise<Client> => {
@@ -19,14 +29,85 @@ export default class ClientsApi {
         return response.data;
     };
 
+    public batchGetClients = async (ids: string[]): Promise<BatchGetClientsResponse> => {
+        const response = await this.axiosInstance.post<BatchGetClientsResponse>("client/batch_get", { ids });
+        return response.data;
+    };
+
+    public getClientDetail = async (clientId: string, limit?: number): Promise<ClientDetail> => {
+        const response = await this.axiosInstance.get<ClientDetail>(`client/${clientId}/detail`, { params: { limit } });
+        return response.data;
+    };
+
     public createClient = async (data: CreateClientRequest): Promise<Client> => {
         const response = await this.axiosInstance.post<Client>("client", data);
         return response.data;
     };
 
-    public listNotes = async (clientId: string): Promise<ClientNote[]> => {
-        const response = await this.axiosInstance.get<{ data: ClientNote[] }>(`client/${clientId}/note`);
-        return response.data.data;
+    public listNotes = async (clientId: string, params: ListNotesParams = {}): Promise<Page<ClientNote>> => {
+        const response = await this.axiosInstance.get<Page<ClientNote>>(`client/${clientId}/note`, { params });
+        return response.data;
+    };
+
+    // Calls onNote with every note added to the client from now on, until the
+    // returned function is called. EventSource can't send an Authorization
+    // header, so the event stream is read with fetch instead, reconnecting
+    // from the last note seen if it drops.
+    public followNotes = (clientId: string, onNote: (note: ClientNote) => void): (() => void) => {
+        const controller = new AbortController();
+        let lastEventId: string | null = null;
+
+        const follow = async () => {
+            while (!controller.signal.aborted) {
+                try {
+                    const headers: Record<string, string> = {};
+                    const accessToken = this.getAccessToken();
+                    if (accessToken) {
+                        headers.Authorization = `Bearer ${accessToken}`;
+                    }
+                    if (lastEventId) {
+                        headers["Last-Event-ID"] = lastEventId;
+                    }
+
+                    const response = await fetch(`${this.axiosInstance.defaults.baseURL}/client/${clientId}/note/stream`, {
+                        headers,
+                        signal: controller.signal,
+                    });
+                    if (!response.ok || !response.body) {
+                        throw new Error(`Note stream failed with ${response.status}`);
+                    }
+
+                    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                    let buffer = "";
+                    for (;;) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+
+                        buffer += value;
+                        let end;
+                        while ((end = buffer.indexOf("\n\n")) !== -1) {
+                            const lines = buffer.slice(0, end).split("\n");
+                            buffer = buffer.slice(end + 2);
+
+                            const id = lines.find(line => line.startsWith("id: "));
+                            const data = lines.find(line => line.startsWith("data: "));
+                            if (data) {
+                                onNote(JSON.parse(data.slice("data: ".length)) as ClientNote);
+                            }
+                            if (id) {
+                                lastEventId = id.slice("id: ".length);
+                            }
+                        }
+                    }
+                } catch {
+                    if (controller.signal.aborted) return;
+                }
+                await new Promise(resolve => setTimeout(resolve, RECONNECT_DELAY_MS));
+            }
+        };
+
+        follow();
+        return () => controller.abort();
     };
 
     public createNote = async (clientId: string, data: CreateClientNoteRequest): Promise<ClientNote> => {
@@ -2,12 +2,12 @@
 "use client";
 
 import { ActionIcon, Alert, Badge, Button, Card, CopyButton, Group, Skeleton, Stack, Text, Textarea, Title, Tooltip } from "@mantine/core";
-import { IconAlertCircle, IconArrowLeft, IconAt, IconCalendar, IconCheck, IconClock, IconCopy, IconMail, IconNote, IconPhone, IconPointFilled, IconReload, IconSend, IconTimeline, IconUsers } from "@tabler/icons-react";
+import { IconAlertCircle, IconArrowLeft, IconAt, IconCalendar, IconCheck, IconClock, IconCopy, IconMail, IconNote, IconPhone, IconPointFilled, IconReload, IconSend, IconTimeline, IconUserCheck, IconUsers } from "@tabler/icons-react";
 import { useRouter } from "next/navigation";
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 
 import { useApi } from "@/api/context";
-import { Client, ClientNote } from "@/types/clients";
+import { Client, ClientAdvisor, ClientNote } from "@/types/clients";
 import { formatAbsoluteTimestamp, formatDate, formatTimestamp, getDaysSince } from "@/utils/time";
 
 import styles from "./page.module.scss";
@@ -159,25 +159,70 @@ export default function ClientDetailPage({ id }: { id: string }) {
     const api = useApi();
     const router = useRouter();
     const [client, setClient] = useState<Client | null>(null);
+    const [advisor, setAdvisor] = useState<ClientAdvisor | null>(null);
+    const [noteCounts, setNoteCounts] = useState<Record<string, number>>({});
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [notes, setNotes] = useState<ClientNote[]>([]);
+    const [olderNotesCursor, setOlderNotesCursor] = useState<string | null>(null);
+    const [loadingOlderNotes, setLoadingOlderNotes] = useState(false);
     const [notesError, setNotesError] = useState<string | null>(null);
     const [noteContent, setNoteContent] = useState("");
     const [noteCategory, setNoteCategory] = useState<CategoryType>("note");
     const [submitting, setSubmitting] = useState(false);
     const [activeFilter, setActiveFilter] = useState<CategoryType | "all">("all");
+    // Notes already shown, as our own new notes arrive both from createNote
+    // and from the live feed.
+    const shownNoteIds = useRef(new Set<string>());
+
+    const addNewNote = useCallback((note: ClientNote) => {
+        if (shownNoteIds.current.has(note.id)) return;
+        shownNoteIds.current.add(note.id);
+        setNotes(prev => [note, ...prev]);
+        setClient(prev => prev && {
+            ...prev,
+            last_contacted_at: note.created_at,
+            note_count: prev.note_count + 1,
+        });
+        setNoteCounts(prev => ({
+            ...prev,
+            [note.category]: (prev[note.category] ?? 0) + 1,
+        }));
+    }, []);
 
     useEffect(() => {
-        api.clients.getClient(id)
-            .then(setClient)
+        // One request for the client, its first page of notes, note counts
+        // and advisor.
+        api.clients.getClientDetail(id)
+            .then(detail => {
+                setClient(detail.client);
+                setAdvisor(detail.advisor);
+                setNoteCounts(detail.note_counts);
+                // The live feed may have delivered the newest already.
+                const unseen = detail.notes.data.filter(note => !shownNoteIds.current.has(note.id));
+                unseen.forEach(note => shownNoteIds.current.add(note.id));
+                setNotes(prev => [...prev, ...unseen]);
+                setOlderNotesCursor(detail.notes.next_cursor);
+            })
             .catch(() => setError("Failed to load client. The client may not exist or the server may be unavailable."))
             .finally(() => setLoading(false));
-        api.clients.listNotes(id)
-            .then(setNotes)
-            .catch(() => setNotesError("Failed to load activity. Please try refreshing the page."));
     }, [api, id]);
 
+    // Notes added by anyone else while the page is open.
+    useEffect(() => api.clients.followNotes(id, addNewNote), [api, id, addNewNote]);
+
+    const loadOlderNotes = useCallback(() => {
+        if (!olderNotesCursor) return;
+        setLoadingOlderNotes(true);
+        api.clients.listNotes(id, { before: olderNotesCursor })
+            .then(page => {
+                setNotes(prev => [...prev, ...page.data]);
+                setOlderNotesCursor(page.next_cursor);
+            })
+            .catch(() => setNotesError("Failed to load activity. Please try refreshing the page."))
+            .finally(() => setLoadingOlderNotes(false));
+    }, [api, id, olderNotesCursor]);
+
     useEffect(() => {
         if (client) {
             document.title = `${client.first_name} ${client.last_name} | Hi Interview`;
@@ -199,12 +244,12 @@ export default function ClientDetailPage({ id }: { id: string }) {
             });
             setNoteContent("");
             setNoteCategory("note");
-            setNotes(prev => [created, ...prev]);
+            addNewNote(created);
             setNotesError(null);
         } finally {
             setSubmitting(false);
         }
-    }, [api, id, noteContent, noteCategory, submitting]);
+    }, [api, id, noteContent, noteCategory, submitting, addNewNote]);
 
     const handleComposerKeyDown = useCallback((e: React.KeyboardEvent<HTMLTextAreaElement>) => {
         if ((e.metaKey || e.ctrlKey) && e.key === "Enter") {
@@ -308,6 +353,15 @@ export default function ClientDetailPage({ id }: { id: string }) {
                                     <Text size="sm" c="dimmed">Never</Text>
                                 )}
                             </Group>
+                            <Group gap="sm" className={styles["info-row"]}>
+                                <IconUserCheck size={16} color="var(--mantine-color-dimmed)" />
+                                <Text size="sm" c="dimmed" className={styles["info-label"]}>Advisor</Text>
+                                {advisor ? (
+                                    <Text size="sm" fw={500}>{advisor.email}</Text>
+                                ) : (
+                                    <Text size="sm" c="dimmed">Unassigned</Text>
+                                )}
+                            </Group>
                             <Group gap="sm" className={styles["info-row"]}>
                                 <IconPointFilled size={16} color="var(--mantine-color-green-6)" />
                                 <Text size="sm" c="dimmed" className={styles["info-label"]}>Status</Text>
@@ -322,7 +376,7 @@ export default function ClientDetailPage({ id }: { id: string }) {
                         <IconTimeline size={20} />
                         <Title order={3}>Activity</Title>
                         <Badge variant="light" color="gray" size="sm" circle>
-                            {notes.length}
+                            {client.note_count}
                         </Badge>
                     </Group>
 
@@ -336,7 +390,9 @@ export default function ClientDetailPage({ id }: { id: string }) {
                                 onClick={() => setActiveFilter(option.value)}
                                 radius="xl"
                             >
-                                {option.label}
+                                {option.value === "all"
+                                    ? option.label
+                                    : `${option.label} (${noteCounts[option.value] ?? 0})`}
                             </Button>
                         ))}
                     </Group>
@@ -413,6 +469,13 @@ export default function ClientDetailPage({ id }: { id: string }) {
                                     <NoteCard key={note.id} note={note} />
                                 ))
                             )}
+                            {olderNotesCursor && (
+                                <Group justify="center">
+                                    <Button variant="subtle" onClick={loadOlderNotes} loading={loadingOlderNotes}>
+                                        Load older activity
+                                    </Button>
+                                </Group>
+                            )}
                         </Stack>
                     )}
                 </div>
@@ -2,15 +2,15 @@
 "use client";
 
 import { Alert, Button, CloseButton, Group, Modal, Skeleton, Stack, Table, Text, TextInput, Title } from "@mantine/core";
-import { useDisclosure } from "@mantine/hooks";
+import { useDebouncedValue, useDisclosure } from "@mantine/hooks";
 import { IconAlertCircle, IconChevronDown, IconChevronUp, IconDownload, IconPlus, IconSearch, IconSelector } from "@tabler/icons-react";
 import { AxiosError } from "axios";
 import { useRouter } from "next/navigation";
-import { useCallback, useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useState } from "react";
 
 import { useApi } from "@/api/context";
 import { ApiError } from "@/types";
-import { Client } from "@/types/clients";
+import { Client, ClientSort } from "@/types/clients";
 import { formatTimestamp, getDaysSince } from "@/utils/time";
 
 import styles from "./page.module.scss";
@@ -38,6 +38,12 @@ function LastContactedCell({ value }: { value: string | null }) {
 type SortField = "name" | "email" | "last_contacted";
 type SortDirection = "asc" | "desc";
 
+const SORT_PARAMS: Record<SortField, ClientSort> = {
+    name: "name",
+    email: "email",
+    last_contacted: "last_contacted_at",
+};
+
 interface SortState {
     field: SortField;
     direction: SortDirection;
@@ -50,6 +56,8 @@ function SortIcon({ field, sort }: { field: SortField; sort: SortState }) {
         : <IconChevronDown size={14} />;
 }
 
+const SEARCH_DEBOUNCE_MS = 200;
+
 const SKELETON_ROWS = 5;
 const COLUMNS = 4;
 
@@ -83,7 +91,9 @@ export default function ClientsPage() {
     const api = useApi();
     const router = useRouter();
     const [clients, setClients] = useState<Client[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loadError, setLoadError] = useState<string | null>(null);
     const [opened, { open, close }] = useDisclosure(false);
     const [firstName, setFirstName] = useState("");
@@ -92,6 +102,8 @@ export default function ClientsPage() {
     const [submitting, setSubmitting] = useState(false);
     const [error, setError] = useState("");
     const [search, setSearch] = useState("");
+    const [debouncedSearch] = useDebouncedValue(search.trim(), SEARCH_DEBOUNCE_MS);
+    const [searchResults, setSearchResults] = useState<Client[] | null>(null);
     const [sort, setSort] = useState<SortState>({ field: "name", direction: "asc" });
 
     const toggleSort = useCallback((field: SortField) => {
@@ -102,53 +114,53 @@ export default function ClientsPage() {
         );
     }, []);
 
-    const fetchClients = () => {
+    const fetchClients = useCallback(() => {
         setLoadError(null);
-        api.clients.listClients()
-            .then(setClients)
+        api.clients.listClients({ sort: SORT_PARAMS[sort.field], direction: sort.direction })
+            .then(page => {
+                setClients(page.data);
+                setNextCursor(page.next_cursor);
+            })
             .catch(() => setLoadError("Failed to load clients. Please try refreshing the page."))
             .finally(() => setLoading(false));
-    };
+    }, [api, sort]);
 
     useEffect(() => {
         fetchClients();
-    }, [api]);
+    }, [fetchClients]);
 
-    const filteredClients = useMemo(() => {
-        const query = search.toLowerCase().trim();
-        const filtered = query
-            ? clients.filter(client => {
-                const fullName = `${client.first_name} ${client.last_name}`.toLowerCase();
-                const record = client as unknown as Record<string, unknown>;
-                const university = typeof record.university === "string" ? record.university.toLowerCase() : "";
-                const program = typeof record.program === "string" ? record.program.toLowerCase() : "";
-                return fullName.includes(query) || client.email.toLowerCase().includes(query)
-                    || university.includes(query) || program.includes(query);
+    const loadMore = useCallback(() => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        api.clients.listClients({ sort: SORT_PARAMS[sort.field], direction: sort.direction, cursor: nextCursor })
+            .then(page => {
+                setClients(prev => [...prev, ...page.data]);
+                setNextCursor(page.next_cursor);
             })
-            : [...clients];
+            .catch(() => setLoadError("Failed to load clients. Please try refreshing the page."))
+            .finally(() => setLoadingMore(false));
+    }, [api, sort, nextCursor]);
 
-        filtered.sort((a, b) => {
-            const dir = sort.direction === "asc" ? 1 : -1;
-            switch (sort.field) {
-                case "name": {
-                    const nameA = `${a.first_name} ${a.last_name}`.toLowerCase();
-                    const nameB = `${b.first_name} ${b.last_name}`.toLowerCase();
-                    return dir * nameA.localeCompare(nameB);
-                }
-                case "email":
-                    return dir * a.email.toLowerCase().localeCompare(b.email.toLowerCase());
-                case "last_contacted": {
-                    const timeA = a.last_contacted_at ? new Date(a.last_contacted_at).getTime() : 0;
-                    const timeB = b.last_contacted_at ? new Date(b.last_contacted_at).getTime() : 0;
-                    return dir * (timeA - timeB);
-                }
-                default:
-                    return 0;
-            }
-        });
+    // Searching is done by the server, which ranks the best matches first.
+    useEffect(() => {
+        if (!debouncedSearch) {
+            setSearchResults(null);
+            return;
+        }
+        let cancelled = false;
+        api.clients.searchClients(debouncedSearch)
+            .then(results => {
+                if (!cancelled) setSearchResults(results);
+            })
+            .catch(() => {
+                if (!cancelled) setLoadError("Failed to search clients. Please try again.");
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [api, debouncedSearch]);
 
-        return filtered;
-    }, [clients, search, sort]);
+    const filteredClients = searchResults ?? clients;
 
     const handleCreate = async () => {
         setError("");
@@ -264,9 +276,9 @@ export default function ClientsPage() {
                             style={{ flex: 1 }}
                         />
                         <Text size="sm" c="dimmed" className={styles["client-count"]}>
-                            {search && filteredClients.length !== clients.length
-                                ? `${filteredClients.length} of ${clients.length} clients`
-                                : `${clients.length} ${clients.length === 1 ? "client" : "clients"}`}
+                            {searchResults
+                                ? `${searchResults.length} ${searchResults.length === 1 ? "match" : "matches"}`
+                                : `${clients.length}${nextCursor ? "+" : ""} ${clients.length === 1 && !nextCursor ? "client" : "clients"}`}
                         </Text>
                     </Group>
                     <Table
@@ -306,6 +318,13 @@ export default function ClientsPage() {
                             ))}
                         </Table.Tbody>
                     </Table>
+                    {nextCursor && !searchResults && (
+                        <Group justify="center" mt="md">
+                            <Button variant="light" onClick={loadMore} loading={loadingMore}>
+                                Load more
+                            </Button>
+                        </Group>
+                    )}
                 </>
             )}
 
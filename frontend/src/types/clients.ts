@@ -1,3 +1,5 @@
+import { Page } from "@/types";
+
 export interface Client {
     id: string;
     email: string;
@@ -7,6 +9,17 @@ export interface Client {
     created_at: string;
     updated_at: string;
     last_contacted_at: string | null;
+    note_count: number;
+}
+
+export type ClientSort = "name" | "email" | "created_at" | "last_contacted_at";
+export type SortDirection = "asc" | "desc";
+
+export interface ListClientsParams {
+    sort?: ClientSort;
+    direction?: SortDirection;
+    cursor?: string;
+    limit?: number;
 }
 
 export interface CreateClientRequest {
@@ -25,6 +38,29 @@ export interface ClientNote {
     created_at: string;
 }
 
+export interface BatchGetClientsResponse {
+    data: Client[];
+    missing_ids: string[];
+}
+
+export interface ClientAdvisor {
+    id: string;
+    email: string;
+}
+
+export interface ClientDetail {
+    client: Client;
+    notes: Page<ClientNote>;
+    note_counts: Record<string, number>;
+    advisor: ClientAdvisor | null;
+}
+
+export interface ListNotesParams {
+    before?: string;
+    after?: string;
+    limit?: number;
+}
+
 export interface CreateClientNoteRequest {
     content: string;
     category?: string;
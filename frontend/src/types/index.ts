@@ -1,7 +1,14 @@
 export interface AuthData {
     access_token: string;
+    refresh_token?: string;
 }
 
 export interface ApiError {
     detail: string;
 }
+
+export interface Page<T> {
+    data: T[];
+    next_cursor: string | null;
+    prev_cursor?: string | null;
+}